@@ -0,0 +1,166 @@
+"""Deterministic synthetic decisions/ archives for benchmarking.
+
+Writes ``decisions/digests`` in both formats the parsers accept:
+
+- /marmite: ``# YYYY-MM-DD — topic`` with Redirects / Unchallenged /
+  Wrong calls / Pattern sections
+- digest.py: ``# Session Digest — YYYY-MM-DD`` with Redirections / Choices
+  Made / Significant Changes / Raw Numbers sections
+
+It also writes one ``decisions/synthesis/YYYY-MM.md`` per month covered.
+The same seed and size always produce byte-identical trees.
+
+Usage:
+    python benchmarks/archive.py OUT_DIR [--files 10000] [--seed 0]
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+from datetime import date, timedelta
+from pathlib import Path
+
+START = date(2024, 1, 1)
+SESSIONS_PER_DAY = 4
+
+TOPICS = [
+    "auth middleware", "eval scoring", "profile page", "billing export",
+    "search ranking", "schema migration", "onboarding flow", "cache layer",
+    "rate limiter", "pdf renderer", "webhook retries", "feature flags",
+]
+VERBS = [
+    "Caught", "Refused", "Rejected", "Challenged", "Flagged", "Stopped",
+    "Killed", "Redirected", "Diagnosed", "Chose", "Accepted", "Let",
+]
+OBJECTS = [
+    "the AI's mock-heavy test plan", "a premature abstraction", "the retry loop",
+    "an unbounded cache", "the generated migration", "a silent fallback",
+    "the scorer fabricating matches", "a second config format", "the animated hero",
+    "an N+1 query", "the catch-all exception handler", "a speculative refactor",
+]
+REASONS = [
+    "too fluffy", "hides the real failure", "not needed yet", "breaks on empty input",
+    "quality bar", "wrong layer", "investigate first", "keep it boring",
+]
+PATTERNS = [
+    "diagnose root cause before touching anything",
+    "push back on speculative generality",
+    "prefer deleting code to configuring it",
+    "no new pattern.",
+]
+MONTHS = [
+    "January", "February", "March", "April", "May", "June", "July",
+    "August", "September", "October", "November", "December",
+]
+
+
+def _bullet(rng: random.Random) -> str:
+    text = f"{rng.choice(VERBS)} {rng.choice(OBJECTS)}; {rng.choice(REASONS)}."
+    if rng.random() < 0.2:
+        text += f' "{rng.choice(REASONS)}"'
+    return text
+
+
+def _marmite_digest(rng: random.Random, day: date, topic: str) -> str:
+    hours = rng.choice(["~1h", "~2h", "~4h", "short", "long"])
+    lines = [f"# {day.isoformat()} — {topic}", "", f"{hours} session on the {topic}.", ""]
+    for section, low, high in (("Redirects", 0, 5), ("Unchallenged", 0, 4), ("Wrong calls", 0, 2)):
+        lines.append(f"## {section}")
+        lines.extend(f"- {_bullet(rng)}" for _ in range(rng.randint(low, high)))
+        lines.append("")
+    lines += ["## Pattern", f"- Pattern: {rng.choice(PATTERNS)}", ""]
+    return "\n".join(lines)
+
+
+def _tool_digest(rng: random.Random, day: date, seq: int) -> str:
+    redirects = rng.randint(0, 5)
+    choices = rng.randint(0, 4)
+    changes = rng.randint(0, 2)
+    lines = [
+        f"# Session Digest — {day.isoformat()}",
+        "",
+        f"**Source:** `{day.isoformat()}-{seq:06d}.jsonl`",
+        f"**Turns:** {rng.randint(5, 80)} human, {rng.randint(5, 80)} assistant",
+        "",
+    ]
+    if redirects:
+        lines += ["## Redirections", ""]
+        for _ in range(redirects):
+            lines += [
+                f"- **{_bullet(rng)}**",
+                f"  - AI was doing: {rng.choice(OBJECTS)}",
+                f"  - Human said: no, {rng.choice(REASONS)}",
+                "",
+            ]
+    if choices:
+        lines += ["## Choices Made", ""]
+        for _ in range(choices):
+            lines += [f"- **Chose: {rng.choice(OBJECTS)}**", f"  - Context: {rng.choice(TOPICS)}", ""]
+    if changes:
+        lines += ["## Significant Changes", ""]
+        lines += [f"- Significant changes: {rng.choice(TOPICS).replace(' ', '_')}.py" for _ in range(changes)]
+        lines.append("")
+    lines += [
+        "## Raw Numbers",
+        "",
+        f"- Redirections detected: {redirects}",
+        f"- Choices detected: {choices}",
+        f"- Significant changes: {changes}",
+        "",
+    ]
+    return "\n".join(lines)
+
+
+def _synthesis(rng: random.Random, month_start: date, sessions: int) -> str:
+    lines = [f"# Synthesis — {MONTHS[month_start.month - 1]} {month_start.year} ({sessions} sessions)", ""]
+    for section in ("Recurring patterns", "Evolution", "Beyond fluency", "Gaps"):
+        lines.append(f"## {section}")
+        lines.extend(f"- {rng.choice(PATTERNS).capitalize()}" for _ in range(rng.randint(1, 3)))
+        lines.append("")
+    return "\n".join(lines)
+
+
+def generate(root: Path, files: int, seed: int = 0) -> Path:
+    """Write a synthetic decisions/ tree with ``files`` digests under ``root``."""
+    rng = random.Random(seed)
+    digest_dir = root / "decisions" / "digests"
+    synthesis_dir = root / "decisions" / "synthesis"
+    digest_dir.mkdir(parents=True, exist_ok=True)
+    synthesis_dir.mkdir(parents=True, exist_ok=True)
+
+    per_month: dict[date, int] = {}
+    for i in range(files):
+        day = START + timedelta(days=i // SESSIONS_PER_DAY)
+        if rng.random() < 0.5:
+            topic = rng.choice(TOPICS)
+            name = f"{day.isoformat()}-{i:06d}-{topic.replace(' ', '-')}.md"
+            text = _marmite_digest(rng, day, topic)
+        else:
+            name = f"{day.isoformat()}-session-{i:06d}.md"
+            text = _tool_digest(rng, day, i)
+        (digest_dir / name).write_text(text)
+        month = day.replace(day=1)
+        per_month[month] = per_month.get(month, 0) + 1
+
+    for month, count in sorted(per_month.items()):
+        (synthesis_dir / f"{month:%Y-%m}.md").write_text(_synthesis(rng, month, count))
+
+    return root
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("out", type=Path, help="Directory to create the decisions/ tree in")
+    parser.add_argument("--files", type=int, default=10_000, help="Number of digest files")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    generate(args.out, args.files, args.seed)
+    print(f"Wrote {args.files} digests to {args.out / 'decisions'}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
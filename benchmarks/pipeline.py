@@ -0,0 +1,174 @@
+"""Stage benchmarks for the metrics/profile pipelines on synthetic archives.
+
+For each archive size, generates a deterministic decisions/ tree (see
+archive.py) and measures each stage's best-of-N wall time and its peak
+traced memory. Memory is measured in a separate tracemalloc run so it
+doesn't skew the timings. Results are compared against a committed
+baseline. The script fails (exit 1) if a stage got slower, or used more
+memory, by more than the threshold. Tiny absolute changes are ignored
+as noise.
+
+Baselines are machine-specific: refresh with --update-baseline on the
+machine that runs the comparison (e.g. the CI runner image).
+
+Usage:
+    python benchmarks/pipeline.py [--sizes 100,10000,100000] [--runs 3]
+                                  [--threshold 0.5] [--update-baseline]
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import json
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from archive import generate  # noqa: E402
+
+BASELINE = Path(__file__).resolve().parent / "baseline.json"
+
+# Changes smaller than these are noise, whatever the ratio
+MIN_SECONDS = 0.005
+MIN_PEAK_MIB = 1.0
+
+
+def _stages(root: Path):
+    """(name, callable) pairs; later stages reuse earlier results."""
+    from decision_trail.metrics import build_summary, collect_from_digests
+    from decision_trail.profile import _select_highlighted_moments, build_profile
+    from decision_trail.renderer import render_html, render_markdown
+
+    state: dict = {}
+
+    def parse_digest_metrics():
+        state["sessions"] = collect_from_digests(root)
+
+    def summary():
+        build_summary(state["sessions"])
+
+    def profile():
+        state["profile"] = build_profile(root)
+
+    def highlighted():
+        _select_highlighted_moments(state["profile"].digests)
+
+    def markdown():
+        render_markdown(state["profile"])
+
+    def html():
+        render_html(state["profile"])
+
+    return [
+        ("metrics.parse_digest_metrics", parse_digest_metrics),
+        ("metrics.build_summary", summary),
+        ("profile.build_profile", profile),
+        ("profile.highlighted_moments", highlighted),
+        ("render.markdown", markdown),
+        ("render.html", html),
+    ]
+
+
+def _measure(root: Path, runs: int) -> dict:
+    results: dict = {}
+
+    # Timings: best of N, no tracing
+    for _ in range(runs):
+        for name, fn in _stages(root):
+            gc.collect()
+            start = time.perf_counter()
+            fn()
+            elapsed = time.perf_counter() - start
+            best = results.setdefault(name, {"seconds": elapsed})
+            best["seconds"] = min(best["seconds"], elapsed)
+
+    # Peak memory: one traced run, reset between stages
+    tracemalloc.start()
+    for name, fn in _stages(root):
+        gc.collect()
+        tracemalloc.reset_peak()
+        base = tracemalloc.get_traced_memory()[0]
+        fn()
+        peak = tracemalloc.get_traced_memory()[1] - base
+        results[name]["peak_mib"] = peak / (1024 * 1024)
+    tracemalloc.stop()
+
+    for r in results.values():
+        r["seconds"] = round(r["seconds"], 6)
+        r["peak_mib"] = round(r["peak_mib"], 3)
+    return results
+
+
+def _compare(results: dict, baseline: dict, threshold: float) -> list[str]:
+    failures = []
+    for size, stages in results.items():
+        for name, now in stages.items():
+            before = baseline.get(size, {}).get(name)
+            if not before:
+                continue
+            for key, floor in (("seconds", MIN_SECONDS), ("peak_mib", MIN_PEAK_MIB)):
+                limit = before[key] * (1 + threshold)
+                if now[key] > limit and now[key] - before[key] > floor:
+                    failures.append(
+                        f"{size} files / {name}: {key} {now[key]:.4g} > {before[key]:.4g} "
+                        f"(+{threshold:.0%} allowed)"
+                    )
+    return failures
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="100,10000",
+                        help="Comma-separated archive sizes (digest files)")
+    parser.add_argument("--runs", type=int, default=3, help="Timing runs per stage (best is kept)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--threshold", type=float, default=0.5,
+                        help="Allowed regression as a fraction of the baseline")
+    parser.add_argument("--baseline", type=Path, default=BASELINE)
+    parser.add_argument("--update-baseline", action="store_true",
+                        help="Write these results into the baseline instead of comparing")
+    parser.add_argument("--json", type=Path, default=None, help="Also write results to this file")
+    args = parser.parse_args()
+
+    sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+    results: dict = {}
+
+    for size in sizes:
+        with tempfile.TemporaryDirectory(prefix="decision-trail-bench-") as tmp:
+            root = generate(Path(tmp), size, args.seed)
+            results[str(size)] = _measure(root, args.runs)
+
+        print(f"{size} files")
+        for name, r in results[str(size)].items():
+            print(f"  {name:32} {r['seconds'] * 1000:10.1f} ms {r['peak_mib']:10.2f} MiB")
+
+    if args.json:
+        args.json.write_text(json.dumps(results, indent=2) + "\n")
+
+    baseline = json.loads(args.baseline.read_text()) if args.baseline.exists() else {}
+
+    if args.update_baseline:
+        baseline.update(results)
+        args.baseline.write_text(json.dumps(baseline, indent=2, sort_keys=True) + "\n")
+        print(f"Baseline updated: {args.baseline}")
+        return 0
+
+    if not baseline:
+        print(f"No baseline at {args.baseline}; run with --update-baseline first.")
+        return 0
+
+    failures = _compare(results, baseline, args.threshold)
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    if not failures:
+        print("ok: no stage regressed beyond the threshold")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
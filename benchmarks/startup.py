@@ -0,0 +1,98 @@
+"""Startup budget check for the decision-trail CLI.
+
+The CLI runs from Claude Code hooks at the end of every session, so its
+cold start matters. This script fails (exit 1) if:
+
+- ``decision-trail --help`` imports any module that should be deferred to
+  the command that needs it (rich, jinja2), or
+- the median wall time of ``--help``, minus bare interpreter startup,
+  exceeds the budget.
+
+Usage:
+    python benchmarks/startup.py [--budget-ms 150] [--runs 15]
+"""
+
+from __future__ import annotations
+
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+
+# Heavy top-level packages that must not load for --help/--version
+DEFERRED_PACKAGES = ("rich", "jinja2")
+
+HELP_SNIPPET = """
+import sys
+sys.argv = ["decision-trail", "--help"]
+from decision_trail.cli import cli
+try:
+    cli()
+except SystemExit:
+    pass
+"""
+
+MODULES_SNIPPET = HELP_SNIPPET + """
+sys.stderr.write("\\n".join(sorted(sys.modules)))
+"""
+
+
+def _median_ms(code: str, runs: int) -> float:
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(
+            [sys.executable, "-c", code],
+            check=True,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def _loaded_modules() -> set[str]:
+    result = subprocess.run(
+        [sys.executable, "-c", MODULES_SNIPPET],
+        check=True,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        text=True,
+    )
+    return set(result.stderr.split())
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--budget-ms", type=float, default=150.0,
+                        help="Allowed --help time on top of bare interpreter startup")
+    parser.add_argument("--runs", type=int, default=15, help="Runs per measurement")
+    args = parser.parse_args()
+
+    failed = False
+
+    leaked = sorted(
+        m for m in _loaded_modules()
+        if m.split(".")[0] in DEFERRED_PACKAGES
+    )
+    if leaked:
+        roots = sorted({m.split(".")[0] for m in leaked})
+        print(f"FAIL: --help imported deferred packages: {', '.join(roots)}")
+        failed = True
+
+    baseline = _median_ms("pass", args.runs)
+    help_time = _median_ms(HELP_SNIPPET, args.runs)
+    overhead = help_time - baseline
+    status = "FAIL" if overhead > args.budget_ms else "ok"
+    print(
+        f"{status}: --help took {help_time:.0f} ms "
+        f"({overhead:.0f} ms over interpreter startup, budget {args.budget_ms:.0f} ms)"
+    )
+    failed |= overhead > args.budget_ms
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,278 @@
+"""SQLite catalog of Claude Code session logs.
+
+``decision-trail sessions index`` walks the Claude Code projects tree
+(``~/.claude/projects/<project>/<session>.jsonl``) and records per-session
+metadata: size, mtime, line count, first/last timestamps, sessionId, cwd
+and entry-type counts. Session logs are append-only, so a rescan resumes
+each grown file from the byte offset where the last scan stopped and skips
+unchanged files entirely. Queries (``sessions list``, ``metrics
+--from-catalog``) then never touch the JSONL files.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import re
+import sqlite3
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Optional
+
+SCHEMA_VERSION = 1
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    path        TEXT PRIMARY KEY,
+    project     TEXT NOT NULL,
+    session_id  TEXT,
+    cwd         TEXT,
+    size        INTEGER NOT NULL,
+    mtime_ns    INTEGER NOT NULL,
+    offset      INTEGER NOT NULL,   -- bytes consumed (up to the last complete line)
+    line_count  INTEGER NOT NULL,
+    first_ts    TEXT,
+    last_ts     TEXT,
+    type_counts TEXT NOT NULL       -- JSON object: entry type -> count
+);
+CREATE INDEX IF NOT EXISTS sessions_project ON sessions (project);
+CREATE INDEX IF NOT EXISTS sessions_last_ts ON sessions (last_ts);
+"""
+
+
+def default_projects_dir() -> Path:
+    """Where Claude Code keeps session logs."""
+    return Path.home() / ".claude" / "projects"
+
+
+def project_dir_name(cwd: Path) -> str:
+    """The projects-tree directory (the catalog's ``project``) holding the
+    sessions run in ``cwd``: its absolute path with every character other
+    than a letter or digit replaced by "-"."""
+    return re.sub(r"[^A-Za-z0-9]", "-", str(Path(cwd).resolve()))
+
+
+def default_catalog_path() -> Path:
+    override = os.environ.get("DECISION_TRAIL_CATALOG")
+    if override:
+        return Path(override)
+    return Path.home() / ".cache" / "decision-trail" / "sessions.db"
+
+
+@dataclass
+class SessionRecord:
+    """Catalog metadata for one session log."""
+
+    path: str
+    project: str
+    session_id: Optional[str]
+    cwd: Optional[str]
+    size: int
+    mtime_ns: int
+    offset: int
+    line_count: int
+    first_ts: Optional[str]
+    last_ts: Optional[str]
+    type_counts: dict[str, int] = field(default_factory=dict)
+
+
+@dataclass
+class IndexStats:
+    """What a scan did."""
+
+    scanned: int = 0
+    unchanged: int = 0
+    added: int = 0
+    appended: int = 0  # grown files resumed from their previous offset
+    rescanned: int = 0  # truncated/rewritten files read from the start
+    removed: int = 0
+    bytes_read: int = 0
+
+
+def open_catalog(path: Path) -> sqlite3.Connection:
+    """Open (creating if needed) the catalog database."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(str(path))
+    conn.row_factory = sqlite3.Row
+    version = conn.execute("PRAGMA user_version").fetchone()[0]
+    if version != SCHEMA_VERSION:
+        conn.execute("DROP TABLE IF EXISTS sessions")
+        conn.executescript(SCHEMA)
+        conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        conn.commit()
+    return conn
+
+
+def _row_to_record(row: sqlite3.Row) -> SessionRecord:
+    data = dict(row)
+    data["type_counts"] = json.loads(data["type_counts"])
+    return SessionRecord(**data)
+
+
+def _scan_lines(path: Path, record: SessionRecord) -> int:
+    """Fold complete lines after ``record.offset`` into ``record``. Returns bytes read.
+
+    Reads line by line, so memory stays bounded however much was appended.
+    A trailing line without a newline is still being written; it is left
+    for the next scan. Lines over the extractor's ``max_line_bytes`` are
+    skipped without buffering and counted as "oversized".
+    """
+    from .extractor import CHUNK_SIZE, LIMITS
+
+    max_line = LIMITS.max_line_bytes
+    read = 0
+    with open(path, "rb") as f:
+        f.seek(record.offset)
+        while True:
+            line = f.readline(max_line + 1)
+            if line.endswith(b"\n"):
+                read += len(line)
+                _fold_line(record, line)
+                continue
+            if len(line) <= max_line:
+                break  # end of file, or a last line still being written
+
+            size = len(line)
+            while line and not line.endswith(b"\n"):
+                line = f.readline(CHUNK_SIZE)
+                size += len(line)
+            if not line:
+                break
+            read += size
+            record.line_count += 1
+            record.type_counts["oversized"] = record.type_counts.get("oversized", 0) + 1
+
+    record.offset += read
+    return read
+
+
+def _fold_line(record: SessionRecord, raw: bytes) -> None:
+    if not raw.strip():
+        return
+    record.line_count += 1
+    try:
+        entry = json.loads(raw)
+    except ValueError:
+        record.type_counts["invalid"] = record.type_counts.get("invalid", 0) + 1
+        return
+    if not isinstance(entry, dict):
+        return
+
+    entry_type = str(entry.get("type") or "untyped")
+    record.type_counts[entry_type] = record.type_counts.get(entry_type, 0) + 1
+
+    ts = entry.get("timestamp")
+    if isinstance(ts, str) and ts:
+        if record.first_ts is None or ts < record.first_ts:
+            record.first_ts = ts
+        if record.last_ts is None or ts > record.last_ts:
+            record.last_ts = ts
+    if record.session_id is None and isinstance(entry.get("sessionId"), str):
+        record.session_id = entry["sessionId"]
+    if record.cwd is None and isinstance(entry.get("cwd"), str):
+        record.cwd = entry["cwd"]
+
+
+def _save(conn: sqlite3.Connection, record: SessionRecord) -> None:
+    conn.execute(
+        "INSERT OR REPLACE INTO sessions VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        (
+            record.path, record.project, record.session_id, record.cwd,
+            record.size, record.mtime_ns, record.offset, record.line_count,
+            record.first_ts, record.last_ts, json.dumps(record.type_counts, sort_keys=True),
+        ),
+    )
+
+
+def index_sessions(conn: sqlite3.Connection, projects_dir: Path) -> IndexStats:
+    """Bring the catalog up to date with every *.jsonl under ``projects_dir``."""
+    projects_dir = projects_dir.resolve()
+    stats = IndexStats()
+
+    prefix = str(projects_dir) + os.sep
+    known = {
+        row["path"]: _row_to_record(row)
+        for row in conn.execute(
+            "SELECT * FROM sessions WHERE substr(path, 1, ?) = ?", (len(prefix), prefix),
+        )
+    }
+    seen: set[str] = set()
+
+    for path in sorted(projects_dir.rglob("*.jsonl")):
+        try:
+            st = path.stat()
+        except FileNotFoundError:
+            continue
+        key = str(path)
+        seen.add(key)
+        stats.scanned += 1
+
+        record = known.get(key)
+        if record and record.size == st.st_size and record.mtime_ns == st.st_mtime_ns:
+            stats.unchanged += 1
+            continue
+
+        if record and st.st_size >= record.offset and st.st_size > record.size:
+            stats.appended += 1
+        else:
+            if record:
+                stats.rescanned += 1
+            else:
+                stats.added += 1
+            rel = path.relative_to(projects_dir)
+            record = SessionRecord(
+                path=key,
+                project=rel.parts[0] if len(rel.parts) > 1 else "",
+                session_id=None,
+                cwd=None,
+                size=0,
+                mtime_ns=0,
+                offset=0,
+                line_count=0,
+                first_ts=None,
+                last_ts=None,
+            )
+
+        stats.bytes_read += _scan_lines(path, record)
+        record.size = st.st_size
+        record.mtime_ns = st.st_mtime_ns
+        _save(conn, record)
+
+    gone = [p for p in known if p not in seen]
+    conn.executemany("DELETE FROM sessions WHERE path = ?", [(p,) for p in gone])
+    stats.removed = len(gone)
+
+    conn.commit()
+    return stats
+
+
+def query_sessions(
+    conn: sqlite3.Connection,
+    project: Optional[str] = None,
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+) -> list[SessionRecord]:
+    """Sessions matching the filters, oldest first.
+
+    ``project`` matches a substring of the project directory name or the
+    recorded cwd. ``since``/``until`` are ISO dates (or timestamps) compared
+    against the session's last and first activity respectively.
+    """
+    clauses: list[str] = []
+    params: list = []
+    if project:
+        clauses.append("(instr(project, ?) > 0 OR instr(coalesce(cwd, ''), ?) > 0)")
+        params.extend([project, project])
+    if since:
+        clauses.append("last_ts >= ?")
+        params.append(since)
+    if until:
+        # Dates compare as prefixes of ISO timestamps, so include the whole day
+        clauses.append("first_ts <= ?")
+        params.append(until + "￿" if len(until) == 10 else until)
+
+    sql = "SELECT * FROM sessions"
+    if clauses:
+        sql += " WHERE " + " AND ".join(clauses)
+    sql += " ORDER BY first_ts, path"
+    return [_row_to_record(row) for row in conn.execute(sql, params)]
@@ -0,0 +1,87 @@
+"""Inline SVG trend charts for the profile page.
+
+Series of any length are downsampled with LTTB (metrics.lttb) to at most
+one point per two pixels, so the markup stays small however many
+sessions there are. Charts are built once per profile build, in
+ProfileData.trend_charts, and the template inlines the SVG as-is.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Optional
+
+from .metrics import SessionMetrics, _build_trend, lttb
+
+CHART_WIDTH = 320
+CHART_HEIGHT = 64
+PADDING = 4
+
+
+@dataclass
+class TrendChart:
+    """One metric's trend, precomputed for both templates."""
+
+    title: str
+    latest: str  # 5-session moving average, formatted
+    direction: str  # "up" | "down" | "flat"
+    sparkline: str
+    svg: str
+
+
+def trend_svg(
+    values: list[float],
+    lo: Optional[float] = None,
+    hi: Optional[float] = None,
+    width: int = CHART_WIDTH,
+    height: int = CHART_HEIGHT,
+    label: str = "",
+) -> str:
+    """A polyline chart of ``values`` scaled to [lo, hi] (default: their range)."""
+    points = lttb(values, max(2, width // 2))
+    lo = min(values) if lo is None else lo
+    hi = max(values) if hi is None else hi
+    span = (hi - lo) or 1.0
+    last_x = max(points[-1][0], 1)
+    inner_w = width - 2 * PADDING
+    inner_h = height - 2 * PADDING
+
+    coords = [
+        (PADDING + i / last_x * inner_w, PADDING + (1 - (v - lo) / span) * inner_h)
+        for i, v in points
+    ]
+    polyline = " ".join(f"{x:.1f},{y:.1f}" for x, y in coords)
+    end_x, end_y = coords[-1]
+    return (
+        f'<svg class="trend-chart" viewBox="0 0 {width} {height}" width="{width}" height="{height}" '
+        f'role="img" aria-label="{label}" preserveAspectRatio="none">'
+        f'<polyline points="{polyline}" fill="none" stroke="currentColor" stroke-width="1.5" '
+        f'stroke-linejoin="round" vector-effect="non-scaling-stroke"/>'
+        f'<circle cx="{end_x:.1f}" cy="{end_y:.1f}" r="2.5" fill="currentColor"/>'
+        f"</svg>"
+    )
+
+
+def build_trend_charts(sessions: list[SessionMetrics]) -> list[TrendChart]:
+    """Override-rate and engagement charts, in session order; empty below two sessions."""
+    if len(sessions) < 2:
+        return []
+
+    override = _build_trend([s.override_rate for s in sessions])
+    engagement = _build_trend([s.engagement_score for s in sessions])
+    return [
+        TrendChart(
+            title="Override rate",
+            latest=f"{override.moving_avg_5:.0%}",
+            direction=override.direction,
+            sparkline=override.sparkline,
+            svg=trend_svg(override.values, 0.0, 1.0, label="Override rate per session"),
+        ),
+        TrendChart(
+            title="Engagement",
+            latest=f"{engagement.moving_avg_5:.0f}/100",
+            direction=engagement.direction,
+            sparkline=engagement.sparkline,
+            svg=trend_svg(engagement.values, 0.0, 100.0, label="Engagement score per session"),
+        ),
+    ]
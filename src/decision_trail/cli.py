@@ -2,70 +2,262 @@
 
 from __future__ import annotations
 
+import os
+from contextlib import closing, contextmanager
 from datetime import date
 from pathlib import Path
 
 import click
-from rich.console import Console
 
 from . import __version__
 
-console = Console()
+
+class _LazyConsole:
+    """Stands in for a rich Console, importing rich only on first use.
+
+    The CLI runs from session-end hooks many times a day, and --help or
+    --version should not pay for rich's import. Heavy dependencies (rich,
+    jinja2) are imported inside the commands that need them.
+    """
+
+    _console = None
+
+    def __getattr__(self, name):
+        if self._console is None:
+            from rich.console import Console
+
+            type(self)._console = Console()
+        return getattr(self._console, name)
+
+
+console = _LazyConsole()
 
 DECISIONS_DIR = "decisions"
 
 
 @click.group()
 @click.version_option(version=__version__, prog_name="decision-trail")
-def cli():
+@click.option("--no-daemon", is_flag=True, help="Do all work in-process even if a daemon is running")
+@click.option("--timings", "show_timings", is_flag=True, help="Print per-stage timings and counters on exit")
+@click.option(
+    "--timings-file",
+    type=click.Path(dir_okay=False, path_type=Path),
+    default=None,
+    help="Write per-stage timings and counters to this JSON file",
+)
+@click.option(
+    "--memprofile",
+    "show_memprofile",
+    is_flag=True,
+    help="Trace memory: print per-stage and per-session peaks and top allocation sites on exit",
+)
+@click.option(
+    "--memprofile-file",
+    type=click.Path(dir_okay=False, path_type=Path),
+    default=None,
+    help="Write the memory profile to this JSON file",
+)
+@click.option(
+    "--max-line-bytes",
+    type=click.IntRange(min=1),
+    default=None,
+    help="Skip session log lines longer than this (default 8 MiB)",
+)
+@click.option(
+    "--max-turn-chars",
+    type=click.IntRange(min=1),
+    default=None,
+    help="Scan at most this much of each turn's text for signals (default 1 Mi chars)",
+)
+@click.pass_context
+def cli(
+    ctx: click.Context,
+    no_daemon: bool,
+    show_timings: bool,
+    timings_file: Path | None,
+    show_memprofile: bool,
+    memprofile_file: Path | None,
+    max_line_bytes: int | None,
+    max_turn_chars: int | None,
+):
     """AI fluency is measurable. AI judgment isn't. Capture the difference.
 
     The primary way to use decision-trail is /marmite in Claude Code.
     This CLI exists for parsing session logs after the fact.
     """
-    pass
+    if max_line_bytes or max_turn_chars:
+        from . import extractor
+
+        extractor.configure(max_line_bytes=max_line_bytes, max_turn_chars=max_turn_chars)
+    if show_timings or timings_file:
+        from . import timings
+
+        timings.enable()
+        ctx.call_on_close(lambda: _report_timings(show_timings, timings_file))
+    if show_memprofile or memprofile_file:
+        from . import memprofile
+
+        memprofile.enable()
+        ctx.call_on_close(lambda: _report_memprofile(show_memprofile, memprofile_file))
+
+
+def _report_timings(show: bool, path: Path | None):
+    """Print and/or save what the timings recorder collected."""
+    from . import timings
+
+    if path:
+        timings.write_json(path)
+    if not show:
+        return
+
+    from rich.console import Console
+    from rich.table import Table
+
+    data = timings.snapshot()
+    table = Table(title=f"Timings ({data['total_seconds'] * 1000:.0f} ms total)", pad_edge=False)
+    table.add_column("Stage")
+    table.add_column("Calls", justify="right")
+    table.add_column("ms", justify="right", style="cyan")
+    for name, stage in data["stages"].items():
+        table.add_row(name, str(stage["calls"]), f"{stage['seconds'] * 1000:.1f}")
+
+    counters = Table(title="Counters", pad_edge=False)
+    counters.add_column("Counter")
+    counters.add_column("Value", justify="right", style="cyan")
+    for name, value in data["counters"].items():
+        counters.add_row(name, f"{value:,}")
+
+    err = Console(stderr=True)
+    err.print(table)
+    if data["counters"]:
+        err.print(counters)
+
+
+def _report_memprofile(show: bool, path: Path | None):
+    """Print and/or save what the memory profiler collected."""
+    from . import memprofile
+
+    if path:
+        memprofile.write_json(path)
+    if not show:
+        return
+
+    from rich.console import Console
+    from rich.table import Table
+
+    def mib(n: int) -> str:
+        return f"{n / (1024 * 1024):.2f}"
+
+    data = memprofile.snapshot()
+    err = Console(stderr=True)
+
+    table = Table(title=f"Memory (peak {mib(data['peak_bytes'])} MiB traced)", pad_edge=False)
+    table.add_column("Stage")
+    table.add_column("Calls", justify="right")
+    table.add_column("Peak MiB", justify="right", style="cyan")
+    table.add_column("Retained MiB", justify="right")
+    for name, stage in data["stages"].items():
+        table.add_row(name, str(stage["calls"]), mib(stage["peak_bytes"]), mib(stage["retained_bytes"]))
+    err.print(table)
+
+    if data["sessions"]["heaviest"]:
+        sessions = Table(title=f"Heaviest sessions (of {data['sessions']['count']})", pad_edge=False)
+        sessions.add_column("Session")
+        sessions.add_column("Peak MiB", justify="right", style="cyan")
+        for label, peak in data["sessions"]["heaviest"].items():
+            sessions.add_row(label, mib(peak))
+        err.print(sessions)
+
+    if data["top_sites"]["sites"]:
+        sites = Table(title=f"Top allocation sites (live after {data['top_sites']['at_stage']})", pad_edge=False)
+        sites.add_column("Site")
+        sites.add_column("MiB", justify="right", style="cyan")
+        sites.add_column("Blocks", justify="right")
+        for site in data["top_sites"]["sites"]:
+            sites.add_row(site["site"], mib(site["bytes"]), f"{site['blocks']:,}")
+        err.print(sites)
+
+
+def _via_daemon(op: str, **args):
+    """Forward a request to a running daemon. None means do the work in-process."""
+    params = click.get_current_context().find_root().params
+    if params.get("no_daemon"):
+        return None
+    if os.environ.get("DECISION_TRAIL_NO_DAEMON"):
+        return None
+    if params.get("show_timings") or params.get("timings_file"):
+        return None  # measure the work here, not a round trip
+    if params.get("show_memprofile") or params.get("memprofile_file"):
+        return None
+    if params.get("max_line_bytes") or params.get("max_turn_chars"):
+        return None  # the daemon runs with its own limits
+
+    from .daemon import DaemonError, request
+
+    try:
+        return request(op, **args)
+    except DaemonError as exc:
+        console.print(f"[dim]Daemon error ({exc}); running in-process.[/dim]")
+        return None
 
 
 @cli.command()
-@click.argument("session_path", type=click.Path(exists=True, path_type=Path))
+@click.argument("session_paths", nargs=-1, required=True, type=click.Path(exists=True, path_type=Path))
 @click.option("--path", default=".", help="Project root path")
-@click.option("--commit", is_flag=True, help="Auto-commit the digest to git")
-def digest(session_path: Path, path: str, commit: bool):
-    """Generate a session digest from a Claude Code session log.
+@click.option("--commit", is_flag=True, help="Auto-commit the digest(s) to git")
+def digest(session_paths: tuple[Path, ...], path: str, commit: bool):
+    """Generate session digests from Claude Code session logs.
 
-    Parses a session and produces a flat list of moments where the human
+    Parses each session and produces a flat list of moments where the human
     directed the AI. No scoring, no vanity metrics.
 
-    SESSION_PATH is the path to a .jsonl session file.
+    SESSION_PATHS are one or more .jsonl session files. With --commit, all
+    digests from one run land in a single commit.
     """
     from .extractor import extract_from_session
     from .digest import generate_digest
+    from .pack import new_digest_path
 
     root = Path(path).resolve()
     digest_dir = root / DECISIONS_DIR / "digests"
     digest_dir.mkdir(parents=True, exist_ok=True)
 
-    console.print(f"[dim]Parsing session: {session_path}[/dim]\n")
-    candidates = extract_from_session(session_path)
-    digest_text = generate_digest(session_path, candidates)
-
-    # Write digest file
     today = date.today().isoformat()
-    existing = list(digest_dir.glob(f"{today}-*.md"))
-    seq = len(existing) + 1
-    digest_file = digest_dir / f"{today}-session-{seq}.md"
-    digest_file.write_text(digest_text)
-    console.print(f"[bold green]Digest written:[/bold green] {digest_file.relative_to(root)}")
+    digest_files: list[Path] = []
+
+    for session_path in session_paths:
+        console.print(f"[dim]Parsing session: {session_path}[/dim]\n")
+        result = _via_daemon("digest", session_path=str(session_path.resolve()))
+        if result is not None:
+            digest_text = result["digest"]
+        else:
+            candidates = extract_from_session(session_path)
+            digest_text = generate_digest(session_path, candidates)
+
+        # Write digest file
+        digest_file = new_digest_path(root, today)
+        digest_file.write_text(digest_text)
+        digest_files.append(digest_file)
+        console.print(f"[bold green]Digest written:[/bold green] {digest_file.relative_to(root)}")
+
+    from .rollups import rollups_path, update_rollups
+
+    derived: list[Path] = []
+    if rollups_path(root).exists():
+        update_rollups(root)  # cheap when only new digests landed
+        derived.append(rollups_path(root))
 
     if commit:
-        from .git import git_add_and_commit, is_git_repo
+        from .git import git_commit_files, is_git_repo
 
         if not is_git_repo(root):
             console.print("[yellow]Not a git repo — skipping commit.[/yellow]")
             return
 
         commit_msg = f"digest: {today}"
-        sha = git_add_and_commit(digest_file, commit_msg)
+        if len(digest_files) > 1:
+            commit_msg += f" ({len(digest_files)} sessions)"
+        sha = git_commit_files(digest_files + derived, commit_msg)
         if sha:
             console.print(f"[bold green]Committed:[/bold green] {sha}")
 
@@ -73,17 +265,30 @@ def digest(session_path: Path, path: str, commit: bool):
 @cli.command()
 @click.argument("session_path", type=click.Path(exists=True, path_type=Path))
 @click.option("--path", default=".", help="Project root path")
-def extract(session_path: Path, path: str):
+@click.option(
+    "--sidechains",
+    type=click.Choice(["drop", "separate"]),
+    default="drop",
+    help="Skip subagent conversations, or analyse each one on its own",
+)
+def extract(session_path: Path, path: str, sidechains: str):
     """Show decision candidates from a Claude Code session log.
 
     Useful for inspecting what the extractor picks up from a session.
+    Only the main conversation is analysed unless --sidechains separate.
 
     SESSION_PATH is the path to a .jsonl session file.
     """
-    from .extractor import extract_from_session
+    from .extractor import DecisionCandidate, extract_from_session
 
     console.print(f"[dim]Parsing session: {session_path}[/dim]\n")
-    candidates = extract_from_session(session_path)
+    result = None
+    if sidechains == "drop":
+        result = _via_daemon("extract", session_path=str(session_path.resolve()))
+    if result is not None:
+        candidates = [DecisionCandidate(**c) for c in result]
+    else:
+        candidates = extract_from_session(session_path, sidechains=sidechains)
 
     if not candidates:
         console.print("[yellow]No decision candidates found in this session.[/yellow]")
@@ -92,7 +297,8 @@ def extract(session_path: Path, path: str):
     console.print(f"[bold]Found {len(candidates)} candidate(s):[/bold]\n")
 
     for i, candidate in enumerate(candidates, 1):
-        console.print(f"[bold cyan]{i}.[/bold cyan] [{candidate.category}] {candidate.summary}")
+        where = " [dim](subagent)[/dim]" if candidate.sidechain else ""
+        console.print(f"[bold cyan]{i}.[/bold cyan] [{candidate.category}] {candidate.summary}{where}")
         if candidate.ai_suggestion:
             console.print(f"   [blue]AI:[/blue] {candidate.ai_suggestion[:100]}")
         if candidate.human_response:
@@ -108,33 +314,114 @@ def extract(session_path: Path, path: str):
     default="md",
     help="Output format",
 )
-def profile(path: str, fmt: str):
+@click.option(
+    "--static",
+    is_flag=True,
+    help="Fingerprint the CSS and write .gz/.br siblings plus a manifest for static hosts",
+)
+@click.option("--at", "rev", default=None, help="Build from decisions/ as of this git revision")
+@click.option(
+    "--compare",
+    "compare_rev",
+    default=None,
+    help="Show what changed since this revision (up to --at or the working tree) instead of writing files",
+)
+def profile(path: str, fmt: str, static: bool, rev: str | None, compare_rev: str | None):
     """Generate a shareable decision profile.
 
     Reads all digests and synthesis files, produces a profile page.
     Markdown goes to decisions/profile.md, HTML to docs/profile/index.html.
+    With --static, the HTML output is precompressed and its CSS gets a
+    content-hashed name so it can be cached long-term.
+
+    --at and --compare read digests straight from git history, without
+    touching the checkout.
     """
     from .profile import build_profile
     from .renderer import write_profile
 
     root = Path(path).resolve()
-    data = build_profile(root)
 
-    if data.total_sessions == 0:
-        console.print("[yellow]No digests found. Run /marmite in a session first.[/yellow]")
+    if compare_rev:
+        from .history import compare_profiles
+
+        with _git_errors():
+            diff = compare_profiles(root, compare_rev, rev)
+        _print_profile_diff(diff)
         return
 
-    written = write_profile(data, root, fmt)
+    result = None if rev else _via_daemon("profile", root=str(root), fmt=fmt, static=static)
+    if result is not None:
+        written = [Path(p) for p in result["written"]]
+        total_sessions = result["total_sessions"]
+        active_since = result["active_since"]
+        moment_count = result["highlighted_moments"]
+    else:
+        if rev:
+            from .history import HistoryReader
+
+            with _git_errors(), HistoryReader(root) as reader:
+                data = reader.profile(rev)
+        else:
+            data = build_profile(root)
+
+        written = []
+        if data.total_sessions:
+            written = write_profile(data, root, fmt, static=static)
+        total_sessions = data.total_sessions
+        active_since = data.active_since
+        moment_count = len(data.highlighted_moments)
+
+    if total_sessions == 0:
+        console.print("[yellow]No digests found. Run /marmite in a session first.[/yellow]")
+        return
 
     for p in written:
         console.print(f"[bold green]Written:[/bold green] {p.relative_to(root)}")
 
     console.print(
-        f"\n[dim]{data.total_sessions} session(s) since {data.active_since}. "
-        f"{len(data.highlighted_moments)} highlighted moment(s).[/dim]"
+        f"\n[dim]{total_sessions} session(s) since {active_since}. "
+        f"{moment_count} highlighted moment(s).[/dim]"
     )
 
 
+@contextmanager
+def _git_errors():
+    """Report GitError as a CLI error instead of a traceback."""
+    from .git import GitError
+
+    try:
+        yield
+    except GitError as exc:
+        console.print(f"[red]{exc}[/red]")
+        raise click.exceptions.Exit(1)
+
+
+def _print_profile_diff(diff):
+    """Print a ProfileDiff."""
+    console.print(f"[bold]Profile changes: {diff.old_label} -> {diff.new_label}[/bold]\n")
+    if diff.is_empty:
+        console.print("[dim]No changes.[/dim]")
+        return
+
+    console.print(f"  Sessions: {diff.old_sessions} -> {diff.new_sessions}")
+    for label, names, style in (
+        ("Added", diff.digests_added, "green"),
+        ("Removed", diff.digests_removed, "red"),
+        ("Modified", diff.digests_modified, "yellow"),
+    ):
+        for name in names:
+            console.print(f"  [{style}]{label}:[/{style}] {name}")
+    for moment in diff.moments_added:
+        console.print(f"  [green]+ moment:[/green] {moment}")
+    for moment in diff.moments_removed:
+        console.print(f"  [red]- moment:[/red] {moment}")
+    if diff.how_i_work_changed:
+        console.print("  [yellow]How I Work With AI changed[/yellow]")
+    if diff.evolution_changed:
+        console.print("  [yellow]Evolution narrative changed[/yellow]")
+
+
 @cli.command()
 @click.option("--path", default=".", help="Project root path")
 @click.option(
@@ -144,39 +431,212 @@ def profile(path: str, fmt: str):
     default=None,
     help="Derive metrics from JSONL session logs in this directory instead of digests",
 )
-def metrics(path: str, session_dir: Path | None):
+@click.option(
+    "--from-catalog",
+    is_flag=True,
+    help="Derive metrics from session logs chosen by a catalog query (see `sessions index`)",
+)
+@click.option(
+    "--catalog",
+    "catalog_path",
+    type=click.Path(dir_okay=False, path_type=Path),
+    default=None,
+    help="Catalog database to query (default: $DECISION_TRAIL_CATALOG or ~/.cache/decision-trail/sessions.db)",
+)
+@click.option("--project", default=None, help="Catalog query: project name or cwd substring")
+@click.option("--since", default=None, help="Catalog query: sessions active on or after this date")
+@click.option("--until", default=None, help="Catalog query: sessions started on or before this date")
+@click.option(
+    "--sidechains",
+    type=click.Choice(["drop", "separate"]),
+    default="drop",
+    help="Skip subagent conversations, or analyse each one on its own",
+)
+@click.option("--at", "rev", default=None, help="Use digests as of this git revision")
+@click.option(
+    "--compare",
+    "compare_rev",
+    default=None,
+    help="Also show how the aggregates moved since this git revision",
+)
+@click.option(
+    "--sample",
+    type=click.IntRange(min=1),
+    default=None,
+    help="Session logs: estimate from a random sample of this many files",
+)
+@click.option(
+    "--sample-fraction",
+    type=click.FloatRange(0, 1, min_open=True),
+    default=None,
+    help="Session logs: estimate from this fraction of the files",
+)
+@click.option("--seed", type=int, default=None, help="Random seed for --sample/--sample-fraction")
+@click.option(
+    "--by",
+    type=click.Choice(["week", "month"]),
+    default=None,
+    help="Show one row per week or month (digests are served from decisions/rollups.json)",
+)
+@click.option(
+    "--group-by",
+    type=click.Choice(["project", "topic", "month"]),
+    default=None,
+    help="Per-group averages, trends and coasting alerts",
+)
+def metrics(
+    path: str,
+    session_dir: Path | None,
+    from_catalog: bool,
+    catalog_path: Path | None,
+    project: str | None,
+    since: str | None,
+    until: str | None,
+    sidechains: str,
+    rev: str | None,
+    compare_rev: str | None,
+    sample: int | None,
+    sample_fraction: float | None,
+    seed: int | None,
+    by: str | None,
+    group_by: str | None,
+):
     """Cognitive engagement dashboard.
 
     Shows per-session metrics, trends, and coasting alerts derived from
     your digest files. Use --from-sessions to derive metrics directly
-    from JSONL session logs instead.
+    from JSONL session logs instead, --from-catalog to pick those logs
+    with a catalog query (--project/--since/--until), or --at to read
+    digests from a past git revision. --by week|month rolls sessions up
+    into one row per period. --group-by project|topic|month gives each
+    group its own averages, trends and coasting alerts (projects come from
+    session logs; digests have none).
+
+    For very large session directories, --sample N or --sample-fraction F
+    parses a random subset and reports estimates with 95% confidence
+    intervals instead of exact figures.
     """
     from rich.table import Table
     from rich.panel import Panel
     from rich.text import Text
 
     from .metrics import (
+        SessionMetrics,
+        collect_from_catalog,
         collect_from_digests,
         collect_from_sessions,
         build_summary,
+        sample_items,
+        _sparkline,
     )
 
     root = Path(path).resolve()
+    from_catalog = from_catalog or bool(catalog_path or project or since or until)
 
-    if session_dir:
-        session_paths = sorted(session_dir.glob("*.jsonl"))
+    if (session_dir or from_catalog) and (rev or compare_rev):
+        console.print("[yellow]--at/--compare read digests from git; they can't be combined with session logs.[/yellow]")
+        return
+    if session_dir and from_catalog:
+        console.print("[yellow]Use either --from-sessions or a catalog query, not both.[/yellow]")
+        return
+    if by and compare_rev:
+        console.print("[yellow]--compare can't be combined with --by.[/yellow]")
+        return
+    if group_by and (by or compare_rev):
+        console.print("[yellow]--group-by can't be combined with --by or --compare.[/yellow]")
+        return
+    sampling = bool(sample or sample_fraction)
+    if sampling and (by or group_by or compare_rev):
+        console.print("[yellow]--sample/--sample-fraction can't be combined with --by, --group-by or --compare.[/yellow]")
+        return
+    if sampling and not (session_dir or from_catalog):
+        console.print("[yellow]--sample/--sample-fraction apply to session logs (--from-sessions or a catalog query).[/yellow]")
+        return
+    if sample and sample_fraction:
+        console.print("[yellow]Use either --sample or --sample-fraction, not both.[/yellow]")
+        return
+
+    if by and not (session_dir or from_catalog or rev):
+        from .rollups import update_rollups
+
+        rollups = update_rollups(root).rollups(by)
+        if not rollups:
+            console.print("[yellow]No dated digests found. Run /marmite in a session first.[/yellow]")
+            return
+        _print_rollups(rollups, by)
+        return
+
+    baseline = None
+    if rev or compare_rev:
+        from .history import HistoryReader
+
+        with _git_errors(), HistoryReader(root) as reader:
+            sessions = reader.metrics(rev) if rev else collect_from_digests(root)
+            if compare_rev:
+                baseline = build_summary(reader.metrics(compare_rev))
+    elif from_catalog:
+        from .catalog import default_catalog_path, open_catalog, query_sessions
+
+        catalog_path = catalog_path or default_catalog_path()
+        if not catalog_path.exists():
+            console.print("[yellow]No session catalog yet. Run `decision-trail sessions index` first.[/yellow]")
+            return
+        with closing(open_catalog(catalog_path)) as conn:
+            records = query_sessions(conn, project=project, since=since, until=until)
+        if not records:
+            console.print("[yellow]No cataloged sessions match that query.[/yellow]")
+            return
+        if sampling:
+            records, population = sample_items(records, sample, sample_fraction, seed)
+            sampled = len(records)
+        console.print(f"[dim]Parsing {len(records)} session log(s) from the catalog...[/dim]\n")
+        sessions = collect_from_catalog(records, sidechains=sidechains)
+    elif session_dir:
+        if sampling:
+            session_paths, population = sample_items(session_dir.glob("*.jsonl"), sample, sample_fraction, seed)
+            sampled = len(session_paths)
+        else:
+            session_paths = sorted(session_dir.glob("*.jsonl"))
         if not session_paths:
             console.print("[yellow]No .jsonl files found in that directory.[/yellow]")
             return
         console.print(f"[dim]Parsing {len(session_paths)} session log(s)...[/dim]\n")
-        sessions = collect_from_sessions(session_paths)
+        result = None
+        if not sampling:
+            result = _via_daemon(
+                "metrics", session_paths=[str(p.resolve()) for p in session_paths], sidechains=sidechains,
+            )
+        if result is not None:
+            sessions = [SessionMetrics(**m) for m in result]
+        else:
+            sessions = collect_from_sessions(session_paths, sidechains=sidechains)
     else:
-        sessions = collect_from_digests(root)
+        result = _via_daemon("metrics", root=str(root))
+        if result is not None:
+            sessions = [SessionMetrics(**m) for m in result]
+        else:
+            sessions = collect_from_digests(root)
 
     if not sessions:
         console.print("[yellow]No digests found. Run /marmite in a session first.[/yellow]")
         return
 
+    if sampling:
+        _print_estimates(sessions, sampled, population)
+        return
+
+    if group_by:
+        from .rollups import group_sessions
+
+        _print_groups(group_sessions(sessions, group_by), group_by)
+        return
+
+    if by:
+        from .rollups import rollup_sessions
+
+        _print_rollups(rollup_sessions(sessions, by), by)
+        return
+
     summary = build_summary(sessions)
 
     # --- Per-session table ---
@@ -228,15 +688,16 @@ def metrics(path: str, session_dir: Path | None):
 
     or_trend = summary.override_rate_trend
     eng_trend = summary.engagement_trend
+    width = _sparkline_width()
 
     console.print("[bold]Trends[/bold]")
     console.print(
-        f"  Override rate:    {or_trend.sparkline}  "
+        f"  Override rate:    {_sparkline(or_trend.values, width)}  "
         f"{trend_arrow.get(or_trend.direction, 'flat')}  "
         f"(MA5: {or_trend.moving_avg_5:.0%}  MA10: {or_trend.moving_avg_10:.0%})"
     )
     console.print(
-        f"  Engagement score: {eng_trend.sparkline}  "
+        f"  Engagement score: {_sparkline(eng_trend.values, width)}  "
         f"{trend_arrow.get(eng_trend.direction, 'flat')}  "
         f"(MA5: {eng_trend.moving_avg_5:.0f}  MA10: {eng_trend.moving_avg_10:.0f})"
     )
@@ -254,6 +715,21 @@ def metrics(path: str, session_dir: Path | None):
     )
     console.print()
 
+    # --- Change since --compare ---
+    if baseline is not None:
+        console.print(f"[bold]Since {compare_rev}[/bold]")
+        console.print(f"  Sessions: {baseline.total_sessions} -> {summary.total_sessions}")
+        console.print(
+            f"  Avg engagement: {baseline.avg_engagement_score:.0f} -> {summary.avg_engagement_score:.0f}"
+        )
+        console.print(
+            f"  Avg override rate: {baseline.avg_override_rate:.0%} -> {summary.avg_override_rate:.0%}"
+        )
+        console.print(
+            f"  Redirects: {baseline.total_redirects} -> {summary.total_redirects}"
+        )
+        console.print()
+
     # --- Coasting alerts ---
     if summary.coasting_alerts:
         for alert in summary.coasting_alerts:
@@ -266,21 +742,617 @@ def metrics(path: str, session_dir: Path | None):
             ))
 
 
+def _sparkline_width() -> int:
+    """Sparkline length that keeps a trend line (label, arrow, moving averages) on one row."""
+    return max(10, console.width - 64)
+
+
+def _print_groups(groups: dict, by: str):
+    """Per-group table and coasting alerts for metrics --group-by."""
+    from rich.markup import escape
+    from rich.table import Table
+
+    from .metrics import _sparkline
+
+    if by == "month":
+        ordered = [groups[k] for k in sorted(groups)]
+    else:
+        ordered = sorted(groups.values(), key=lambda g: (-g.sessions, g.key))
+
+    arrows = {"up": "[green]↑[/green]", "down": "[red]↓[/red]", "flat": "[dim]→[/dim]"}
+    table = Table(title=f"Metrics by {by}", show_lines=False, pad_edge=False)
+    table.add_column(by.capitalize(), max_width=30)
+    table.add_column("Sessions", justify="right")
+    table.add_column("Redirects", justify="right", style="cyan")
+    table.add_column("Override %", justify="right")
+    table.add_column("Engagement", justify="right", style="bold")
+    table.add_column("Override trend", no_wrap=True)
+    table.add_column("Engagement trend", no_wrap=True)
+    table.add_column("Alerts", justify="right", style="bold red")
+
+    summaries = [(g.key, g.summary()) for g in ordered]
+    for key, summary in summaries:
+        or_trend = summary.override_rate_trend
+        eng_trend = summary.engagement_trend
+        table.add_row(
+            escape(key),
+            str(summary.total_sessions),
+            str(summary.total_redirects),
+            f"{summary.avg_override_rate:.0%}",
+            f"{summary.avg_engagement_score:.0f}",
+            f"{_sparkline(or_trend.values)} {arrows[or_trend.direction]}",
+            f"{_sparkline(eng_trend.values)} {arrows[eng_trend.direction]}",
+            str(len(summary.coasting_alerts) or ""),
+        )
+
+    console.print(table)
+    console.print("[dim]Trends cover each group's last 10 sessions.[/dim]\n")
+
+    for key, summary in summaries:
+        for alert in summary.coasting_alerts:
+            style = "bold red" if alert.severity == "critical" else "bold yellow"
+            console.print(f"[{style}]{escape(key)}:[/{style}] {alert.message}")
+
+
+def _print_estimates(sessions: list, sampled: int, population: int):
+    """Estimates with confidence intervals for metrics --sample."""
+    from .metrics import estimate_mean
+
+    console.print(
+        f"[bold]Estimates[/bold] [dim]from {len(sessions)} session(s) in {sampled} sampled "
+        f"file(s) of {population:,}, 95% confidence[/dim]"
+    )
+    if not sessions:
+        console.print("[yellow]The sample held no sessions with new entries.[/yellow]")
+        return
+
+    def interval(estimate, fmt: str) -> str:
+        if estimate.low is None:
+            return "[dim](no interval below 2 sessions)[/dim]"
+        return f"[dim]({estimate.low:{fmt}}–{estimate.high:{fmt}})[/dim]"
+
+    engagement = estimate_mean([s.engagement_score for s in sessions], sampled, population, bounds=(0.0, 100.0))
+    override = estimate_mean([s.override_rate for s in sessions], sampled, population, bounds=(0.0, 1.0))
+    redirects = estimate_mean([float(s.redirect_count) for s in sessions], sampled, population, bounds=(0.0, None))
+
+    console.print(f"  Avg engagement:    {engagement.mean:.1f}/100  {interval(engagement, '.1f')}")
+    console.print(f"  Avg override rate: {override.mean:.1%}  {interval(override, '.1%')}")
+    console.print(f"  Redirects/session: {redirects.mean:.2f}  {interval(redirects, '.2f')}")
+    console.print()
+
+
+def _print_rollups(rollups: list, period: str):
+    """Per-period table and trends for metrics --by."""
+    from rich.table import Table
+
+    from .metrics import _build_trend, _sparkline
+
+    table = Table(title=f"Metrics by {period}", show_lines=False, pad_edge=False)
+    table.add_column(period.capitalize(), style="dim", no_wrap=True)
+    table.add_column("Sessions", justify="right")
+    table.add_column("Redirects", justify="right", style="cyan")
+    table.add_column("Unchallenged", justify="right", style="yellow")
+    table.add_column("Wrong", justify="right", style="red")
+    table.add_column("Override %", justify="right")
+    table.add_column("Engagement", justify="right", style="bold")
+    table.add_column("Range", justify="right", style="dim")
+    table.add_column("Alerts", style="bold red")
+
+    for r in rollups:
+        table.add_row(
+            r.key,
+            str(r.sessions),
+            str(r.redirects),
+            str(r.unchallenged),
+            str(r.wrong_calls),
+            f"{r.avg_override_rate:.0%}",
+            f"{r.avg_engagement_score:.0f}",
+            f"{r.engagement_min:.0f}–{r.engagement_max:.0f}",
+            ", ".join(r.alerts),
+        )
+
+    console.print(table)
+    console.print()
+
+    trend_arrow = {"up": "[green]trending up[/green]", "down": "[red]trending down[/red]", "flat": "[dim]flat[/dim]"}
+    or_trend = _build_trend([r.avg_override_rate for r in rollups])
+    eng_trend = _build_trend([r.avg_engagement_score for r in rollups])
+
+    console.print(f"[bold]Trends ({len(rollups)} {period}s)[/bold]")
+    width = _sparkline_width()
+    console.print(
+        f"  Override rate:    {_sparkline(or_trend.values, width)}  {trend_arrow.get(or_trend.direction, 'flat')}"
+    )
+    console.print(
+        f"  Engagement score: {_sparkline(eng_trend.values, width)}  {trend_arrow.get(eng_trend.direction, 'flat')}"
+    )
+    console.print()
+
+
+@cli.group()
+@click.option(
+    "--catalog",
+    "catalog_path",
+    type=click.Path(dir_okay=False, path_type=Path),
+    default=None,
+    help="Catalog database (default: $DECISION_TRAIL_CATALOG or ~/.cache/decision-trail/sessions.db)",
+)
+@click.pass_context
+def sessions(ctx: click.Context, catalog_path: Path | None):
+    """Catalog of Claude Code session logs.
+
+    `sessions index` records per-session metadata in a SQLite catalog;
+    `sessions list` and `metrics --from-catalog` query it without
+    re-reading the logs.
+    """
+    from .catalog import default_catalog_path
+
+    ctx.obj = catalog_path or default_catalog_path()
+
+
+@sessions.command("index")
+@click.option(
+    "--projects-dir",
+    type=click.Path(exists=True, file_okay=False, path_type=Path),
+    default=None,
+    help="Claude Code projects directory (default: ~/.claude/projects)",
+)
+@click.pass_obj
+def sessions_index(catalog_path: Path, projects_dir: Path | None):
+    """Scan session logs into the catalog, re-reading only files that grew."""
+    from .catalog import default_projects_dir, index_sessions, open_catalog
+
+    projects_dir = projects_dir or default_projects_dir()
+    if not projects_dir.is_dir():
+        console.print(f"[yellow]No projects directory at {projects_dir}.[/yellow]")
+        return
+
+    with closing(open_catalog(catalog_path)) as conn:
+        stats = index_sessions(conn, projects_dir)
+
+    console.print(
+        f"[bold green]Indexed[/bold green] {stats.scanned} session log(s) into {catalog_path}"
+    )
+    console.print(
+        f"  [dim]{stats.added} new, {stats.appended} grown, {stats.rescanned} rewritten, "
+        f"{stats.unchanged} unchanged, {stats.removed} removed; "
+        f"read {stats.bytes_read / 1024:,.0f} KiB[/dim]"
+    )
+
+
+@sessions.command("list")
+@click.option("--project", default=None, help="Project name or cwd substring")
+@click.option("--since", default=None, help="Sessions active on or after this date (YYYY-MM-DD)")
+@click.option("--until", default=None, help="Sessions started on or before this date (YYYY-MM-DD)")
+@click.pass_obj
+def sessions_list(catalog_path: Path, project: str | None, since: str | None, until: str | None):
+    """List cataloged sessions."""
+    from rich.table import Table
+
+    from .catalog import open_catalog, query_sessions
+
+    if not catalog_path.exists():
+        console.print("[yellow]No session catalog yet. Run `decision-trail sessions index` first.[/yellow]")
+        return
+
+    with closing(open_catalog(catalog_path)) as conn:
+        records = query_sessions(conn, project=project, since=since, until=until)
+    if not records:
+        console.print("[yellow]No cataloged sessions match.[/yellow]")
+        return
+
+    table = Table(title=f"Sessions ({len(records)})", pad_edge=False)
+    table.add_column("Started", style="dim", no_wrap=True)
+    table.add_column("Last active", style="dim", no_wrap=True)
+    table.add_column("Project", max_width=40)
+    table.add_column("Session", no_wrap=True)
+    table.add_column("Lines", justify="right", style="cyan")
+    table.add_column("Size", justify="right")
+
+    for r in records:
+        table.add_row(
+            (r.first_ts or "—")[:16].replace("T", " "),
+            (r.last_ts or "—")[:16].replace("T", " "),
+            r.cwd or r.project or "—",
+            (r.session_id or Path(r.path).stem)[:8],
+            f"{r.line_count:,}",
+            f"{r.size / 1024:,.0f} KiB",
+        )
+    console.print(table)
+
+
+@cli.command()
+@click.option("--path", default=".", help="Project root path")
+@click.option(
+    "--from-sessions",
+    "session_dir",
+    type=click.Path(exists=True, file_okay=False, path_type=Path),
+    default=None,
+    help="Also cluster redirects and choices from JSONL session logs in this directory",
+)
+@click.option("--min-size", default=2, help="Smallest group that counts as recurring")
+@click.option("--limit", default=20, help="Maximum number of clusters to show")
+@click.option("--json", "as_json", is_flag=True, help="Print clusters as JSON (for /trail synthesis)")
+def patterns(path: str, session_dir: Path | None, min_size: int, limit: int, as_json: bool):
+    """Find moments that keep recurring across sessions.
+
+    Clusters near-duplicate redirects and choices from digests (and, with
+    --from-sessions, the human side of those in session logs) with
+    MinHash/LSH, and lists each recurring group with its size and date range.
+    """
+    from .clusters import Moment, cluster_moments, digest_moments
+    from .metrics import parse_digest_metrics_text
+    from .pack import iter_digest_texts
+    from .profile import parse_digest_text
+
+    root = Path(path).resolve()
+    digests, dates = [], []
+    for name, text in iter_digest_texts(root):
+        digests.append(parse_digest_text(text))
+        dates.append(parse_digest_metrics_text(text, Path(name).stem).date)
+    moments = digest_moments(digests, dates)
+
+    if session_dir:
+        import re
+
+        from .extractor import SeenEntries, extract_from_session
+
+        seen = SeenEntries()
+        for session_path in sorted(session_dir.glob("*.jsonl")):
+            m = re.match(r"(\d{4}-\d{2}-\d{2})", session_path.stem)
+            for c in extract_from_session(session_path, seen):
+                if c.category in ("redirect", "choice") and c.human_response:
+                    moments.append(Moment(
+                        text=c.human_response,
+                        date=m.group(1) if m else "",
+                        source=session_path.name,
+                    ))
+
+    if not moments:
+        console.print("[yellow]No digests or session moments to cluster.[/yellow]")
+        return
+
+    clusters = cluster_moments(moments, min_size=min_size)[:limit]
+
+    if as_json:
+        import json
+        from dataclasses import asdict
+
+        click.echo(json.dumps([{**asdict(c), "date_range": c.date_range} for c in clusters], indent=2))
+        return
+
+    if not clusters:
+        console.print(f"[yellow]No recurring moments among {len(moments)} yet.[/yellow]")
+        return
+
+    from rich.markup import escape
+
+    console.print(f"[bold]{len(clusters)} recurring moment(s)[/bold] [dim]from {len(moments)} total[/dim]\n")
+    for i, c in enumerate(clusters, 1):
+        console.print(f"[bold cyan]{i}.[/bold cyan] {escape(c.label)} [bold]×{c.count}[/bold]  [dim]{c.date_range}[/dim]")
+        for example in c.examples[1:]:
+            console.print(f"   [dim]also: {escape(example)}[/dim]")
+
+
+@cli.command()
+@click.argument("query", nargs=-1, required=True)
+@click.option("--path", default=".", help="Project root path (its digests are searched too)")
+@click.option(
+    "--projects-dir",
+    type=click.Path(file_okay=False, path_type=Path),
+    default=None,
+    help="Claude Code projects directory (default: ~/.claude/projects)",
+)
+@click.option("--limit", default=20, help="Maximum number of hits")
+@click.option(
+    "--kind",
+    type=click.Choice(["all", "session", "digest"]),
+    default="all",
+    help="Only search session candidates or digest bullets",
+)
+@click.option("--no-update", is_flag=True, help="Query the index as is, without checking for new files")
+def search(
+    query: tuple[str, ...],
+    path: str,
+    projects_dir: Path | None,
+    limit: int,
+    kind: str,
+    no_update: bool,
+):
+    """Search past redirects, choices and digest bullets.
+
+    Decision candidates from every session log and bullets from this
+    project's digests live in a persistent full-text index (SQLite FTS5,
+    ranked by BM25). Each run first re-indexes files that are new or
+    changed, then queries the index.
+    """
+    import time
+
+    from rich.markup import escape
+
+    from .catalog import default_projects_dir
+    from .pack import pack_paths
+    from .search import HIGHLIGHT_END, HIGHLIGHT_START, default_index_path, open_index, search as run_search, update_index
+
+    root = Path(path).resolve()
+    projects_dir = projects_dir or default_projects_dir()
+
+    with closing(open_index(default_index_path())) as conn:
+        if not no_update:
+            session_paths = sorted(projects_dir.rglob("*.jsonl")) if projects_dir.is_dir() else []
+            digest_dir = root / DECISIONS_DIR / "digests"
+            digest_paths = sorted(digest_dir.glob("*.md")) if digest_dir.is_dir() else []
+            stats = update_index(conn, session_paths, digest_paths, pack_paths(root / DECISIONS_DIR))
+            if stats.reindexed or stats.removed:
+                console.print(
+                    f"[dim]Indexed {stats.reindexed} new or changed file(s) "
+                    f"({stats.moments} moments), dropped {stats.removed}.[/dim]"
+                )
+
+        start = time.perf_counter()
+        hits = run_search(conn, " ".join(query), limit=limit, kind=None if kind == "all" else kind)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+
+    if not hits:
+        console.print("[yellow]No matching moments.[/yellow]")
+        return
+
+    console.print(f"[bold]{len(hits)} hit(s)[/bold] [dim]in {elapsed_ms:.1f} ms[/dim]\n")
+    for i, hit in enumerate(hits, 1):
+        snippet = escape(hit.snippet).replace(HIGHLIGHT_START, "[bold yellow]").replace(HIGHLIGHT_END, "[/bold yellow]")
+        console.print(f"[bold cyan]{i}.[/bold cyan] {escape(f'[{hit.category}]')} {snippet}")
+        console.print(f"   [dim]{hit.date or '—'} · {escape(hit.title)} · {escape(hit.path)}[/dim]")
+
+
+@cli.command()
+@click.option("--path", default=".", help="Project root path")
+@click.option(
+    "--before",
+    "before_month",
+    default=None,
+    help="Pack digests from months before this one, YYYY-MM (default: the current month)",
+)
+@click.option("--keep-loose", is_flag=True, help="Leave the packed .md files in place")
+@click.option("--commit", is_flag=True, help="Commit the packs (and removed digests) to git")
+def pack(path: str, before_month: str | None, keep_loose: bool, commit: bool):
+    """Pack older digests into one archive per month.
+
+    Moves decisions/digests/*.md from finished months into
+    decisions/packs/YYYY-MM.pack, which metrics, profile, patterns and
+    search read directly. A loose digest with the same name as a packed
+    one takes precedence, so digests can still be fixed by hand.
+    """
+    import re
+
+    from .pack import pack_digests
+
+    current_month = date.today().strftime("%Y-%m")
+    if before_month is None:
+        before_month = current_month
+    elif not re.fullmatch(r"\d{4}-(0[1-9]|1[0-2])", before_month):
+        raise click.BadParameter("expected YYYY-MM", param_hint="--before")
+    elif before_month > current_month:
+        # The current month's digests are still being numbered
+        raise click.BadParameter(
+            f"can't be later than the current month ({current_month})", param_hint="--before"
+        )
+
+    root = Path(path).resolve()
+    written = pack_digests(root, before_month)
+    if not written:
+        console.print(f"[yellow]No loose digests from before {before_month} to pack.[/yellow]")
+        return
+
+    packed: list[Path] = []
+    for pack_path, loose in written.items():
+        packed.extend(loose)
+        console.print(
+            f"[bold green]Packed:[/bold green] {pack_path.relative_to(root)} "
+            f"[dim]({len(loose)} digest(s))[/dim]"
+        )
+
+    if not keep_loose:
+        for loose_path in packed:
+            loose_path.unlink()
+        console.print(f"[dim]Removed {len(packed)} loose digest(s).[/dim]")
+
+    from .rollups import rollups_path, update_rollups
+
+    # Packing renames every source it touches, so the rollups change too
+    derived: list[Path] = []
+    if rollups_path(root).exists():
+        update_rollups(root)
+        derived.append(rollups_path(root))
+
+    if commit:
+        from .git import git_commit_files, is_git_repo
+
+        if not is_git_repo(root):
+            console.print("[yellow]Not a git repo — skipping commit.[/yellow]")
+            return
+
+        files = list(written) + ([] if keep_loose else packed) + derived
+        sha = git_commit_files(files, f"pack: digests before {before_month}")
+        if sha:
+            console.print(f"[bold green]Committed:[/bold green] {sha}")
+
+
+@cli.command()
+@click.option("--path", default=".", help="Project root path (digests land in its decisions/)")
+@click.option(
+    "--projects-dir",
+    type=click.Path(file_okay=False, path_type=Path),
+    default=None,
+    help="Claude Code projects directory to watch (default: ~/.claude/projects)",
+)
+@click.option("--idle", default=120.0, help="Seconds without writes before a session counts as ended")
+@click.option("--workers", type=click.IntRange(min=1), default=2, help="Sessions digested in parallel")
+@click.option("--poll", is_flag=True, help="Poll for changes instead of using inotify")
+@click.option("--interval", default=5.0, help="Seconds between scans when polling")
+@click.option("--backfill", is_flag=True, help="Also digest existing sessions that have no digest yet")
+@click.option(
+    "--all-projects",
+    is_flag=True,
+    help="Digest sessions from every project, not just the one run in --path",
+)
+@click.option("--commit", is_flag=True, help="Commit each batch of new digests to git")
+def watch(
+    path: str,
+    projects_dir: Path | None,
+    idle: float,
+    workers: int,
+    poll: bool,
+    interval: float,
+    backfill: bool,
+    all_projects: bool,
+    commit: bool,
+):
+    """Digest Claude Code sessions automatically as they end.
+
+    Watches the sessions of the project at --path (or of every project
+    with --all-projects; inotify on Linux, polling elsewhere), waits
+    until a session log has been quiet for --idle seconds, then writes
+    its digest. A session that is resumed later has its digest rewritten
+    in place. Sessions that end together are committed together with
+    --commit.
+    """
+    import time
+
+    from .catalog import default_projects_dir, project_dir_name
+    from .rollups import rollups_path, update_rollups
+    from .watch import Ingester, InotifySource, open_source, run
+
+    root = Path(path).resolve()
+    projects_dir = (projects_dir or default_projects_dir()).resolve()
+    project = None if all_projects else project_dir_name(root)
+
+    source = open_source(projects_dir, poll=poll, interval=interval, project=project)
+    ingester = Ingester(root, idle_seconds=idle, workers=workers)
+
+    # Sessions that changed while nobody was watching are due straight away
+    overdue = time.monotonic() - idle
+    ingester.touch(
+        [p for p in source.existing() if (backfill or ingester.known(p)) and not ingester.is_current(p)],
+        now=overdue,
+    )
+
+    def on_batch(events):
+        written = []
+        for event in events:
+            if event.error is not None:
+                console.print(f"[red]Failed:[/red] {event.session_path} ({event.error})")
+                continue
+            written.append(event.digest_path)
+            console.print(
+                f"[bold green]Digest written:[/bold green] {event.digest_path.relative_to(root)} "
+                f"[dim]({event.session_path.name})[/dim]"
+            )
+        if not written:
+            return
+        if rollups_path(root).exists():
+            update_rollups(root)
+            written.append(rollups_path(root))
+        if commit:
+            from .git import clear_repo_cache, git_commit_files, is_git_repo
+
+            clear_repo_cache()  # the repo may have been created or moved since the last batch
+            if not is_git_repo(root):
+                console.print("[yellow]Not a git repo — skipping commit.[/yellow]")
+                return
+            sessions = len(written) - (rollups_path(root) in written)
+            commit_msg = f"digest: {date.today().isoformat()}"
+            if sessions > 1:
+                commit_msg += f" ({sessions} sessions)"
+            sha = git_commit_files(written, commit_msg)
+            if sha:
+                console.print(f"[bold green]Committed:[/bold green] {sha}")
+
+    how = "inotify" if isinstance(source, InotifySource) else f"polling every {interval:g}s"
+    watched = projects_dir if project is None else projects_dir / project
+    console.print(f"[bold green]Watching[/bold green] {watched} [dim]({how}, idle after {idle:g}s)[/dim]")
+    console.print("[dim]Press Ctrl+C to stop.[/dim]\n")
+
+    try:
+        run(ingester, source, lambda: False, on_batch)
+    except KeyboardInterrupt:
+        console.print("\n[dim]Stopped.[/dim]")
+    finally:
+        ingester.close()
+        source.close()
+
+
+@cli.command()
+@click.option(
+    "--socket",
+    "socket_path",
+    type=click.Path(path_type=Path),
+    default=None,
+    help="Socket to listen on (default: $DECISION_TRAIL_SOCKET or the user runtime dir)",
+)
+@click.option("--stop", is_flag=True, help="Stop a running daemon")
+def daemon(socket_path: Path | None, stop: bool):
+    """Keep parsed sessions, digests and templates warm in one process.
+
+    While the daemon runs, extract, digest, metrics and profile forward
+    their work to it over a Unix socket instead of cold-starting. When it
+    isn't running they work in-process as usual.
+    """
+    from .daemon import DaemonError, default_socket_path, make_server, stop_daemon
+
+    socket_path = socket_path or default_socket_path()
+
+    if stop:
+        if stop_daemon(socket_path):
+            console.print("[dim]Daemon stopped.[/dim]")
+        else:
+            console.print("[yellow]No daemon running.[/yellow]")
+        return
+
+    try:
+        server = make_server(socket_path)
+    except DaemonError as exc:
+        console.print(f"[yellow]{exc}[/yellow]")
+        return
+
+    console.print(f"[bold green]Daemon listening on[/bold green] {socket_path}")
+    console.print("[dim]Press Ctrl+C to stop.[/dim]\n")
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        console.print("\n[dim]Stopped.[/dim]")
+    finally:
+        server.server_close()
+
+
 @cli.command()
 @click.option("--path", default=".", help="Project root path")
 @click.option("--port", default=8000, help="Port for local preview")
-def serve(path: str, port: int):
+@click.option(
+    "--watch",
+    is_flag=True,
+    help="Serve from memory, rebuild when digests or synthesis change, and live-reload the browser",
+)
+@click.option("--interval", default=1.0, help="Seconds between change checks with --watch")
+def serve(path: str, port: int, watch: bool, interval: float):
     """Local preview of your HTML profile.
 
     Generates the HTML profile and serves it at http://localhost:PORT.
+    With --watch, nothing is written to disk: the page is rebuilt in memory
+    whenever decisions/digests or decisions/synthesis change.
     """
+    root = Path(path).resolve()
+
+    if watch:
+        _serve_watch(root, port, interval)
+        return
+
     import http.server
     import functools
 
     from .profile import build_profile
     from .renderer import write_profile
 
-    root = Path(path).resolve()
     data = build_profile(root)
 
     if data.total_sessions == 0:
@@ -294,12 +1366,49 @@ def serve(path: str, port: int):
     console.print("[dim]Press Ctrl+C to stop.[/dim]\n")
 
     handler = functools.partial(http.server.SimpleHTTPRequestHandler, directory=str(serve_dir))
-    server = http.server.HTTPServer(("", port), handler)
+    server = http.server.ThreadingHTTPServer(("", port), handler)
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        console.print("\n[dim]Stopped.[/dim]")
+        server.server_close()
+
+
+def _serve_watch(root: Path, port: int, interval: float):
+    """Serve the profile from memory and rebuild it as files change."""
+    import threading
+
+    from .server import LiveProfile, make_live_server
+
+    live = LiveProfile(root)
+    live.rebuild()
+
+    if live.data.total_sessions == 0:
+        console.print("[yellow]No digests yet — the page will update when one lands.[/yellow]")
+
+    def on_rebuild(data, error):
+        if error is not None:
+            console.print(f"[red]Rebuild failed:[/red] {error}")
+        else:
+            console.print(f"[dim]Rebuilt: {data.total_sessions} session(s).[/dim]")
+
+    stop = threading.Event()
+    watcher = threading.Thread(
+        target=live.watch, args=(stop, interval, on_rebuild), daemon=True,
+    )
+    watcher.start()
+
+    server = make_live_server(live, port)
+    console.print(f"[bold green]Serving profile at[/bold green] http://localhost:{port}")
+    console.print("[dim]Watching decisions/ for changes. Press Ctrl+C to stop.[/dim]\n")
 
     try:
         server.serve_forever()
     except KeyboardInterrupt:
         console.print("\n[dim]Stopped.[/dim]")
+    finally:
+        stop.set()
         server.server_close()
 
 
@@ -0,0 +1,250 @@
+"""Recurring-moment mining: near-duplicate clustering of redirects and bullets.
+
+The same judgment call tends to come back in different words ("no mocks,
+hit the real db" / "don't mock the database"). To find those without
+comparing every pair of moments:
+
+1. Each moment's normalized text is cut into character shingles.
+2. One-permutation MinHash turns the shingle set into a fixed-size
+   signature: each shingle hash goes to one of ``NUM_BINS`` bins and
+   each bin keeps its minimum. Empty bins borrow from the next non-empty
+   one, so short texts still get full signatures.
+3. LSH banding splits the signature into ``BANDS`` bands. Moments that
+   share any band land in the same bucket, and each is compared only
+   with the cluster leader of that bucket's first member.
+4. A moment joins the first cluster whose leader (its earliest member)
+   it matches. Comparing against the leader rather than any member
+   keeps chains of near-matches (a~b, b~c, ...) from merging unrelated
+   moments into one cluster.
+
+Cost is linear in the number of moments, so 100k+ moments cluster in
+seconds with the standard library alone. Callers that rebuild often
+(profile.ProfileCache) keep each moment's ``sketch`` (steps 1–2 depend
+only on its text) and a ``ClusterIndex`` that new moments are added to.
+"""
+
+from __future__ import annotations
+
+import re
+import zlib
+from collections import Counter
+from dataclasses import dataclass, field
+from operator import eq
+from typing import Iterable, Optional
+
+from . import timings
+
+SHINGLE_SIZE = 5
+NUM_BINS = 32
+BANDS = 8
+ROWS = NUM_BINS // BANDS
+
+# Fraction of agreeing signature bins for two moments to join a cluster
+# (roughly their estimated Jaccard similarity)
+SIMILARITY = 0.5
+
+MIN_CLUSTER_SIZE = 2
+
+_BIN_BITS = NUM_BINS.bit_length() - 1
+_BIN_MASK = NUM_BINS - 1
+_EMPTY = 1 << 32
+
+
+@dataclass
+class Moment:
+    """One piece of text to cluster: a digest bullet or a candidate's response."""
+
+    text: str
+    date: str = ""
+    source: str = ""
+
+
+@dataclass
+class Cluster:
+    """A group of near-duplicate moments."""
+
+    label: str  # the most common phrasing
+    count: int
+    first_date: str
+    last_date: str
+    examples: list[str] = field(default_factory=list)  # distinct phrasings, label first
+
+    @property
+    def date_range(self) -> str:
+        if not self.first_date:
+            return ""
+        if self.first_date == self.last_date:
+            return self.first_date
+        return f"{self.first_date} to {self.last_date}"
+
+
+def _normalize(text: str) -> str:
+    return " ".join(re.findall(r"\w+", text.lower()))
+
+
+def _shingle_hashes(normalized: str) -> set[int]:
+    # Byte shingles: cheaper than encoding each character slice, and
+    # splitting a multi-byte character only changes which hashes we get
+    data = normalized.encode()
+    if len(data) <= SHINGLE_SIZE:
+        return {zlib.crc32(data)} if data else set()
+    crc32 = zlib.crc32
+    return {crc32(data[i:i + SHINGLE_SIZE]) for i in range(len(data) - SHINGLE_SIZE + 1)}
+
+
+def signature(hashes: Iterable[int]) -> list[int]:
+    """One-permutation MinHash signature of a set of 32-bit shingle hashes."""
+    bins = [_EMPTY] * NUM_BINS
+    for h in hashes:
+        b = h & _BIN_MASK
+        v = h >> _BIN_BITS
+        if v < bins[b]:
+            bins[b] = v
+
+    # Rotation densification: an empty bin takes the next non-empty bin's
+    # value, offset by the distance so borrowed values rarely collide
+    if _EMPTY not in bins:
+        return bins
+    dense = bins[:]
+    nearest, distance = _EMPTY, 0
+    # Two passes right to left, so bins near the end can wrap around
+    for i in range(2 * NUM_BINS - 1, -1, -1):
+        v = bins[i & _BIN_MASK]
+        if v != _EMPTY:
+            nearest, distance = v, 0
+        else:
+            distance += 1
+            if nearest != _EMPTY and i < NUM_BINS:
+                dense[i] = nearest + distance * _EMPTY
+    return dense
+
+
+def sketch(text: str) -> tuple[str, Optional[list[int]]]:
+    """(normalized text, MinHash signature) of a moment; no signature if it has no words."""
+    normalized = _normalize(text)
+    return normalized, signature(_shingle_hashes(normalized)) if normalized else None
+
+
+def _agreement(a: list[int], b: list[int]) -> float:
+    return sum(map(eq, a, b)) / NUM_BINS
+
+
+class ClusterIndex:
+    """LSH buckets and cluster leaders over the signatures added so far.
+
+    Matching depends on the order moments arrive in, so an index can only
+    be extended with moments that come after the ones already in it. A
+    caller whose moment list grows at the end (new digests sort last)
+    keeps the index between builds and pays only for the new moments.
+    """
+
+    def __init__(self, similarity: float = SIMILARITY):
+        self.similarity = similarity
+        self.signatures: list[Optional[list[int]]] = []
+        self._parent: list[int] = []
+        self._buckets: dict[tuple, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.signatures)
+
+    def find(self, i: int) -> int:
+        parent = self._parent
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    def extend(self, signatures: Iterable[Optional[list[int]]]) -> None:
+        find = self.find
+        for sig in signatures:
+            i = len(self.signatures)
+            self.signatures.append(sig)
+            self._parent.append(i)
+            if sig is None:
+                continue
+            for band in range(BANDS):
+                key = (band, *sig[band * ROWS:(band + 1) * ROWS])
+                rep = self._buckets.setdefault(key, i)
+                if rep == i:
+                    continue
+                leader = find(rep)
+                if _agreement(sig, self.signatures[leader]) >= self.similarity:
+                    self._parent[i] = leader
+                    break
+
+
+def cluster_moments(
+    moments: list[Moment],
+    min_size: int = MIN_CLUSTER_SIZE,
+    similarity: float = SIMILARITY,
+    sketches: Optional[list[tuple[str, Optional[list[int]]]]] = None,
+    index: Optional[ClusterIndex] = None,
+) -> list[Cluster]:
+    """Group near-duplicate moments; return clusters of at least ``min_size``.
+
+    ``sketches``, if given, are the moments' precomputed ``sketch`` values
+    in the same order. ``index``, if given, already holds a prefix of
+    these moments and is extended with the rest. Clusters come back
+    largest first, then most recently seen first.
+    """
+    with timings.stage("clusters.signatures"):
+        if sketches is None:
+            sketches = [sketch(m.text) for m in moments]
+        normalized = [n for n, _ in sketches]
+        signatures = [sig for _, sig in sketches]
+
+    if index is None:
+        index = ClusterIndex(similarity)
+    with timings.stage("clusters.lsh"):
+        index.extend(signatures[len(index):])
+    find = index.find
+
+    groups: dict[int, list[int]] = {}
+    for i, sig in enumerate(signatures):
+        if sig is not None:
+            groups.setdefault(find(i), []).append(i)
+
+    clusters: list[Cluster] = []
+    for members in groups.values():
+        if len(members) < min_size:
+            continue
+        phrasings = Counter(normalized[i] for i in members)
+        first_text: dict[str, str] = {}
+        for i in members:
+            first_text.setdefault(normalized[i], moments[i].text)
+        ranked = sorted(phrasings, key=lambda n: (-phrasings[n], len(n), n))
+        dates = sorted(moments[i].date for i in members if moments[i].date)
+        clusters.append(Cluster(
+            label=first_text[ranked[0]],
+            count=len(members),
+            first_date=dates[0] if dates else "",
+            last_date=dates[-1] if dates else "",
+            examples=[first_text[n] for n in ranked[:3]],
+        ))
+
+    clusters.sort(key=lambda c: c.last_date, reverse=True)
+    clusters.sort(key=lambda c: c.count, reverse=True)
+    timings.count("clusters.moments", len(moments))
+    timings.count("clusters.found", len(clusters))
+    return clusters
+
+
+def digest_moments(digests, dates: Optional[list[str]] = None) -> list[Moment]:
+    """Redirect and choice bullets from parsed digests (profile.DigestData) as moments.
+
+    ``dates`` are the digests' session dates, in the same order (e.g. from
+    metrics.parse_digest_metrics_text, which reads both title formats);
+    without them each digest's title date is used.
+    """
+    if dates is None:
+        dates = [d.date for d in digests]
+    return [
+        Moment(text=decision, date=day, source=d.topic)
+        for d, day in zip(digests, dates)
+        for decision in d.decisions
+    ]
+
+
+def digest_sketches(digest) -> list[tuple[str, Optional[list[int]]]]:
+    """Sketches of one digest's decisions, in ``digest_moments`` order."""
+    return [sketch(decision) for decision in digest.decisions]
@@ -0,0 +1,283 @@
+"""Long-running daemon that keeps parsed state warm between CLI invocations.
+
+``decision-trail daemon`` listens on a Unix domain socket and answers
+``extract``, ``digest``, ``metrics`` and ``profile`` requests from the CLI.
+It keeps extracted session candidates, parsed digests and synthesis files
+and the compiled templates in memory, re-reading only files whose mtime or
+size changed.
+
+The wire protocol is one JSON object per line: the client sends
+``{"op": ..., "args": {...}}`` and reads back ``{"ok": true, "result": ...}``
+or ``{"ok": false, "error": "..."}``. Every path in a request is absolute.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import socket
+import socketserver
+import threading
+from collections import OrderedDict
+from dataclasses import asdict
+from pathlib import Path
+from typing import Any, Optional
+
+PROTOCOL_VERSION = 1
+
+# Sessions whose candidates stay cached; older entries are evicted first
+SESSION_CACHE_SIZE = 256
+
+CONNECT_TIMEOUT = 2.0
+
+
+class DaemonError(RuntimeError):
+    """The daemon was reachable but could not answer a request."""
+
+
+def default_socket_path() -> Path:
+    """Where the daemon listens unless told otherwise."""
+    override = os.environ.get("DECISION_TRAIL_SOCKET")
+    if override:
+        return Path(override)
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR")
+    base = Path(runtime_dir) if runtime_dir else Path.home() / ".cache" / "decision-trail"
+    return base / "decision-trail.sock"
+
+
+def _stamp(path: Path) -> tuple[int, int]:
+    st = path.stat()
+    return st.st_mtime_ns, st.st_size
+
+
+# ---------------------------------------------------------------------------
+# Server side
+# ---------------------------------------------------------------------------
+
+class DaemonState:
+    """Warm caches shared by all requests."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._sessions: OrderedDict[Path, tuple[tuple[int, int], list]] = OrderedDict()
+        self._profiles: dict[Path, Any] = {}  # root -> ProfileCache
+        self._digest_metrics: dict[Path, dict] = {}  # root -> {path: (stamp, SessionMetrics)}
+        self._packed_metrics: dict[Path, dict] = {}  # root -> {pack: (stamp, {name: SessionMetrics})}
+
+    def candidates(self, session_path: Path) -> list:
+        """Extracted candidates for a session, re-extracted only if the file changed."""
+        from .extractor import extract_from_session
+
+        stamp = _stamp(session_path)
+        with self._lock:
+            cached = self._sessions.get(session_path)
+            if cached and cached[0] == stamp:
+                self._sessions.move_to_end(session_path)
+                return cached[1]
+
+        candidates = extract_from_session(session_path)
+        with self._lock:
+            self._sessions[session_path] = (stamp, candidates)
+            self._sessions.move_to_end(session_path)
+            while len(self._sessions) > SESSION_CACHE_SIZE:
+                self._sessions.popitem(last=False)
+        return candidates
+
+    def profile_data(self, root: Path):
+        from .profile import ProfileCache
+
+        with self._lock:
+            cache = self._profiles.setdefault(root, ProfileCache(root))
+            cache.refresh()
+            return cache.build()
+
+    def digest_metrics(self, root: Path) -> list:
+        from .metrics import parse_digest_metrics, parse_digest_metrics_text
+        from .pack import PACK_DIR, PACK_SUFFIX, merge_parsed, parse_pack
+        from .profile import _refresh_dir
+
+        def parse_packed(path: Path) -> dict:
+            return parse_pack(path, lambda name, text: parse_digest_metrics_text(text, Path(name).stem))
+
+        with self._lock:
+            cache = self._digest_metrics.setdefault(root, {})
+            packs = self._packed_metrics.setdefault(root, {})
+            _refresh_dir(root / "decisions" / "digests", cache, parse_digest_metrics)
+            _refresh_dir(root / "decisions" / PACK_DIR, packs, parse_packed, pattern=f"*{PACK_SUFFIX}")
+            return merge_parsed(cache, packs)
+
+
+def _op_ping(state: DaemonState, args: dict) -> dict:
+    return {"version": PROTOCOL_VERSION, "pid": os.getpid()}
+
+
+def _op_extract(state: DaemonState, args: dict) -> list:
+    return [asdict(c) for c in state.candidates(Path(args["session_path"]))]
+
+
+def _op_digest(state: DaemonState, args: dict) -> dict:
+    from .digest import generate_digest
+
+    session_path = Path(args["session_path"])
+    candidates = state.candidates(session_path)
+    return {
+        "candidates": [asdict(c) for c in candidates],
+        "digest": generate_digest(session_path, candidates),
+    }
+
+
+def _op_metrics(state: DaemonState, args: dict) -> list:
+    from .metrics import collect_from_sessions
+
+    if args.get("session_paths"):
+        sessions = collect_from_sessions(
+            [Path(p) for p in args["session_paths"]], sidechains=args.get("sidechains", "drop"),
+        )
+    else:
+        sessions = state.digest_metrics(Path(args["root"]))
+    return [asdict(s) for s in sessions]
+
+
+def _op_profile(state: DaemonState, args: dict) -> dict:
+    from .renderer import write_profile
+
+    root = Path(args["root"])
+    data = state.profile_data(root)
+    written: list[Path] = []
+    if data.total_sessions:
+        written = write_profile(data, root, args.get("fmt", "md"), static=args.get("static", False))
+    return {
+        "written": [str(p) for p in written],
+        "total_sessions": data.total_sessions,
+        "active_since": data.active_since,
+        "highlighted_moments": len(data.highlighted_moments),
+    }
+
+
+OPERATIONS = {
+    "ping": _op_ping,
+    "extract": _op_extract,
+    "digest": _op_digest,
+    "metrics": _op_metrics,
+    "profile": _op_profile,
+}
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    def handle(self):
+        line = self.rfile.readline()
+        if not line:
+            return
+        shutdown = False
+        try:
+            request = json.loads(line)
+            name = request.get("op")
+            if name == "shutdown":
+                shutdown = True
+                response = {"ok": True, "result": {"stopped": True}}
+            elif name in OPERATIONS:
+                result = OPERATIONS[name](self.server.state, request.get("args") or {})
+                response = {"ok": True, "result": result}
+            else:
+                raise DaemonError(f"unknown operation: {name!r}")
+        except Exception as exc:  # report, keep serving
+            response = {"ok": False, "error": f"{type(exc).__name__}: {exc}"}
+        self.wfile.write(json.dumps(response).encode() + b"\n")
+
+        if shutdown:
+            # shutdown() blocks until serve_forever returns, so not from this thread
+            threading.Thread(target=self.server.shutdown, daemon=True).start()
+
+
+# UnixStreamServer is missing on platforms without AF_UNIX; make_server refuses there
+_UnixStreamServer = getattr(socketserver, "UnixStreamServer", socketserver.TCPServer)
+
+
+class DaemonServer(socketserver.ThreadingMixIn, _UnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, socket_path: Path):
+        self.state = DaemonState()
+        self.socket_path = socket_path
+        super().__init__(str(socket_path), _Handler)
+
+    def server_bind(self):
+        super().server_bind()
+        os.chmod(self.socket_path, 0o600)
+
+    def server_close(self):
+        super().server_close()
+        try:
+            self.socket_path.unlink()
+        except FileNotFoundError:
+            pass
+
+
+def make_server(socket_path: Path) -> DaemonServer:
+    """Bind the daemon socket, replacing a stale one. Raises DaemonError if one is live."""
+    if not hasattr(socket, "AF_UNIX"):
+        raise DaemonError("Unix domain sockets are not available on this platform")
+
+    socket_path.parent.mkdir(parents=True, exist_ok=True, mode=0o700)
+    if socket_path.exists():
+        if request("ping", socket_path=socket_path) is not None:
+            raise DaemonError(f"a daemon is already listening on {socket_path}")
+        socket_path.unlink()  # left behind by a daemon that died
+    return DaemonServer(socket_path)
+
+
+# ---------------------------------------------------------------------------
+# Client side
+# ---------------------------------------------------------------------------
+
+def request(op: str, socket_path: Optional[Path] = None, **args) -> Optional[Any]:
+    """Send one request to the daemon.
+
+    Returns the result, or None when no daemon is reachable so callers can
+    fall back to doing the work in-process. Raises DaemonError if the daemon
+    answered with an error.
+    """
+    if not hasattr(socket, "AF_UNIX"):
+        return None
+
+    path = socket_path or default_socket_path()
+    if not path.exists():
+        return None
+
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(CONNECT_TIMEOUT)
+            sock.connect(str(path))
+            sock.settimeout(None)  # large metrics runs can take a while
+            payload = {"op": op, "args": args}
+            sock.sendall(json.dumps(payload).encode() + b"\n")
+            with sock.makefile("rb") as f:
+                line = f.readline()
+    except OSError:
+        return None
+
+    try:
+        response = json.loads(line)
+    except ValueError:  # empty, truncated or garbled reply
+        return None
+    if not isinstance(response, dict):
+        return None
+    if not response.get("ok"):
+        raise DaemonError(response.get("error", "unknown daemon error"))
+    return response.get("result")
+
+
+def stop_daemon(socket_path: Optional[Path] = None) -> bool:
+    """Ask the daemon to shut down. Returns False if none answered.
+
+    A socket file nobody answers on is left behind by a daemon that died;
+    it is removed.
+    """
+    path = socket_path or default_socket_path()
+    if request("shutdown", socket_path=path) is not None:
+        return True
+    try:
+        path.unlink()
+    except FileNotFoundError:
+        pass
+    return False
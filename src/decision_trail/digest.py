@@ -11,11 +11,17 @@ from datetime import date
 from pathlib import Path
 from typing import List
 
+from . import timings
 from .extractor import DecisionCandidate, _load_session
 
 
 def generate_digest(session_path: Path, candidates: List[DecisionCandidate]) -> str:
     """Generate a markdown digest from session data and extracted candidates."""
+    with timings.stage("digest.generate"):
+        return _generate_digest(session_path, candidates)
+
+
+def _generate_digest(session_path: Path, candidates: List[DecisionCandidate]) -> str:
     messages = _load_session(session_path)
 
     human_msgs = [m for m in messages if m["role"] == "human"]
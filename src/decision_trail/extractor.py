@@ -3,10 +3,16 @@
 from __future__ import annotations
 
 import json
-from dataclasses import dataclass
+import re
+from dataclasses import dataclass, field
 from pathlib import Path
 from typing import List, Optional
 
+from . import timings
+
+# Read size when skipping the rest of an oversized line
+CHUNK_SIZE = 64 * 1024
+
 
 @dataclass
 class DecisionCandidate:
@@ -18,6 +24,7 @@ class DecisionCandidate:
     category: str  # "redirect" | "choice" | "significant_change"
     turn_index: int
     confidence: str = "medium"
+    sidechain: bool = False  # found in a subagent conversation, not the main one
 
     def display(self) -> str:
         lines = [
@@ -48,45 +55,186 @@ CHOICE_SIGNALS = [
 ]
 
 
+_MAX_SIGNAL_LEN = max(len(s) for s in REDIRECT_SIGNALS + CHOICE_SIGNALS)
+
+
+@dataclass
+class TextLimits:
+    """Bounds on how much of a session's text the extractor holds or scans.
+
+    A single multi-MB JSONL line or a 20 MB assistant turn would otherwise
+    be copied several times over. Lines longer than ``max_line_bytes`` are
+    skipped without being held in memory. Only the first ``max_turn_chars``
+    of a turn are scanned for signals. Only ``prefix_chars`` of normalized
+    text are kept per turn for summaries.
+    """
+    max_line_bytes: int = 8 * 1024 * 1024
+    max_turn_chars: int = 1024 * 1024
+    prefix_chars: int = 512
+
+
+LIMITS = TextLimits()
+
+
+def configure(max_line_bytes: Optional[int] = None, max_turn_chars: Optional[int] = None) -> None:
+    """Override the default text limits for this process."""
+    global LIMITS
+    LIMITS = TextLimits(
+        max_line_bytes=max_line_bytes or LIMITS.max_line_bytes,
+        max_turn_chars=max_turn_chars or LIMITS.max_turn_chars,
+        prefix_chars=LIMITS.prefix_chars,
+    )
+
+
 @dataclass
 class Turn:
     """A grouped conversation turn — one human or one assistant (possibly multi-line)."""
     role: str  # "human" | "assistant"
-    content: str  # merged text from all entries in this turn
-    raw_entries: list  # original JSONL entries
+    content: str  # normalized prefix of the merged text (at most LIMITS.prefix_chars)
+    raw_entries: list  # slimmed entries: uuid and the _role/_text/_files fields
     files_changed: set  # files written/edited during this turn
+    seen: bool = False  # every entry was already processed in another file
+    redirect_signal: bool = False  # human turn contains a REDIRECT_SIGNALS phrase
+    choice_signal: bool = False  # assistant turn contains a CHOICE_SIGNALS phrase
+    truncated: bool = False  # text past LIMITS.max_turn_chars was not scanned
 
 
-def extract_from_session(session_path: Path) -> List[DecisionCandidate]:
-    """Parse a Claude Code JSONL session and identify decision moments."""
-    turns = _load_session_grouped(session_path)
-    if not turns:
+@dataclass
+class SeenEntries:
+    """Entry uuids already processed in a run over several session logs.
+
+    A resumed or forked session repeats the conversation it came from.
+    Sharing one SeenEntries across a run lets the extractor recognise those
+    entries: they still give context to the first new turn but produce no
+    candidates, so each decision is counted once.
+    """
+    uuids: set = field(default_factory=set)
+    last_new: int = 0  # uuid-bearing entries the last file added
+    last_duplicates: int = 0  # entries the last file repeated
+
+    @property
+    def last_was_duplicate(self) -> bool:
+        """The last file only repeated entries from earlier files."""
+        return self.last_duplicates > 0 and self.last_new == 0
+
+
+# How subagent (sidechain) conversations are treated
+SIDECHAIN_MODES = ("drop", "separate")
+
+
+def extract_from_session(
+    session_path: Path,
+    seen: Optional[SeenEntries] = None,
+    sidechains: str = "drop",
+) -> List[DecisionCandidate]:
+    """Parse a Claude Code JSONL session and identify decision moments.
+
+    Only the main conversation chain is classified. With
+    ``sidechains="separate"`` each subagent conversation is classified on
+    its own as well and its candidates are flagged ``sidechain``.
+
+    Pass the same ``seen`` for every file in a run to skip entries already
+    processed in another file; this file's uuids are added to it afterwards.
+    """
+    main, side_runs = _load_chains(session_path, seen, keep_sidechains=sidechains == "separate")
+    turns = _grouped(main)
+    if not turns and not side_runs:
         return []
 
-    candidates = []
+    with timings.stage("extract.classify"):
+        candidates = _classify_turns(turns)
+        for run in side_runs:
+            for c in _classify_turns(_group_turns(run)):
+                c.sidechain = True
+                candidates.append(c)
+
+    if timings.enabled():
+        timings.count("extract.candidates", len(candidates))
+        for c in candidates:
+            timings.count(f"extract.candidates.{c.category}")
+    return candidates
 
-    for i, turn in enumerate(turns):
-        if turn.role != "human" or i == 0:
-            continue
 
-        # Find the preceding assistant turn
-        prev_assistant = None
-        for j in range(i - 1, -1, -1):
-            if turns[j].role == "assistant":
-                prev_assistant = turns[j]
-                break
+@dataclass
+class DecisionCounts:
+    """How many candidates of each category a session has."""
+    redirect: int = 0
+    choice: int = 0
+    significant_change: int = 0
 
-        if not prev_assistant:
-            continue
 
-        human_text = turn.content
+# Counting needs just enough prefix to spot "[Request interrupted"
+_COUNT_PREFIX_CHARS = 32
+
+
+def count_decisions(
+    session_path: Path,
+    seen: Optional[SeenEntries] = None,
+    sidechains: str = "drop",
+) -> DecisionCounts:
+    """Classify a session like extract_from_session, but only count.
+
+    No DecisionCandidate objects or summaries are built, and turns keep
+    only a few characters of text. This is what metrics needs.
+    """
+    main, side_runs = _load_chains(session_path, seen, keep_sidechains=sidechains == "separate")
+    limits = TextLimits(
+        max_line_bytes=LIMITS.max_line_bytes,
+        max_turn_chars=LIMITS.max_turn_chars,
+        prefix_chars=_COUNT_PREFIX_CHARS,
+    )
+
+    counts = DecisionCounts()
+    with timings.stage("extract.group_turns"):
+        runs = [_group_turns(main, limits)] + [_group_turns(run, limits) for run in side_runs]
+    with timings.stage("extract.classify"):
+        for turns in runs:
+            for category, _, _, _ in _decisions(turns):
+                setattr(counts, category, getattr(counts, category) + 1)
+
+    if timings.enabled():
+        timings.count("extract.turns", len(runs[0]))
+        for category in ("redirect", "choice", "significant_change"):
+            n = getattr(counts, category)
+            timings.count("extract.candidates", n)
+            timings.count(f"extract.candidates.{category}", n)
+    return counts
+
+
+def _decisions(turns: List[Turn]):
+    """Yield (category, turn_index, human_turn, prev_assistant) for each decision moment."""
+    prev_assistant = None  # nearest preceding assistant turn
+
+    for i, turn in enumerate(turns):
+        if turn.role == "assistant":
+            prev_assistant = turn
+            continue
+        if turn.role != "human" or i == 0 or turn.seen or not prev_assistant:
+            continue
 
         # Skip empty or system messages
-        if not human_text.strip() or human_text.startswith("[Request interrupted"):
+        if not turn.content.strip() or turn.content.startswith("[Request interrupted"):
             continue
 
-        # Check for redirections
-        if _check_redirect(human_text, prev_assistant.content):
+        # Redirections first; otherwise a choice if the AI presented options
+        if turn.redirect_signal:
+            yield "redirect", i, turn, prev_assistant
+        elif prev_assistant.choice_signal:
+            yield "choice", i, turn, prev_assistant
+
+        # Significant file changes in the assistant turn
+        if prev_assistant.files_changed and len(prev_assistant.files_changed) >= 3:
+            yield "significant_change", i, turn, prev_assistant
+
+
+def _classify_turns(turns: List[Turn]) -> List[DecisionCandidate]:
+    """Turn grouped turns into decision candidates."""
+    candidates = []
+
+    for category, i, turn, prev_assistant in _decisions(turns):
+        human_text = turn.content
+
+        if category == "redirect":
             candidates.append(DecisionCandidate(
                 summary=_summarize(human_text, 80),
                 context=_summarize(prev_assistant.content, 200),
@@ -95,9 +243,7 @@ def extract_from_session(session_path: Path) -> List[DecisionCandidate]:
                 category="redirect",
                 turn_index=i,
             ))
-
-        # Check for choices (AI presented options, human picked)
-        elif _check_choice(prev_assistant.content, human_text):
+        elif category == "choice":
             candidates.append(DecisionCandidate(
                 summary=f"Chose: {_summarize(human_text, 60)}",
                 context=_summarize(prev_assistant.content, 200),
@@ -106,9 +252,7 @@ def extract_from_session(session_path: Path) -> List[DecisionCandidate]:
                 category="choice",
                 turn_index=i,
             ))
-
-        # Check for significant file changes in the assistant turn
-        if prev_assistant.files_changed and len(prev_assistant.files_changed) >= 3:
+        else:
             files_str = ", ".join(sorted(prev_assistant.files_changed)[:5])
             candidates.append(DecisionCandidate(
                 summary=f"Significant changes: {files_str}",
@@ -122,82 +266,259 @@ def extract_from_session(session_path: Path) -> List[DecisionCandidate]:
     return candidates
 
 
-def _load_session_grouped(session_path: Path) -> List[Turn]:
+def _load_session_grouped(session_path: Path, seen: Optional[SeenEntries] = None) -> List[Turn]:
     """Load JSONL session and group consecutive same-role entries into turns.
 
     Claude Code writes multiple JSONL lines per assistant turn (thinking, text,
     tool_use as separate entries). This groups them so we get clean human→assistant
-    turn pairs.
+    turn pairs. Only the main conversation chain is included.
     """
-    raw_entries = _load_raw_entries(session_path)
-    if not raw_entries:
+    main, _ = _load_chains(session_path, seen, keep_sidechains=False)
+    return _grouped(main)
+
+
+def _grouped(entries: List[dict]) -> List[Turn]:
+    if not entries:
         return []
+    with timings.stage("extract.group_turns"):
+        turns = _group_turns(entries)
+    timings.count("extract.turns", len(turns))
+    return turns
+
+
+def _load_chains(
+    session_path: Path,
+    seen: Optional[SeenEntries],
+    keep_sidechains: bool,
+) -> tuple[List[dict], List[List[dict]]]:
+    """Split a session's entries into the main chain and sidechain runs.
+
+    Claude Code links every entry to its parent by ``parentUuid``. Subagent
+    conversations (``isSidechain``) are interleaved with the main one, and
+    rewinding or editing a message leaves the abandoned branch in the file.
+    The main chain is the path from the last main-conversation entry back
+    to the root; everything off it is dropped. Logs without uuids keep
+    their file order.
+    """
+    parents: dict = {}
+    raw_entries = _load_raw_entries(session_path, seen, parents)
+    if not raw_entries:
+        return [], []
+
+    with timings.stage("extract.chain"):
+        main = [e for e in raw_entries if "_chain" not in e]
+        leaf = next((e["uuid"] for e in reversed(main) if "uuid" in e), None)
+        if leaf is not None:
+            on_chain: set = set()
+            node = leaf
+            while node is not None and node not in on_chain:
+                on_chain.add(node)
+                node = parents.get(node)
+            # Entries without a uuid can't be placed; keep them
+            main = [e for e in main if e.get("uuid", leaf) in on_chain]
+
+        side_runs: dict = {}
+        if keep_sidechains:
+            for e in raw_entries:
+                if "_chain" in e:
+                    side_runs.setdefault(e["_chain"], []).append(e)
+
+    if timings.enabled():
+        timings.count("extract.main_entries", len(main))
+        timings.count("extract.off_chain", len(raw_entries) - len(main))
+        timings.count("extract.sidechains", len(side_runs))
+    return main, list(side_runs.values())
+
+
+_WORD = re.compile(r"\S+")
+
+
+class _TurnBuilder:
+    """Accumulates one turn's entries with bounded work per fragment.
+
+    Instead of joining every fragment into one string, it keeps a
+    normalized prefix for summaries and scans each fragment for the
+    role's signals as it arrives. The last few characters carry over so
+    a phrase split across fragments is still found.
+    """
+
+    def __init__(self, role: str, limits: TextLimits):
+        self.role = role
+        self.limits = limits
+        self.signals = REDIRECT_SIGNALS if role == "human" else CHOICE_SIGNALS
+        self.words: list[str] = []
+        self.prefix_len = 0
+        self.entries: list = []
+        self.files: set = set()
+        self.seen = True
+        self.has_text = False
+        self.signal = False
+        self.scanned = 0
+        self.tail = ""
+        self.truncated = False
+
+    def add(self, entry: dict) -> None:
+        self.entries.append(entry)
+        self.files.update(entry.get("_files", ()))
+        self.seen = self.seen and entry.get("_seen", False)
 
+        text = entry.get("_text", "")
+        if not text or text.isspace():
+            return
+        self.has_text = True
+
+        if self.prefix_len < self.limits.prefix_chars:
+            for m in _WORD.finditer(text):
+                word = m.group()
+                self.words.append(word)
+                self.prefix_len += len(word) + 1
+                if self.prefix_len >= self.limits.prefix_chars:
+                    break
+
+        if self.signal or self.truncated:
+            return
+        budget = self.limits.max_turn_chars - self.scanned
+        chunk = text[:budget].lower()
+        if len(chunk) < len(text):
+            self.truncated = True
+        # Fragments are joined with a space, as the merged turn text was
+        window = f"{self.tail} {chunk}" if self.tail else chunk
+        self.signal = any(signal in window for signal in self.signals)
+        self.scanned += len(chunk)
+        self.tail = window[-_MAX_SIGNAL_LEN:]
+
+    def build(self) -> Optional[Turn]:
+        if not self.has_text:
+            return None
+        return Turn(
+            role=self.role,
+            content=" ".join(self.words)[:self.limits.prefix_chars],
+            raw_entries=self.entries,
+            files_changed=self.files,
+            seen=self.seen,
+            redirect_signal=self.signal and self.role == "human",
+            choice_signal=self.signal and self.role == "assistant",
+            truncated=self.truncated,
+        )
+
+
+def _group_turns(raw_entries: List[dict], limits: Optional[TextLimits] = None) -> List[Turn]:
+    limits = limits or LIMITS
     turns: List[Turn] = []
-    current_role = None
-    current_texts: list[str] = []
-    current_raw: list = []
-    current_files: set = set()
+    current: Optional[_TurnBuilder] = None
+    truncated = 0
 
     for entry in raw_entries:
         role = entry.get("_role")
-        text = entry.get("_text", "")
-        files = entry.get("_files", set())
-
-        if role != current_role and current_role is not None:
-            # Flush current turn
-            merged = " ".join(t for t in current_texts if t.strip())
-            if merged.strip():
-                turns.append(Turn(
-                    role=current_role,
-                    content=merged,
-                    raw_entries=current_raw,
-                    files_changed=current_files,
-                ))
-            current_texts = []
-            current_raw = []
-            current_files = set()
-
-        current_role = role
-        if text.strip():
-            current_texts.append(text)
-        current_raw.append(entry)
-        current_files.update(files)
-
-    # Flush final turn
-    if current_role and current_texts:
-        merged = " ".join(t for t in current_texts if t.strip())
-        if merged.strip():
-            turns.append(Turn(
-                role=current_role,
-                content=merged,
-                raw_entries=current_raw,
-                files_changed=current_files,
-            ))
-
+        if current is None or role != current.role:
+            turn = current.build() if current else None
+            if turn:
+                turns.append(turn)
+                truncated += turn.truncated
+            current = _TurnBuilder(role, limits)
+        current.add(entry)
+
+    turn = current.build() if current else None
+    if turn:
+        turns.append(turn)
+        truncated += turn.truncated
+
+    timings.count("extract.truncated_turns", truncated)
     return turns
 
 
-def _load_raw_entries(session_path: Path) -> List[dict]:
-    """Load JSONL entries and normalize them with _role, _text, _files fields."""
+def _load_raw_entries(
+    session_path: Path,
+    seen: Optional[SeenEntries] = None,
+    parents: Optional[dict] = None,
+) -> List[dict]:
+    """Load JSONL entries and normalize them with _role, _text, _files fields.
+
+    With ``seen``, entries whose uuid it already holds are flagged ``_seen``
+    and this file's uuids are added once it has been read.
+
+    With ``parents``, it is filled with uuid -> parent uuid for every
+    main-conversation entry (including ones dropped here, so chains stay
+    connected), and sidechain entries get ``_chain``: the uuid of their
+    sidechain's root.
+    """
+    with timings.stage("extract.read"):
+        return _read_entries(session_path, seen, parents)
+
+
+def _read_entries(
+    session_path: Path,
+    seen: Optional[SeenEntries] = None,
+    parents: Optional[dict] = None,
+) -> List[dict]:
     entries = []
-    with open(session_path) as f:
-        for line in f:
+    sidechain_roots: dict = {}
+    line_count = 0
+    bad_json = 0
+    duplicates = 0
+    uuids: list[str] = []
+    dropped: dict[str, int] = {}
+    oversized = 0
+    max_line = LIMITS.max_line_bytes
+    max_text = LIMITS.max_turn_chars
+
+    with open(session_path, "rb") as f:
+        while True:
+            line = f.readline(max_line + 1)
+            if not line:
+                break
+            line_count += 1
+            if len(line) > max_line and not line.endswith(b"\n"):
+                # Too long to hold: skip the rest of it without buffering,
+                # but keep its place in the conversation graph
+                oversized += 1
+                head, tail = line[:CHUNK_SIZE], line[-CHUNK_SIZE:]
+                while line and not line.endswith(b"\n"):
+                    line = f.readline(CHUNK_SIZE)
+                    tail = tail[-CHUNK_SIZE:] + line
+                if parents is not None:
+                    _link_oversized(head, tail, parents)
+                continue
             line = line.strip()
             if not line:
                 continue
             try:
                 entry = json.loads(line)
-            except json.JSONDecodeError:
+            except ValueError:  # bad JSON or bad UTF-8
+                bad_json += 1
                 continue
 
             if not isinstance(entry, dict):
+                dropped["non-object"] = dropped.get("non-object", 0) + 1
                 continue
 
+            uuid = entry.get("uuid")
+            if not isinstance(uuid, str):
+                entry.pop("uuid", None)
+                uuid = None
+            if seen is not None and uuid:
+                if uuid in seen.uuids:
+                    entry["_seen"] = True
+                    duplicates += 1
+                else:
+                    uuids.append(uuid)
+            if parents is not None:
+                # Compaction restarts the chain; logicalParentUuid bridges it
+                parent = entry.get("parentUuid") or entry.get("logicalParentUuid")
+                if entry.get("isSidechain"):
+                    # Parents precede children, so one pass finds each root
+                    root = sidechain_roots.get(parent, uuid or "")
+                    if uuid:
+                        sidechain_roots[uuid] = root
+                    entry["_chain"] = root
+                elif uuid:
+                    parents[uuid] = parent
+
             entry_type = entry.get("type", "")
             msg = entry.get("message", {})
 
             if not isinstance(msg, dict):
+                dropped[str(entry_type)] = dropped.get(str(entry_type), 0) + 1
                 continue
 
             role = None
@@ -213,14 +534,53 @@ def _load_raw_entries(session_path: Path) -> List[dict]:
                 files = _extract_files(msg)
 
             if role:
-                entry["_role"] = role
-                entry["_text"] = text
-                entry["_files"] = files
-                entries.append(entry)
+                # Keep only what turn building needs, not the whole message
+                slim = {"_role": role, "_text": text[:max_text], "_files": files}
+                for key in ("uuid", "_seen", "_chain"):
+                    if key in entry:
+                        slim[key] = entry[key]
+                entries.append(slim)
+            else:
+                dropped[str(entry_type)] = dropped.get(str(entry_type), 0) + 1
+
+    if seen is not None:
+        seen.uuids.update(uuids)
+        seen.last_new = len(uuids)
+        seen.last_duplicates = duplicates
+
+    if timings.enabled():
+        timings.count("extract.files")
+        timings.count("extract.bytes", session_path.stat().st_size)
+        timings.count("extract.lines", line_count)
+        timings.count("extract.bad_json", bad_json)
+        timings.count("extract.entries", len(entries))
+        timings.count("extract.duplicates", duplicates)
+        timings.count("extract.oversized_lines", oversized)
+        for entry_type, n in dropped.items():
+            timings.count(f"extract.dropped.{entry_type or 'untyped'}", n)
 
     return entries
 
 
+_HEAD_PARENT = re.compile(rb'"parentUuid"\s*:\s*(?:"([^"]+)"|null)')
+_TAIL_UUID = re.compile(rb'"uuid"\s*:\s*"([^"]+)"')
+
+
+def _link_oversized(head: bytes, tail: bytes, parents: dict) -> None:
+    """Record the parent link of a main-chain line too long to parse.
+
+    Claude Code writes ``parentUuid`` before the message and ``uuid``
+    after it, so they can be read from the line's first and last bytes.
+    """
+    if re.search(rb'"isSidechain"\s*:\s*true', head):
+        return
+    parent = _HEAD_PARENT.search(head)
+    uuids = _TAIL_UUID.findall(tail)
+    if parent and uuids:
+        uuid = uuids[-1].decode(errors="replace")
+        parents[uuid] = parent.group(1).decode(errors="replace") if parent.group(1) else None
+
+
 # Keep this alias for the digest module
 def _load_session(session_path: Path) -> List[dict]:
     """Load session as flat list of messages (for backward compat)."""
@@ -264,18 +624,6 @@ def _extract_files(msg: dict) -> set:
     return files
 
 
-def _check_redirect(human_text: str, ai_text: str) -> bool:
-    """Check if the human message is redirecting/overriding the AI."""
-    lower = human_text.lower()
-    return any(signal in lower for signal in REDIRECT_SIGNALS)
-
-
-def _check_choice(ai_text: str, human_text: str) -> bool:
-    """Check if the AI presented options and the human made a choice."""
-    lower = ai_text.lower()
-    return any(signal in lower for signal in CHOICE_SIGNALS)
-
-
 def _summarize(text: str, max_len: int) -> str:
     """Truncate text to max_len, adding ellipsis if needed."""
     text = " ".join(text.split())  # normalize whitespace
@@ -2,98 +2,274 @@
 
 from __future__ import annotations
 
+import os
 import subprocess
+from dataclasses import dataclass
+from functools import lru_cache
 from pathlib import Path
 from typing import Optional
 
+# Same length `git rev-parse --short` uses by default
+SHORT_SHA_LEN = 7
+
+
+class GitError(RuntimeError):
+    """A git operation failed or referenced something that doesn't exist."""
+
+
+@dataclass(frozen=True)
+class GitRepo:
+    """Where a repository lives on disk."""
+
+    git_dir: Path  # .git directory (per-worktree for linked worktrees)
+    common_dir: Path  # shared objects/refs; equals git_dir except in linked worktrees
+    worktree: Optional[Path]  # None for bare repositories
+
+
+def _is_git_dir(path: Path) -> bool:
+    """Cheap structural check that ``path`` is a git directory."""
+    return (path / "HEAD").is_file() and (
+        (path / "objects").is_dir() or (path / "commondir").is_file()
+    )
+
+
+def _common_dir(git_dir: Path) -> Path:
+    commondir_file = git_dir / "commondir"
+    if commondir_file.is_file():
+        return (git_dir / commondir_file.read_text().strip()).resolve()
+    return git_dir
+
+
+def _resolve_dot_git(dot_git: Path) -> Optional[Path]:
+    """Return the git dir a ``.git`` entry points at (directory or ``gitdir:`` file)."""
+    if dot_git.is_dir():
+        return dot_git if _is_git_dir(dot_git) else None
+    if dot_git.is_file():
+        try:
+            content = dot_git.read_text().strip()
+        except OSError:
+            return None
+        if content.startswith("gitdir:"):
+            target = (dot_git.parent / content[len("gitdir:"):].strip()).resolve()
+            return target if _is_git_dir(target) else None
+    return None
+
+
+@lru_cache(maxsize=None)
+def _discover(
+    start: Path, cwd: Path, env_git_dir: Optional[str], env_work_tree: Optional[str],
+) -> Optional[GitRepo]:
+    if env_git_dir:
+        # Relative GIT_DIR/GIT_WORK_TREE are relative to the current directory, as in git
+        git_dir = (cwd / env_git_dir).resolve()
+        if not _is_git_dir(git_dir):
+            return None
+        # Without GIT_WORK_TREE, git treats the current directory as the top level
+        worktree = (cwd / env_work_tree).resolve() if env_work_tree else cwd
+        return GitRepo(git_dir=git_dir, common_dir=_common_dir(git_dir), worktree=worktree)
+
+    for directory in (start, *start.parents):
+        git_dir = _resolve_dot_git(directory / ".git")
+        if git_dir is not None:
+            return GitRepo(git_dir=git_dir, common_dir=_common_dir(git_dir), worktree=directory)
+        if _is_git_dir(directory) and (directory / "refs").is_dir():
+            return GitRepo(git_dir=directory, common_dir=_common_dir(directory), worktree=None)
+
+    return None
+
+
+def discover_repo(path: Path) -> Optional[GitRepo]:
+    """Find the repository containing ``path`` without running git.
+
+    Understands ``.git`` directories, ``gitdir:`` files (submodules, linked
+    worktrees), bare repositories and the ``GIT_DIR``/``GIT_WORK_TREE``
+    environment variables. Results are memoized per path, working directory
+    and environment; long-running processes call ``clear_repo_cache`` to
+    notice repositories created or moved since.
+    """
+    start = Path(path).resolve()
+    if start.is_file():
+        start = start.parent
+    return _discover(
+        start, Path.cwd(), os.environ.get("GIT_DIR"), os.environ.get("GIT_WORK_TREE"),
+    )
+
+
+def clear_repo_cache() -> None:
+    """Forget memoized ``discover_repo`` results."""
+    _discover.cache_clear()
+
 
 def is_git_repo(path: Path) -> bool:
     """Check if path is inside a git repository."""
-    try:
-        subprocess.run(
-            ["git", "rev-parse", "--git-dir"],
-            cwd=path,
-            capture_output=True,
-            check=True,
-        )
-        return True
-    except (subprocess.CalledProcessError, FileNotFoundError):
-        return False
+    return discover_repo(path) is not None
 
 
-def git_add_and_commit(filepath: Path, message: str) -> Optional[str]:
-    """Stage a file and commit it. Returns the commit hash or None on failure."""
-    repo_root = filepath.parent
-    # Walk up to find the git root
-    while repo_root != repo_root.parent:
-        if (repo_root / ".git").exists():
-            break
-        repo_root = repo_root.parent
-    else:
+def _read_head_sha(repo: GitRepo) -> Optional[str]:
+    """Resolve HEAD to a full SHA by reading ref files, without forking git.
+
+    Handles a detached HEAD, loose refs and packed-refs. Returns None for
+    anything it doesn't understand so callers can fall back to rev-parse.
+    """
+    try:
+        head = (repo.git_dir / "HEAD").read_text().strip()
+    except OSError:
         return None
+    if not head.startswith("ref: "):
+        return head or None
+
+    ref = head[5:].strip()
+    # Linked worktrees keep shared refs in the common dir
+    for base in (repo.git_dir, repo.common_dir):
+        try:
+            return (base / ref).read_text().strip() or None
+        except OSError:
+            continue
 
     try:
-        subprocess.run(
-            ["git", "add", str(filepath)],
-            cwd=repo_root,
-            capture_output=True,
-            check=True,
-        )
-        result = subprocess.run(
-            ["git", "commit", "-m", message],
-            cwd=repo_root,
-            capture_output=True,
-            check=True,
-            text=True,
-        )
-        # Extract short hash
-        hash_result = subprocess.run(
-            ["git", "rev-parse", "--short", "HEAD"],
-            cwd=repo_root,
-            capture_output=True,
-            check=True,
-            text=True,
-        )
-        return hash_result.stdout.strip()
-    except subprocess.CalledProcessError:
+        packed = (repo.common_dir / "packed-refs").read_text()
+    except OSError:
         return None
+    for line in packed.splitlines():
+        if line.endswith(" " + ref) and not line.startswith(("#", "^")):
+            return line.split(" ", 1)[0]
+    return None
 
 
-def git_add_and_commit_multiple(filepaths: list[Path], message: str) -> Optional[str]:
-    """Stage multiple files and commit. Returns the commit hash or None."""
+def _head_short_sha(repo: GitRepo, cwd: Path) -> str:
+    """Short SHA of HEAD, read from disk when possible."""
+    sha = _read_head_sha(repo)
+    if sha:
+        return sha[:SHORT_SHA_LEN]
+
+    hash_result = subprocess.run(
+        ["git", "rev-parse", "--short", "HEAD"],
+        cwd=cwd,
+        capture_output=True,
+        check=True,
+        text=True,
+    )
+    return hash_result.stdout.strip()
+
+
+def git_commit_files(filepaths: list[Path], message: str) -> Optional[str]:
+    """Stage any number of files and commit them in one go.
+
+    Uses a single ``git add`` (paths fed on stdin, so there is no argv limit)
+    and a single ``git commit``, then reads the new HEAD from the ref files
+    instead of running ``rev-parse``. Returns the short commit hash or None
+    on failure.
+    """
     if not filepaths:
         return None
 
-    repo_root = filepaths[0].parent
-    while repo_root != repo_root.parent:
-        if (repo_root / ".git").exists():
-            break
-        repo_root = repo_root.parent
-    else:
+    repo = discover_repo(filepaths[0])
+    if repo is None or repo.worktree is None:
         return None
+    repo_root = repo.worktree
+
+    pathspecs = "\0".join(str(Path(fp).resolve()) for fp in filepaths)
 
     try:
-        for fp in filepaths:
-            subprocess.run(
-                ["git", "add", str(fp)],
-                cwd=repo_root,
-                capture_output=True,
-                check=True,
-            )
         subprocess.run(
-            ["git", "commit", "-m", message],
+            ["git", "add", "--pathspec-from-file=-", "--pathspec-file-nul"],
             cwd=repo_root,
+            input=pathspecs,
             capture_output=True,
             check=True,
             text=True,
         )
-        hash_result = subprocess.run(
-            ["git", "rev-parse", "--short", "HEAD"],
+        subprocess.run(
+            ["git", "commit", "-q", "-m", message],
             cwd=repo_root,
             capture_output=True,
             check=True,
             text=True,
         )
-        return hash_result.stdout.strip()
+        return _head_short_sha(repo, repo_root)
     except subprocess.CalledProcessError:
         return None
+
+
+def git_add_and_commit(filepath: Path, message: str) -> Optional[str]:
+    """Stage a file and commit it. Returns the commit hash or None on failure."""
+    return git_commit_files([filepath], message)
+
+
+def git_add_and_commit_multiple(filepaths: list[Path], message: str) -> Optional[str]:
+    """Stage multiple files and commit. Returns the commit hash or None."""
+    return git_commit_files(filepaths, message)
+
+
+# ---------------------------------------------------------------------------
+# Object access (history)
+# ---------------------------------------------------------------------------
+
+class CatFileBatch:
+    """One long-lived ``git cat-file --batch`` process for reading objects.
+
+    Every lookup is a line on stdin and a length-prefixed reply on stdout,
+    so reading thousands of blobs costs one fork instead of thousands.
+    """
+
+    def __init__(self, cwd: Path):
+        try:
+            self._proc = subprocess.Popen(
+                ["git", "cat-file", "--batch"],
+                cwd=cwd,
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+            )
+        except FileNotFoundError as exc:
+            raise GitError("git executable not found") from exc
+
+    def read(self, spec: str) -> Optional[tuple[str, str, bytes]]:
+        """Return (sha, type, content) for an object spec, or None if missing."""
+        if "\n" in spec:
+            raise GitError(f"invalid object name: {spec!r}")
+        self._proc.stdin.write(spec.encode() + b"\n")
+        self._proc.stdin.flush()
+
+        header = self._proc.stdout.readline().decode().split()
+        if not header:
+            raise GitError("git cat-file exited unexpectedly")
+        if len(header) != 3:
+            return None  # "<spec> missing" / "<spec> ambiguous"
+
+        sha, obj_type, size = header[0], header[1], int(header[2])
+        content = self._proc.stdout.read(size)
+        self._proc.stdout.read(1)  # trailing newline
+        return sha, obj_type, content
+
+    def tree_entries(self, spec: str) -> Optional[list[tuple[str, str, str]]]:
+        """List (mode, name, sha) entries of the tree at ``spec``, or None if absent."""
+        obj = self.read(spec)
+        if obj is None or obj[1] != "tree":
+            return None
+
+        sha, _, data = obj
+        raw_len = len(sha) // 2  # 20 bytes for SHA-1, 32 for SHA-256
+        entries: list[tuple[str, str, str]] = []
+        pos = 0
+        while pos < len(data):
+            space = data.index(b" ", pos)
+            nul = data.index(b"\0", space)
+            mode = data[pos:space].decode()
+            name = data[space + 1:nul].decode("utf-8", errors="surrogateescape")
+            entry_sha = data[nul + 1:nul + 1 + raw_len].hex()
+            entries.append((mode, name, entry_sha))
+            pos = nul + 1 + raw_len
+        return entries
+
+    def close(self) -> None:
+        if self._proc.poll() is None:
+            self._proc.stdin.close()
+            self._proc.wait()
+        self._proc.stdout.close()
+
+    def __enter__(self) -> "CatFileBatch":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
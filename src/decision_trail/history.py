@@ -0,0 +1,223 @@
+"""Reconstruct decisions/ at past git revisions.
+
+Digests and synthesis files are read straight from git objects through a
+single ``git cat-file --batch`` process — no checkout, no per-file
+``git show``. Parsed files are cached by blob SHA, so walking many
+revisions (e.g. backfilling trend history) parses each distinct version of
+a file only once. Packed digests (decisions/packs/*.pack) are unpacked
+from their blobs, with loose files shadowing packed entries as in
+``pack.iter_digest_texts``.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Optional
+
+from .git import CatFileBatch, GitError, discover_repo
+from .metrics import SessionMetrics, parse_digest_metrics_text
+from .pack import PACK_DIR, PACK_SUFFIX, iter_digest_texts, unpack_bytes
+from .profile import (
+    DigestData,
+    ProfileData,
+    SynthesisData,
+    assemble_profile,
+    build_profile,
+    parse_digest_text,
+    parse_synthesis_text,
+)
+
+
+@dataclass
+class ProfileDiff:
+    """What changed in the profile between two revisions."""
+
+    old_label: str
+    new_label: str
+    old_sessions: int = 0
+    new_sessions: int = 0
+    digests_added: list[str] = field(default_factory=list)  # file names
+    digests_removed: list[str] = field(default_factory=list)
+    digests_modified: list[str] = field(default_factory=list)
+    moments_added: list[str] = field(default_factory=list)
+    moments_removed: list[str] = field(default_factory=list)
+    how_i_work_changed: bool = False
+    evolution_changed: bool = False
+
+    @property
+    def is_empty(self) -> bool:
+        return not (
+            self.digests_added or self.digests_removed or self.digests_modified
+            or self.moments_added or self.moments_removed
+            or self.how_i_work_changed or self.evolution_changed
+        )
+
+
+class HistoryReader:
+    """Reads the decisions tree at arbitrary revisions of the enclosing repo."""
+
+    def __init__(self, root: Path):
+        repo = discover_repo(root)
+        if repo is None or repo.worktree is None:
+            raise GitError(f"{root} is not inside a git work tree")
+
+        prefix = Path(root).resolve().relative_to(repo.worktree).as_posix()
+        self._prefix = "" if prefix == "." else prefix + "/"
+        self._batch = CatFileBatch(repo.worktree)
+
+        # Parse caches keyed by blob SHA (plus file stem where it matters).
+        # Packed digests are keyed "<pack blob SHA>:<name>".
+        self._packs: dict[str, dict[str, bytes]] = {}
+        self._digests: dict[str, DigestData] = {}
+        self._synthesis: dict[str, SynthesisData] = {}
+        self._metrics: dict[tuple[str, str], SessionMetrics] = {}
+        self._sketches: dict[str, list] = {}  # clusters.digest_sketches per digest
+
+    def resolve(self, rev: str) -> str:
+        """Full commit SHA for ``rev``. Raises GitError if it doesn't exist."""
+        obj = self._batch.read(f"{rev}^{{commit}}")
+        if obj is None:
+            raise GitError(f"unknown revision: {rev}")
+        return obj[0]
+
+    def _blobs(self, commit: str, subdir: str, suffix: str = ".md") -> list[tuple[str, str]]:
+        """(file name, blob SHA) of the *<suffix> files in decisions/<subdir>, by name."""
+        entries = self._batch.tree_entries(f"{commit}:{self._prefix}decisions/{subdir}")
+        if not entries:
+            return []
+        return sorted(
+            (name, sha) for mode, name, sha in entries
+            if mode.startswith("100") and name.endswith(suffix)
+        )
+
+    def _digest_keys(self, commit: str) -> list[tuple[str, str]]:
+        """(file name, cache key) of every digest at ``commit``, packed or loose, by name."""
+        keys: dict[str, str] = {}
+        for pack_name, sha in self._blobs(commit, PACK_DIR, PACK_SUFFIX):
+            if sha not in self._packs:
+                self._packs[sha] = unpack_bytes(self._bytes(sha), pack_name)
+            for name in self._packs[sha]:
+                keys[name] = f"{sha}:{name}"
+        for name, sha in self._blobs(commit, "digests"):
+            keys[name] = sha  # loose files shadow packed entries
+        return sorted(keys.items())
+
+    def _digest_text(self, key: str) -> str:
+        sha, _, name = key.partition(":")
+        if name:
+            return self._packs[sha][name].decode("utf-8", errors="replace")
+        return self._text(sha)
+
+    def _bytes(self, sha: str) -> bytes:
+        obj = self._batch.read(sha)
+        if obj is None:
+            raise GitError(f"missing object: {sha}")
+        return obj[2]
+
+    def _text(self, sha: str) -> str:
+        return self._bytes(sha).decode("utf-8", errors="replace")
+
+    def digest_files(self, rev: str) -> dict[str, DigestData]:
+        """Parsed digests at ``rev``, keyed by file name."""
+        commit = self.resolve(rev)
+        result: dict[str, DigestData] = {}
+        for name, key in self._digest_keys(commit):
+            if key not in self._digests:
+                self._digests[key] = parse_digest_text(self._digest_text(key))
+            result[name] = self._digests[key]
+        return result
+
+    def synthesis(self, rev: str) -> list[SynthesisData]:
+        """Parsed synthesis files at ``rev``, in file-name order."""
+        commit = self.resolve(rev)
+        result: list[SynthesisData] = []
+        for _, sha in self._blobs(commit, "synthesis"):
+            if sha not in self._synthesis:
+                self._synthesis[sha] = parse_synthesis_text(self._text(sha))
+            result.append(self._synthesis[sha])
+        return result
+
+    def profile(self, rev: str) -> ProfileData:
+        """Rebuild the profile exactly as ``build_profile`` would have at ``rev``."""
+        from .clusters import digest_sketches
+
+        digests = list(self.digest_files(rev).values())
+        sketches = []
+        for (_, key), digest in zip(self._digest_keys(self.resolve(rev)), digests):
+            if key not in self._sketches:
+                self._sketches[key] = digest_sketches(digest)
+            sketches.append(self._sketches[key])
+        return assemble_profile(digests, self.synthesis(rev), self.metrics(rev), sketches)
+
+    def metrics(self, rev: str) -> list[SessionMetrics]:
+        """Per-session metrics as ``collect_from_digests`` would have returned at ``rev``."""
+        commit = self.resolve(rev)
+        sessions: list[SessionMetrics] = []
+        for name, key in self._digest_keys(commit):
+            stem = name[:-len(".md")]
+            if (key, stem) not in self._metrics:
+                self._metrics[key, stem] = parse_digest_metrics_text(self._digest_text(key), stem)
+            sessions.append(self._metrics[key, stem])
+        return sessions
+
+    def close(self) -> None:
+        self._batch.close()
+
+    def __enter__(self) -> "HistoryReader":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def working_tree_digest_files(root: Path) -> dict[str, DigestData]:
+    """Parsed digests currently on disk, packed or loose, keyed by file name."""
+    return {name: parse_digest_text(text) for name, text in iter_digest_texts(root)}
+
+
+def diff_profiles(
+    old_files: dict[str, DigestData],
+    old: ProfileData,
+    new_files: dict[str, DigestData],
+    new: ProfileData,
+    old_label: str,
+    new_label: str,
+) -> ProfileDiff:
+    """Compare two profiles and the digest files they were built from."""
+    old_moments = set(old.highlighted_moments)
+    new_moments = set(new.highlighted_moments)
+
+    return ProfileDiff(
+        old_label=old_label,
+        new_label=new_label,
+        old_sessions=old.total_sessions,
+        new_sessions=new.total_sessions,
+        digests_added=sorted(set(new_files) - set(old_files)),
+        digests_removed=sorted(set(old_files) - set(new_files)),
+        digests_modified=sorted(
+            name for name in set(old_files) & set(new_files)
+            if old_files[name] != new_files[name]
+        ),
+        moments_added=[m for m in new.highlighted_moments if m not in old_moments],
+        moments_removed=[m for m in old.highlighted_moments if m not in new_moments],
+        how_i_work_changed=old.how_i_work != new.how_i_work,
+        evolution_changed=old.evolution_narrative != new.evolution_narrative,
+    )
+
+
+def compare_profiles(root: Path, old_rev: str, new_rev: Optional[str] = None) -> ProfileDiff:
+    """Diff the profile at ``old_rev`` against ``new_rev`` (or the working tree)."""
+    with HistoryReader(root) as reader:
+        old_files = reader.digest_files(old_rev)
+        old = reader.profile(old_rev)
+        if new_rev is None:
+            new_files = working_tree_digest_files(root)
+            new = build_profile(root)
+        else:
+            new_files = reader.digest_files(new_rev)
+            new = reader.profile(new_rev)
+
+    return diff_profiles(
+        old_files, old, new_files, new, old_rev, new_rev or "working tree",
+    )
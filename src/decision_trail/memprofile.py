@@ -0,0 +1,162 @@
+"""Opt-in peak-memory profiling (``--memprofile``).
+
+Rides on the same ``timings.stage(...)`` boundaries as ``--timings``
+(extract.read, extract.group_turns, extract.classify,
+metrics.build_summary, render.*, ...). While enabled, tracemalloc runs and
+every stage records:
+
+- its peak: the highest traced memory while it ran, above what was
+  already allocated when it started (nested stages fold into their parents)
+- what it retained: traced memory at exit minus at entry
+
+Pipelines that walk many files wrap each one in ``session(label)`` so the
+heaviest individual sessions can be listed. A tracemalloc snapshot is
+taken at stage exits that set a new high-water mark, and its top
+allocation sites are reported. Tracing slows everything down, so
+``--timings`` figures from the same run are inflated.
+"""
+
+from __future__ import annotations
+
+import json
+import tracemalloc
+from pathlib import Path
+from typing import Optional
+
+from . import timings
+
+# Only snapshot when memory at a boundary beats the last snapshot by this
+# factor; snapshots cost O(live blocks)
+SNAPSHOT_GROWTH = 1.1
+
+
+class MemoryProfiler:
+    """Tracks per-stage and per-session peaks with tracemalloc."""
+
+    def __init__(self, top: int = 10):
+        self.top = top
+        self.peak = 0
+        self.stages: dict[str, list] = {}  # name -> [calls, max peak, max retained]
+        self.sessions: dict[str, int] = {}  # label -> peak
+        self._stack: list[list] = []  # [start, peak] per open stage or session
+        self._snapshot: Optional[tracemalloc.Snapshot] = None
+        self._snapshot_at = ""
+        self._snapshot_size = 0
+        tracemalloc.start()
+
+    def _fold(self) -> int:
+        """Push the peak since the last boundary into every open frame."""
+        current, peak = tracemalloc.get_traced_memory()
+        for frame in self._stack:
+            if peak > frame[1]:
+                frame[1] = peak
+        if peak > self.peak:
+            self.peak = peak
+        tracemalloc.reset_peak()
+        return current
+
+    def enter(self) -> None:
+        current = self._fold()
+        self._stack.append([current, current])
+
+    def exit(self) -> tuple[int, int]:
+        """Close the innermost frame; returns (peak, retained) in bytes."""
+        current = self._fold()
+        start, peak = self._stack.pop()
+        return peak - start, current - start
+
+    def exit_stage(self, name: str) -> None:
+        peak, retained = self.exit()
+        entry = self.stages.setdefault(name, [0, 0, 0])
+        entry[0] += 1
+        entry[1] = max(entry[1], peak)
+        entry[2] = max(entry[2], retained)
+
+        current = tracemalloc.get_traced_memory()[0]
+        if current > self._snapshot_size * SNAPSHOT_GROWTH:
+            self._snapshot = tracemalloc.take_snapshot()
+            self._snapshot_at = name
+            self._snapshot_size = current
+
+    def exit_session(self, label: str) -> None:
+        peak, _ = self.exit()
+        self.sessions[label] = max(self.sessions.get(label, 0), peak)
+
+    def top_sites(self) -> list[dict]:
+        if self._snapshot is None:
+            return []
+        snapshot = self._snapshot.filter_traces([
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap*>"),
+            tracemalloc.Filter(False, "<unknown>"),
+        ])
+        return [
+            {
+                "site": f"{stat.traceback[0].filename}:{stat.traceback[0].lineno}",
+                "bytes": stat.size,
+                "blocks": stat.count,
+            }
+            for stat in snapshot.statistics("lineno")[:self.top]
+        ]
+
+    def to_dict(self) -> dict:
+        heaviest = sorted(self.sessions.items(), key=lambda item: -item[1])[:self.top]
+        return {
+            "peak_bytes": self.peak,
+            "stages": {
+                name: {"calls": calls, "peak_bytes": peak, "retained_bytes": retained}
+                for name, (calls, peak, retained) in sorted(self.stages.items())
+            },
+            "sessions": {"count": len(self.sessions), "heaviest": dict(heaviest)},
+            "top_sites": {"at_stage": self._snapshot_at, "sites": self.top_sites()},
+        }
+
+
+class _Session:
+    __slots__ = ("_profiler", "_label")
+
+    def __init__(self, profiler: MemoryProfiler, label: str):
+        self._profiler = profiler
+        self._label = label
+
+    def __enter__(self):
+        self._profiler.enter()
+        return self
+
+    def __exit__(self, *exc):
+        self._profiler.exit_session(self._label)
+        return False
+
+
+_profiler: Optional[MemoryProfiler] = None
+
+
+def enable(top: int = 10) -> MemoryProfiler:
+    """Start tracing (idempotent). Also turns on the timings recorder,
+    whose stage boundaries the profiler hooks into."""
+    global _profiler
+    if _profiler is None:
+        _profiler = MemoryProfiler(top)
+        timings.enable().memory = _profiler
+    return _profiler
+
+
+def enabled() -> bool:
+    return _profiler is not None
+
+
+def session(label: str):
+    """Context manager recording one session's peak. A no-op when off."""
+    if _profiler is None:
+        return timings._NULL_STAGE
+    return _Session(_profiler, label)
+
+
+def snapshot() -> dict:
+    """The memory profile so far (empty if profiling is off)."""
+    return _profiler.to_dict() if _profiler is not None else {}
+
+
+def write_json(path: Path) -> None:
+    if _profiler is not None:
+        path.write_text(json.dumps(snapshot(), indent=2) + "\n")
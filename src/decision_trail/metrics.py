@@ -10,7 +10,9 @@ from __future__ import annotations
 import re
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import List, Optional
+from typing import Iterable, List, Optional
+
+from . import memprofile, timings
 
 
 @dataclass
@@ -25,6 +27,7 @@ class SessionMetrics:
     override_rate: float = 0.0  # redirects / (redirects + unchallenged)
     session_duration_estimate: str = ""
     engagement_score: float = 0.0  # 0-100 composite
+    project: str = ""  # session logs only: the Claude Code project directory
 
     @property
     def total_moments(self) -> int:
@@ -179,7 +182,12 @@ def _compute_engagement_score(
 
 def parse_digest_metrics(path: Path) -> SessionMetrics:
     """Parse a single digest file and extract quantified metrics."""
-    text = path.read_text().strip()
+    return parse_digest_metrics_text(path.read_text(), path.stem)
+
+
+def parse_digest_metrics_text(text: str, stem: str) -> SessionMetrics:
+    """Extract metrics from digest markdown; ``stem`` is the date fallback."""
+    text = text.strip()
     lines = text.splitlines()
 
     # Parse header: "# YYYY-MM-DD — topic"
@@ -209,7 +217,7 @@ def parse_digest_metrics(path: Path) -> SessionMetrics:
 
     # Fall back to filename for date if not found in header
     if not date:
-        m = re.match(r"(\d{4}-\d{2}-\d{2})", path.stem)
+        m = re.match(r"(\d{4}-\d{2}-\d{2})", stem)
         if m:
             date = m.group(1)
 
@@ -286,14 +294,24 @@ def _get_section_text(text: str, section_name: str) -> str:
 # Session log parsing (--from-sessions)
 # ---------------------------------------------------------------------------
 
-def metrics_from_session_log(session_path: Path) -> SessionMetrics:
-    """Derive metrics directly from a JSONL session log using the extractor."""
-    from .extractor import extract_from_session
+def metrics_from_session_log(
+    session_path: Path, seen=None, sidechains: str = "drop",
+) -> SessionMetrics:
+    """Derive metrics directly from a JSONL session log.
 
-    candidates = extract_from_session(session_path)
+    Uses the extractor's counting path: categories are tallied without
+    building candidates or summaries.
 
-    redirect_count = sum(1 for c in candidates if c.category == "redirect")
-    choice_count = sum(1 for c in candidates if c.category == "choice")
+    ``seen`` is an extractor.SeenEntries; pass the same one for every file
+    in a run so resumed/forked sessions don't count their parent's
+    decisions again. ``sidechains`` is passed to the extractor.
+    """
+    from .extractor import count_decisions
+
+    counts = count_decisions(session_path, seen, sidechains)
+
+    redirect_count = counts.redirect
+    choice_count = counts.choice
     # Choices are roughly analogous to unchallenged — the AI presented options,
     # the human picked one without fundamentally redirecting
     unchallenged_count = choice_count
@@ -316,6 +334,7 @@ def metrics_from_session_log(session_path: Path) -> SessionMetrics:
     return SessionMetrics(
         date=date,
         topic=session_path.stem,
+        project=session_path.parent.name,
         redirect_count=redirect_count,
         unchallenged_count=unchallenged_count,
         wrong_call_count=wrong_call_count,
@@ -330,11 +349,65 @@ def metrics_from_session_log(session_path: Path) -> SessionMetrics:
 
 SPARKLINE_CHARS = "▁▂▃▄▅▆▇█"
 
+# Default sparkline length; longer series are downsampled to fit
+SPARKLINE_WIDTH = 60
+
+
+def lttb(values: list[float], threshold: int) -> list[tuple[int, float]]:
+    """Largest-Triangle-Three-Buckets downsampling, in one linear pass.
+
+    Returns at most ``threshold`` (index, value) points. The first and
+    last points are always kept. For each bucket in between, it keeps the
+    point that makes the largest triangle with the previous kept point
+    and the next bucket's average. Peaks and dips survive where a plain
+    stride or average would flatten them.
+    """
+    n = len(values)
+    if threshold >= n or n <= 2:
+        return list(enumerate(values))
+    if threshold < 3:
+        return [(0, values[0]), (n - 1, values[-1])][:max(threshold, 1)]
+
+    points = [(0, values[0])]
+    every = (n - 2) / (threshold - 2)
+    a = 0
+    for i in range(threshold - 2):
+        start = int(i * every) + 1
+        end = int((i + 1) * every) + 1
+        next_end = min(int((i + 2) * every) + 1, n)
+
+        # Average of the next bucket (just the last point for the final bucket)
+        if end >= n - 1:
+            avg_x, avg_y = n - 1, values[-1]
+        else:
+            span = next_end - end
+            avg_x = (end + next_end - 1) / 2
+            avg_y = sum(values[end:next_end]) / span
+
+        ax, ay = a, values[a]
+        best, best_area = start, -1.0
+        for j in range(start, end):
+            area = abs((ax - avg_x) * (values[j] - ay) - (ax - j) * (avg_y - ay))
+            if area > best_area:
+                best, best_area = j, area
+        points.append((best, values[best]))
+        a = best
+
+    points.append((n - 1, values[-1]))
+    return points
 
-def _sparkline(values: list[float]) -> str:
-    """Render a list of values as a sparkline string."""
+
+def downsample(values: list[float], width: int) -> list[float]:
+    """``values`` reduced to at most ``width`` points (see lttb)."""
+    return [v for _, v in lttb(values, width)]
+
+
+def _sparkline(values: list[float], width: Optional[int] = None) -> str:
+    """Render a list of values as a sparkline string, at most ``width`` wide."""
     if not values:
         return ""
+    if width is not None:
+        values = downsample(values, width)
     mn, mx = min(values), max(values)
     rng = mx - mn
     if rng == 0:
@@ -388,7 +461,7 @@ def _build_trend(values: list[float]) -> TrendData:
         moving_avg_5=_moving_average(values, 5),
         moving_avg_10=_moving_average(values, 10),
         values=values,
-        sparkline=_sparkline(values),
+        sparkline=_sparkline(values, SPARKLINE_WIDTH),
     )
 
 
@@ -448,21 +521,192 @@ def _detect_coasting(sessions: list[SessionMetrics]) -> list[CoastingAlert]:
 # ---------------------------------------------------------------------------
 
 def collect_from_digests(root: Path) -> list[SessionMetrics]:
-    """Parse all digest files and return per-session metrics."""
-    digest_dir = root / "decisions" / "digests"
-    if not digest_dir.is_dir():
-        return []
+    """Parse all digests, loose and packed, and return per-session metrics."""
+    from .pack import iter_digest_texts
+
+    sessions: list[SessionMetrics] = []
+    with timings.stage("metrics.parse_digests"):
+        for name, text in iter_digest_texts(root):
+            sessions.append(parse_digest_metrics_text(text, Path(name).stem))
+    timings.count("metrics.digests", len(sessions))
+
+    return sessions
+
+
+def collect_from_sessions(
+    session_paths: list[Path], sidechains: str = "drop",
+) -> list[SessionMetrics]:
+    """Derive metrics from JSONL session logs.
 
+    Entries repeated across files (resumed or forked sessions) count once,
+    and a file that adds nothing new is left out.
+    """
+    from .extractor import SeenEntries
+
+    seen = SeenEntries()
     sessions: list[SessionMetrics] = []
-    for path in sorted(digest_dir.glob("*.md")):
-        sessions.append(parse_digest_metrics(path))
+    with timings.stage("metrics.from_sessions"):
+        for path in sorted(session_paths):
+            with memprofile.session(path.name):
+                m = _metrics_if_new(path, seen, sidechains)
+            if m is not None:
+                sessions.append(m)
+    return sessions
 
+
+def _metrics_if_new(session_path: Path, seen, sidechains: str) -> Optional[SessionMetrics]:
+    """Metrics for a session, or None if it only repeats earlier files."""
+    m = metrics_from_session_log(session_path, seen, sidechains)
+    if seen.last_was_duplicate:
+        timings.count("metrics.duplicate_sessions")
+        return None
+    return m
+
+
+def collect_from_catalog(records: list, sidechains: str = "drop") -> list[SessionMetrics]:
+    """Derive metrics from session logs selected by a catalog query.
+
+    Keeps the catalog's chronological order, and dates sessions by their
+    first timestamp since Claude Code names logs by UUID, not date.
+    """
+    from .extractor import SeenEntries
+
+    seen = SeenEntries()
+    sessions: list[SessionMetrics] = []
+    with timings.stage("metrics.from_sessions"):
+        for record in records:
+            with memprofile.session(Path(record.path).name):
+                m = _metrics_if_new(Path(record.path), seen, sidechains)
+            if m is None:
+                continue
+            if not m.date and record.first_ts:
+                m.date = record.first_ts[:10]
+            m.project = record.project
+            sessions.append(m)
     return sessions
 
 
-def collect_from_sessions(session_paths: list[Path]) -> list[SessionMetrics]:
-    """Derive metrics from JSONL session logs."""
-    return [metrics_from_session_log(p) for p in sorted(session_paths)]
+# ---------------------------------------------------------------------------
+# Sampling (--sample / --sample-fraction)
+# ---------------------------------------------------------------------------
+
+@dataclass
+class Estimate:
+    """A sample mean with a confidence interval for the population mean.
+
+    ``low``/``high`` are None when the interval is undefined (fewer than
+    two sampled sessions).
+    """
+
+    mean: float
+    low: Optional[float]
+    high: Optional[float]
+    sample_size: int
+    population: int
+    confidence: float = 0.95
+
+
+def sample_items(
+    items: Iterable,
+    size: Optional[int] = None,
+    fraction: Optional[float] = None,
+    seed: Optional[int] = None,
+) -> tuple[list, int]:
+    """Uniform random sample of ``items`` in one pass, plus the population size.
+
+    With ``size``, keeps a reservoir of that many (Algorithm R) without
+    holding the rest. With ``fraction``, the items are listed first so the
+    reservoir can be sized from the population. Sampled items keep their
+    original relative order.
+    """
+    import math
+    import random
+
+    if fraction is not None:
+        population = list(items)
+        size = max(1, math.ceil(len(population) * fraction))
+        items = population
+
+    rng = random.Random(seed)
+    reservoir: list[tuple[int, object]] = []
+    n = 0
+    for n, item in enumerate(items, 1):
+        if len(reservoir) < size:
+            reservoir.append((n, item))
+        else:
+            j = rng.randrange(n)
+            if j < size:
+                reservoir[j] = (n, item)
+    reservoir.sort(key=lambda pair: pair[0])
+    return [item for _, item in reservoir], n
+
+
+def _t_critical(confidence: float, df: int) -> float:
+    """Two-sided Student's t critical value: P(|T| < t) = ``confidence``.
+
+    Bisects the closed-form integer-df CDF (Abramowitz & Stegun 26.7.3/4).
+    Past 1000 degrees of freedom the normal quantile is within 0.1%.
+    """
+    import math
+    from statistics import NormalDist
+
+    if df > 1000:
+        return NormalDist().inv_cdf(0.5 + confidence / 2)
+
+    def central(t: float) -> float:
+        theta = math.atan(t / math.sqrt(df))
+        c2 = math.cos(theta) ** 2
+        if df % 2:
+            term, total = math.sin(theta) * math.cos(theta), 0.0
+            for k in range(3, df + 1, 2):
+                total += term
+                term *= c2 * (k - 1) / k
+            return 2 / math.pi * (theta + total)
+        term, total = 1.0, 0.0
+        for k in range(2, df + 1, 2):
+            total += term
+            term *= c2 * (k - 1) / k
+        return math.sin(theta) * total
+
+    lo, hi = 0.0, 1.0
+    while central(hi) < confidence:
+        hi *= 2
+    for _ in range(60):
+        mid = (lo + hi) / 2
+        lo, hi = (mid, hi) if central(mid) < confidence else (lo, mid)
+    return (lo + hi) / 2
+
+
+def estimate_mean(
+    values: list[float],
+    sampled: int,
+    population: int,
+    confidence: float = 0.95,
+    bounds: tuple[Optional[float], Optional[float]] = (None, None),
+) -> Estimate:
+    """Student's t interval for the mean of ``values``, clamped to ``bounds``.
+
+    ``sampled`` of ``population`` files were parsed. The finite population
+    correction uses that fraction rather than ``len(values)``, since
+    deduplication and sidechains mean sessions don't map one-to-one to files.
+    """
+    from statistics import mean, stdev
+
+    n = len(values)
+    if not n:
+        return Estimate(0.0, None, None, 0, population, confidence)
+    m = mean(values)
+    if sampled >= population:
+        return Estimate(m, m, m, n, population, confidence)  # a census: exact
+    if n < 2:
+        return Estimate(m, None, None, n, population, confidence)
+
+    fpc = (1 - sampled / population) ** 0.5
+    half = _t_critical(confidence, n - 1) * stdev(values) / n ** 0.5 * fpc
+    lo_bound, hi_bound = bounds
+    low = m - half if lo_bound is None else max(lo_bound, m - half)
+    high = m + half if hi_bound is None else min(hi_bound, m + half)
+    return Estimate(m, low, high, n, population, confidence)
 
 
 def build_summary(sessions: list[SessionMetrics]) -> MetricsSummary:
@@ -470,6 +714,11 @@ def build_summary(sessions: list[SessionMetrics]) -> MetricsSummary:
     if not sessions:
         return MetricsSummary()
 
+    with timings.stage("metrics.build_summary"):
+        return _build_summary(sessions)
+
+
+def _build_summary(sessions: list[SessionMetrics]) -> MetricsSummary:
     total = len(sessions)
     avg_engagement = round(sum(s.engagement_score for s in sessions) / total, 1)
     avg_override = round(sum(s.override_rate for s in sessions) / total, 3)
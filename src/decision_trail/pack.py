@@ -0,0 +1,226 @@
+"""Packed digest archives (``decision-trail pack``).
+
+Thousands of small ``decisions/digests/*.md`` files cost thousands of
+opens and stats on every ``metrics`` and ``profile`` run. ``pack`` moves
+older digests into one archive per month, ``decisions/packs/YYYY-MM.pack``:
+
+    magic    8 bytes   b"DTPACK01"
+    blobs    the digest files' bytes, back to back
+    index    JSON: [[name, offset, length], ...], sorted by name
+    footer   16 bytes: index offset and index length (little-endian u64)
+             then the magic again
+
+Readers memory-map the pack, read the footer and index, and slice out
+the digests they need. Loose files in ``decisions/digests`` override
+packed entries of the same name, so a digest can be fixed by writing it
+back as a loose file.
+"""
+
+from __future__ import annotations
+
+import json
+import mmap
+import re
+import struct
+from pathlib import Path
+from typing import Callable, Iterator, Optional
+
+MAGIC = b"DTPACK01"
+_FOOTER = struct.Struct("<QQ8s")
+
+PACK_DIR = "packs"
+PACK_SUFFIX = ".pack"
+
+_MONTH = re.compile(r"(\d{4}-\d{2})-\d{2}")
+
+
+class PackError(ValueError):
+    """A pack file is truncated or not a pack."""
+
+
+def _read_index(buf, label: str) -> dict[str, tuple[int, int]]:
+    """{name: (offset, length)} from the footer and index of a pack in ``buf``."""
+    if len(buf) < len(MAGIC) + _FOOTER.size or buf[:len(MAGIC)] != MAGIC:
+        raise PackError(f"{label}: not a digest pack")
+    index_offset, index_length, magic = _FOOTER.unpack_from(buf, len(buf) - _FOOTER.size)
+    if magic != MAGIC or index_offset + index_length > len(buf) - _FOOTER.size:
+        raise PackError(f"{label}: truncated pack")
+    entries = json.loads(bytes(buf[index_offset:index_offset + index_length]))
+    return {name: (offset, length) for name, offset, length in entries}
+
+
+class PackReader:
+    """Random access to the digests in one pack via mmap."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._file = open(path, "rb")
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:  # empty file
+            self._file.close()
+            raise PackError(f"{path}: empty pack")
+        try:
+            self._index = self._read_index()
+        except PackError:
+            self.close()
+            raise
+
+    def _read_index(self) -> dict[str, tuple[int, int]]:
+        return _read_index(self._map, str(self.path))
+
+    def names(self) -> list[str]:
+        return sorted(self._index)
+
+    def read_bytes(self, name: str) -> bytes:
+        offset, length = self._index[name]
+        return self._map[offset:offset + length]
+
+    def read_text(self, name: str) -> str:
+        return self.read_bytes(name).decode("utf-8")
+
+    def close(self) -> None:
+        self._map.close()
+        self._file.close()
+
+    def __enter__(self) -> "PackReader":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def write_pack(path: Path, files: dict[str, bytes]) -> Path:
+    """Atomically write a pack holding ``files`` (name -> content)."""
+    from .renderer import atomic_open
+
+    entries = []
+    with atomic_open(path, "wb") as f:
+        f.write(MAGIC)
+        offset = len(MAGIC)
+        for name in sorted(files):
+            data = files[name]
+            f.write(data)
+            entries.append([name, offset, len(data)])
+            offset += len(data)
+        index = json.dumps(entries, separators=(",", ":")).encode()
+        f.write(index)
+        f.write(_FOOTER.pack(offset, len(index), MAGIC))
+    return path
+
+
+def pack_paths(decisions_dir: Path) -> list[Path]:
+    pack_dir = decisions_dir / PACK_DIR
+    if not pack_dir.is_dir():
+        return []
+    return sorted(pack_dir.glob(f"*{PACK_SUFFIX}"))
+
+
+def iter_digest_texts(root: Path) -> Iterator[tuple[str, str]]:
+    """(file name, markdown) for every digest, packed or loose, in name order.
+
+    A loose file shadows a packed entry with the same name.
+    """
+    decisions_dir = root / "decisions"
+    digest_dir = decisions_dir / "digests"
+    loose = {p.name: p for p in digest_dir.glob("*.md")} if digest_dir.is_dir() else {}
+
+    packed: dict[str, PackReader] = {}
+    readers = [PackReader(p) for p in pack_paths(decisions_dir)]
+    try:
+        for reader in readers:
+            for name in reader.names():
+                if name not in loose:
+                    packed[name] = reader
+        for name in sorted(loose.keys() | packed.keys()):
+            if name in loose:
+                yield name, loose[name].read_text()
+            else:
+                yield name, packed[name].read_text(name)
+    finally:
+        for reader in readers:
+            reader.close()
+
+
+def unpack_bytes(data: bytes, label: str = "pack") -> dict[str, bytes]:
+    """{name: content} for a pack already in memory (e.g. a git blob)."""
+    index = _read_index(data, label)
+    return {name: data[offset:offset + length] for name, (offset, length) in sorted(index.items())}
+
+
+def parse_pack(path: Path, parse: Callable[[str, str], object]) -> dict[str, object]:
+    """{name: parse(name, text)} for every digest in a pack."""
+    with PackReader(path) as reader:
+        return {name: parse(name, reader.read_text(name)) for name in reader.names()}
+
+
+def merge_parsed(loose: dict, packs: dict) -> list:
+    """Combine cached parses in digest-name order, loose files shadowing packs.
+
+    ``loose`` maps path -> (stamp, parsed); ``packs`` maps pack path ->
+    (stamp, {name: parsed}), as kept by profile._refresh_dir.
+    """
+    merged: dict[str, object] = {}
+    for _, (_, entries) in sorted(packs.items()):
+        merged.update(entries)
+    for path, (_, parsed) in loose.items():
+        merged[path.name] = parsed
+    return [merged[name] for name in sorted(merged)]
+
+
+def digest_month(name: str) -> Optional[str]:
+    """The YYYY-MM a digest belongs to, from its file name."""
+    m = _MONTH.match(name)
+    return m.group(1) if m else None
+
+
+def new_digest_path(root: Path, day: str) -> Path:
+    """The next free ``decisions/digests/<day>-session-N.md``.
+
+    Names already in that month's pack count as taken, so a new digest
+    never shadows a packed one.
+    """
+    decisions_dir = root / "decisions"
+    digest_dir = decisions_dir / "digests"
+    taken = {p.name for p in digest_dir.glob(f"{day}-*.md")} if digest_dir.is_dir() else set()
+    pack_path = decisions_dir / PACK_DIR / f"{day[:7]}{PACK_SUFFIX}"
+    if pack_path.exists():
+        with PackReader(pack_path) as reader:
+            taken.update(name for name in reader.names() if name.startswith(f"{day}-"))
+
+    seq = len(taken) + 1
+    while f"{day}-session-{seq}.md" in taken:
+        seq += 1
+    return digest_dir / f"{day}-session-{seq}.md"
+
+
+def pack_digests(root: Path, before_month: str) -> dict[Path, list[Path]]:
+    """Move loose digests from months before ``before_month`` into monthly packs.
+
+    Existing packs are merged with the new files (loose content wins).
+    Returns {pack path: [loose files packed into it]}; the loose files are
+    left for the caller to delete once it is happy with the packs.
+    """
+    decisions_dir = root / "decisions"
+    digest_dir = decisions_dir / "digests"
+    pack_dir = decisions_dir / PACK_DIR
+
+    by_month: dict[str, list[Path]] = {}
+    for path in sorted(digest_dir.glob("*.md")) if digest_dir.is_dir() else []:
+        month = digest_month(path.name)
+        if month and month < before_month:
+            by_month.setdefault(month, []).append(path)
+
+    written: dict[Path, list[Path]] = {}
+    for month, paths in sorted(by_month.items()):
+        pack_dir.mkdir(parents=True, exist_ok=True)
+        pack_path = pack_dir / f"{month}{PACK_SUFFIX}"
+        files: dict[str, bytes] = {}
+        if pack_path.exists():
+            with PackReader(pack_path) as reader:
+                files = {name: bytes(reader.read_bytes(name)) for name in reader.names()}
+        for path in paths:
+            files[path.name] = path.read_bytes()
+        write_pack(pack_path, files)
+        written[pack_path] = paths
+    return written
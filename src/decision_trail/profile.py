@@ -6,6 +6,11 @@ import re
 from dataclasses import dataclass, field
 from pathlib import Path
 
+from . import timings
+
+# Digest sections whose bullets are judgment calls (/marmite and digest.py formats)
+DECISION_SECTIONS = {"redirects", "unchallenged", "wrong calls", "redirections", "choices made"}
+
 
 @dataclass
 class DigestData:
@@ -16,6 +21,7 @@ class DigestData:
     summary: str
     bullets: list[str] = field(default_factory=list)
     pattern: str | None = None
+    decisions: list[str] = field(default_factory=list)  # top-level redirect/choice bullets
 
 
 @dataclass
@@ -43,11 +49,18 @@ class ProfileData:
     beyond_fluency_signals: list[str] = field(default_factory=list)
     digests: list[DigestData] = field(default_factory=list)
     synthesis: list[SynthesisData] = field(default_factory=list)
+    recurring_moments: list = field(default_factory=list)  # clusters.Cluster, largest first
+    trend_charts: list = field(default_factory=list)  # charts.TrendChart
 
 
 def parse_digest(path: Path) -> DigestData:
     """Parse a single digest markdown file."""
-    text = path.read_text().strip()
+    return parse_digest_text(path.read_text())
+
+
+def parse_digest_text(text: str) -> DigestData:
+    """Parse digest markdown that has already been read (e.g. from git history)."""
+    text = text.strip()
     lines = text.splitlines()
 
     # Parse title: "# YYYY-MM-DD — topic"
@@ -65,8 +78,10 @@ def parse_digest(path: Path) -> DigestData:
     # Find summary (first non-empty line after title)
     summary = ""
     bullets = []
+    decisions = []
     pattern = None
     in_body = False
+    section = None
 
     for line in lines[1:]:
         stripped = line.strip()
@@ -76,6 +91,8 @@ def parse_digest(path: Path) -> DigestData:
         if not in_body:
             continue
 
+        if stripped.startswith("## "):
+            section = stripped[3:].strip().lower()
         if stripped.startswith("- "):
             bullet_text = stripped[2:].strip()
             # Check if this is a pattern line
@@ -83,6 +100,9 @@ def parse_digest(path: Path) -> DigestData:
                 pattern = bullet_text[len("pattern:"):].strip()
             else:
                 bullets.append(bullet_text)
+                # Sub-bullets ("AI was doing:", "Context:") only describe their parent
+                if line.startswith("- ") and (section is None or section in DECISION_SECTIONS):
+                    decisions.append(bullet_text.replace("**", "").strip())
         elif not bullets and not summary:
             summary = stripped
 
@@ -92,12 +112,18 @@ def parse_digest(path: Path) -> DigestData:
         summary=summary,
         bullets=bullets,
         pattern=pattern,
+        decisions=decisions,
     )
 
 
 def parse_synthesis(path: Path) -> SynthesisData:
     """Parse a monthly synthesis markdown file."""
-    text = path.read_text().strip()
+    return parse_synthesis_text(path.read_text())
+
+
+def parse_synthesis_text(text: str) -> SynthesisData:
+    """Parse synthesis markdown that has already been read."""
+    text = text.strip()
     lines = text.splitlines()
 
     # Parse title: "# Synthesis — Month Year (N sessions)"
@@ -218,21 +244,76 @@ def _build_beyond_fluency(synthesis_list: list[SynthesisData]) -> list[str]:
 
 
 def build_profile(root: Path) -> ProfileData:
-    """Read all digests and synthesis files, return a ProfileData."""
-    digest_dir = root / "decisions" / "digests"
+    """Read all digests (loose and packed) and synthesis files, return a ProfileData."""
+    from .metrics import parse_digest_metrics_text
+    from .pack import iter_digest_texts
+
     synthesis_dir = root / "decisions" / "synthesis"
 
-    # Parse digests
+    # Parse digests (and their metrics, for the trend charts)
     digests: list[DigestData] = []
-    if digest_dir.is_dir():
-        for path in sorted(digest_dir.glob("*.md")):
-            digests.append(parse_digest(path))
+    sessions = []
+    with timings.stage("profile.parse_digests"):
+        for name, text in iter_digest_texts(root):
+            digests.append(parse_digest_text(text))
+            sessions.append(parse_digest_metrics_text(text, Path(name).stem))
+    timings.count("profile.digests", len(digests))
 
     # Parse synthesis
     synthesis_list: list[SynthesisData] = []
-    if synthesis_dir.is_dir():
-        for path in sorted(synthesis_dir.glob("*.md")):
-            synthesis_list.append(parse_synthesis(path))
+    with timings.stage("profile.parse_synthesis"):
+        if synthesis_dir.is_dir():
+            for path in sorted(synthesis_dir.glob("*.md")):
+                synthesis_list.append(parse_synthesis(path))
+    timings.count("profile.synthesis", len(synthesis_list))
+
+    return assemble_profile(digests, synthesis_list, sessions)
+
+
+def assemble_profile(
+    digests: list[DigestData],
+    synthesis_list: list[SynthesisData],
+    sessions: list | None = None,
+    sketches: list | None = None,
+    cluster_index=None,
+) -> ProfileData:
+    """Build a ProfileData from already-parsed digests and synthesis files.
+
+    ``sessions`` are the digests' metrics.SessionMetrics, in the same
+    order; without them the profile has no trend charts. ``sketches`` are
+    the digests' cached ``clusters.digest_sketches``, in the same order;
+    without them every bullet is hashed again. ``cluster_index`` is a
+    clusters.ClusterIndex holding a prefix of the bullets, to extend.
+    """
+    with timings.stage("profile.assemble"):
+        return _assemble_profile(digests, synthesis_list, sessions or [], sketches, cluster_index)
+
+
+def _build_recurring_moments(
+    digests: list[DigestData],
+    sessions: list,
+    sketches: list | None = None,
+    index=None,
+    max_count: int = 5,
+) -> list:
+    """Redirects and choices that keep coming back in different words."""
+    from .clusters import cluster_moments, digest_moments
+
+    # Session dates read both title formats; DigestData.date only the /marmite one
+    dates = [s.date for s in sessions] if len(sessions) == len(digests) else None
+    flat = None if sketches is None else [s for per_digest in sketches for s in per_digest]
+    moments = digest_moments(digests, dates)
+    return cluster_moments(moments, sketches=flat, index=index)[:max_count]
+
+
+def _assemble_profile(
+    digests: list[DigestData],
+    synthesis_list: list[SynthesisData],
+    sessions: list,
+    sketches: list | None,
+    cluster_index,
+) -> ProfileData:
+    from .charts import build_trend_charts
 
     # Compute stats
     total_sessions = len(digests)
@@ -254,4 +335,117 @@ def build_profile(root: Path) -> ProfileData:
         beyond_fluency_signals=_build_beyond_fluency(synthesis_list),
         digests=digests,
         synthesis=synthesis_list,
+        recurring_moments=_build_recurring_moments(digests, sessions, sketches, cluster_index),
+        trend_charts=build_trend_charts(sessions),
     )
+
+
+# ---------------------------------------------------------------------------
+# Incremental rebuilds
+# ---------------------------------------------------------------------------
+
+class ProfileCache:
+    """Keeps parsed digests and synthesis files between builds.
+
+    ``refresh()`` stats the decisions tree and re-parses only files whose
+    mtime or size changed, so repeated builds (e.g. ``serve --watch``) cost
+    a directory scan rather than a full re-parse. Each digest's bullet
+    sketches for recurring-moment clustering are cached with it. The
+    clustering index is kept too and only extended while digests are added
+    after the ones it holds; the last ProfileData is reused until something
+    changes.
+    """
+
+    def __init__(self, root: Path):
+        self.root = root
+        # Digests are cached as (DigestData, SessionMetrics, sketches) entries
+        self._digests: dict[Path, tuple[tuple[int, int], tuple]] = {}
+        self._packs: dict[Path, tuple[tuple[int, int], dict[str, tuple]]] = {}
+        self._synthesis: dict[Path, tuple[tuple[int, int], SynthesisData]] = {}
+        self._built: ProfileData | None = None
+        self._cluster_index = None
+        self._clustered: list[list] = []  # per-digest sketches in the index, in order
+
+    def refresh(self) -> bool:
+        """Re-parse changed files. Returns True if anything was added, changed or removed."""
+        from .pack import PACK_DIR, PACK_SUFFIX, parse_pack
+
+        decisions_dir = self.root / "decisions"
+        changed = _refresh_dir(
+            decisions_dir / "digests",
+            self._digests,
+            lambda path: _parse_digest_entry(path.name, path.read_text()),
+        )
+        changed |= _refresh_dir(
+            decisions_dir / PACK_DIR,
+            self._packs,
+            lambda path: parse_pack(path, _parse_digest_entry),
+            pattern=f"*{PACK_SUFFIX}",
+        )
+        changed |= _refresh_dir(decisions_dir / "synthesis", self._synthesis, parse_synthesis)
+        if changed:
+            self._built = None
+        return changed
+
+    def build(self) -> ProfileData:
+        """Assemble a ProfileData from the cached parses, in file-name order.
+
+        Returns the previous build unchanged if nothing changed since.
+        """
+        from .clusters import ClusterIndex
+        from .pack import merge_parsed
+
+        if self._built is None:
+            entries = merge_parsed(self._digests, self._packs)
+            sketches = [s for _, _, s in entries]
+            # Cached sketch lists are replaced when their digest is re-parsed,
+            # so identity tells whether the index still holds a prefix
+            old = self._clustered
+            if len(old) > len(sketches) or any(a is not b for a, b in zip(old, sketches)):
+                self._cluster_index = None
+            if self._cluster_index is None:
+                self._cluster_index = ClusterIndex()
+            self._clustered = sketches
+
+            synthesis_list = [self._synthesis[p][1] for p in sorted(self._synthesis)]
+            self._built = assemble_profile(
+                [digest for digest, _, _ in entries],
+                synthesis_list,
+                [m for _, m, _ in entries],
+                sketches,
+                self._cluster_index,
+            )
+        return self._built
+
+
+def _parse_digest_entry(name: str, text: str) -> tuple:
+    from .clusters import digest_sketches
+    from .metrics import parse_digest_metrics_text
+
+    digest = parse_digest_text(text)
+    return digest, parse_digest_metrics_text(text, Path(name).stem), digest_sketches(digest)
+
+
+def _refresh_dir(directory: Path, cache: dict, parse, pattern: str = "*.md") -> bool:
+    """Sync ``cache`` with the files matching ``pattern`` in ``directory``."""
+    seen: set[Path] = set()
+    changed = False
+
+    if directory.is_dir():
+        for path in directory.glob(pattern):
+            try:
+                st = path.stat()
+                stamp = (st.st_mtime_ns, st.st_size)
+                cached = cache.get(path)
+                if cached is None or cached[0] != stamp:
+                    cache[path] = (stamp, parse(path))
+                    changed = True
+            except FileNotFoundError:
+                continue  # removed mid-scan; dropped from the cache below
+            seen.add(path)
+
+    for path in set(cache) - seen:
+        del cache[path]
+        changed = True
+
+    return changed
@@ -2,16 +2,38 @@
 
 from __future__ import annotations
 
+import gzip
+import hashlib
+import json
+import os
+import secrets
+from contextlib import contextmanager
+from functools import lru_cache
 from pathlib import Path
+from typing import IO, Iterable, Iterator
 
 from jinja2 import Environment, FileSystemLoader, select_autoescape
 
+from . import timings
 from .profile import ProfileData
+from .site_search import build_search_index, dump_search_index
 
 TEMPLATE_DIR = Path(__file__).parent / "templates"
 
+# Fingerprinted assets never change under the same name, so they can be
+# cached forever. The HTML entry point has a stable name and must revalidate.
+IMMUTABLE_CACHE = "public, max-age=31536000, immutable"
+REVALIDATE_CACHE = "public, max-age=0, must-revalidate"
 
+MANIFEST_NAME = "manifest.json"
+SEARCH_INDEX_NAME = "search-index.json"
+
+CHUNK_SIZE = 64 * 1024
+
+
+@lru_cache(maxsize=None)
 def _env() -> Environment:
+    # Shared so compiled templates are reused; Jinja re-checks file mtimes
     return Environment(
         loader=FileSystemLoader(str(TEMPLATE_DIR)),
         autoescape=select_autoescape(enabled_extensions=("html",), default=False),
@@ -24,32 +46,263 @@ def render_markdown(profile: ProfileData) -> str:
     """Render profile to markdown."""
     env = _env()
     template = env.get_template("profile.md.j2")
-    return template.render(profile=profile)
+    with timings.stage("render.markdown"):
+        return template.render(profile=profile)
+
+
+def _html_context(
+    profile: ProfileData,
+    css_href: str | None,
+    live_reload_url: str | None,
+    search_index_url: str | None,
+) -> dict:
+    css = "" if css_href else (TEMPLATE_DIR / "base.css").read_text()
+    return {
+        "profile": profile,
+        "css": css,
+        "css_href": css_href,
+        "live_reload_url": live_reload_url,
+        "search_index_url": search_index_url,
+    }
+
 
+def render_html(
+    profile: ProfileData,
+    css_href: str | None = None,
+    live_reload_url: str | None = None,
+    search_index_url: str | None = None,
+) -> str:
+    """Render profile to a standalone HTML page.
 
-def render_html(profile: ProfileData) -> str:
-    """Render profile to a standalone HTML page."""
+    The CSS is inlined unless ``css_href`` is given, in which case the page
+    links to that stylesheet instead. ``live_reload_url`` adds a script that
+    reloads the page when that server-sent events endpoint fires ``reload``.
+    ``search_index_url`` adds a search box backed by that index file.
+    """
     env = _env()
-    css = (TEMPLATE_DIR / "base.css").read_text()
     template = env.get_template("profile.html.j2")
-    return template.render(profile=profile, css=css)
+    with timings.stage("render.html"):
+        return template.render(
+            **_html_context(profile, css_href, live_reload_url, search_index_url)
+        )
+
+
+# ---------------------------------------------------------------------------
+# Streaming output
+# ---------------------------------------------------------------------------
+
+@contextmanager
+def atomic_open(path: Path, mode: str = "w") -> Iterator[IO]:
+    """Open a temp file next to ``path`` and rename it over ``path`` on success.
+
+    Readers (and a Pages deploy) see either the old file or the complete new
+    one, never a partial write. On error the temp file is removed.
+    """
+    tmp = path.with_name(f".{path.name}.{secrets.token_hex(4)}.tmp")
+    kwargs = {} if "b" in mode else {"encoding": "utf-8"}
+    try:
+        # "x" so the temp file honours the umask and never clobbers anything
+        with open(tmp, mode.replace("w", "x"), **kwargs) as f:
+            yield f
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+
+
+def _write_chunks(path: Path, chunks: Iterable[str]) -> Path:
+    with atomic_open(path) as f:
+        for chunk in chunks:
+            f.write(chunk)
+    return path
 
 
-def write_profile(profile: ProfileData, root: Path, fmt: str = "md") -> list[Path]:
-    """Write profile files. fmt: 'md', 'html', or 'both'. Returns written paths."""
+def stream_markdown(profile: ProfileData, path: Path) -> Path:
+    """Render the markdown profile straight to ``path`` without building the full string."""
+    template = _env().get_template("profile.md.j2")
+    with timings.stage("render.markdown"):
+        return _write_chunks(path, template.generate(profile=profile))
+
+
+def stream_html(
+    profile: ProfileData,
+    path: Path,
+    css_href: str | None = None,
+    live_reload_url: str | None = None,
+    search_index_url: str | None = None,
+) -> Path:
+    """Render the HTML profile straight to ``path``. Arguments as for render_html."""
+    template = _env().get_template("profile.html.j2")
+    context = _html_context(profile, css_href, live_reload_url, search_index_url)
+    with timings.stage("render.html"):
+        return _write_chunks(path, template.generate(**context))
+
+
+def write_profile(
+    profile: ProfileData,
+    root: Path,
+    fmt: str = "md",
+    static: bool = False,
+) -> list[Path]:
+    """Write profile files. fmt: 'md', 'html', or 'both'. Returns written paths.
+
+    Pages are streamed to disk chunk by chunk and renamed into place once
+    complete, so memory stays bounded and a failed render leaves the
+    previous output untouched.
+
+    With ``static=True`` the HTML output is prepared for static hosts: the CSS
+    and search index get content-hashed names, every file gets ``.gz`` (and
+    ``.br`` when brotli is installed) siblings, and a manifest describing
+    them is written alongside. A plain build removes those files again, so
+    a host serving precompressed siblings can't serve a stale page.
+    """
     written: list[Path] = []
 
     if fmt in ("md", "both"):
         md_path = root / "decisions" / "profile.md"
         md_path.parent.mkdir(parents=True, exist_ok=True)
-        md_path.write_text(render_markdown(profile))
-        written.append(md_path)
+        written.append(stream_markdown(profile, md_path))
 
     if fmt in ("html", "both"):
         html_dir = root / "docs" / "profile"
         html_dir.mkdir(parents=True, exist_ok=True)
-        html_path = html_dir / "index.html"
-        html_path.write_text(render_html(profile))
-        written.append(html_path)
+        if static:
+            written.extend(_write_static_html(profile, html_dir))
+        else:
+            _remove_static_output(html_dir)
+            index_path = html_dir / SEARCH_INDEX_NAME
+            _write_chunks(index_path, [dump_search_index(build_search_index(profile))])
+            html_path = html_dir / "index.html"
+            stream_html(profile, html_path, search_index_url=SEARCH_INDEX_NAME)
+            written.extend([html_path, index_path])
+
+    return written
+
+
+# ---------------------------------------------------------------------------
+# Static output (fingerprinted + precompressed)
+# ---------------------------------------------------------------------------
+
+def _fingerprint(data: bytes, length: int = 10) -> str:
+    """Short content hash used in asset file names."""
+    return hashlib.sha256(data).hexdigest()[:length]
+
+
+def _read_chunks(path: Path) -> Iterator[bytes]:
+    with open(path, "rb") as f:
+        while chunk := f.read(CHUNK_SIZE):
+            yield chunk
+
+
+def _compress_siblings(path: Path) -> dict[str, str]:
+    """Write .gz and .br siblings of a file. Returns encoding -> file name."""
+    siblings: dict[str, str] = {}
+
+    gz_path = path.with_name(path.name + ".gz")
+    # mtime=0 and no embedded name keep the output byte-identical across builds
+    with atomic_open(gz_path, "wb") as raw, gzip.GzipFile(
+        filename="", mode="wb", fileobj=raw, compresslevel=9, mtime=0,
+    ) as gz:
+        for chunk in _read_chunks(path):
+            gz.write(chunk)
+    siblings["gzip"] = gz_path.name
+
+    br_path = path.with_name(path.name + ".br")
+    try:
+        import brotli
+    except ImportError:
+        # Brotli is optional — drop any stale sibling so it can't be served
+        br_path.unlink(missing_ok=True)
+    else:
+        compressor = brotli.Compressor(quality=11)
+        with atomic_open(br_path, "wb") as br:
+            for chunk in _read_chunks(path):
+                br.write(compressor.process(chunk))
+            br.write(compressor.finish())
+        siblings["br"] = br_path.name
+
+    return siblings
+
+
+def _describe(path: Path) -> tuple[str, int]:
+    """(sha256 hex digest, size) of a file, read in chunks."""
+    digest = hashlib.sha256()
+    size = 0
+    for chunk in _read_chunks(path):
+        digest.update(chunk)
+        size += len(chunk)
+    return digest.hexdigest(), size
+
+
+def _remove_static_output(html_dir: Path) -> None:
+    """Delete the assets, compressed siblings and manifest of a previous static build."""
+    manifest_path = html_dir / MANIFEST_NAME
+    try:
+        manifest = json.loads(manifest_path.read_text())
+    except (OSError, ValueError):
+        return
+
+    for entry in manifest.values():
+        names = list(entry.get("encodings", {}).values())
+        if entry.get("file") != "index.html":  # the plain build rewrites the page itself
+            names.append(entry.get("file"))
+        for name in names:
+            if name and Path(name).name == name:  # never follow paths out of html_dir
+                (html_dir / name).unlink(missing_ok=True)
+    manifest_path.unlink()
+
+
+def _write_static_html(profile: ProfileData, html_dir: Path) -> list[Path]:
+    """Write fingerprinted assets, the HTML page, compressed siblings and a manifest."""
+    css_bytes = (TEMPLATE_DIR / "base.css").read_bytes()
+    css_name = f"profile.{_fingerprint(css_bytes)}.css"
+
+    index_bytes = dump_search_index(build_search_index(profile)).encode("utf-8")
+    index_name = f"search.{_fingerprint(index_bytes)}.json"
+
+    with atomic_open(html_dir / css_name, "wb") as f:
+        f.write(css_bytes)
+    with atomic_open(html_dir / index_name, "wb") as f:
+        f.write(index_bytes)
+    stream_html(profile, html_dir / "index.html", css_href=css_name, search_index_url=index_name)
+
+    # Remove assets from previous builds so the directory doesn't grow
+    for pattern, current in (("profile.*.css*", css_name), ("search.*.json*", index_name)):
+        for stale in html_dir.glob(pattern):
+            if not stale.name.startswith(current):
+                stale.unlink()
+
+    # (logical name, file name, content type, cache policy)
+    files = [
+        ("index.html", "index.html", "text/html; charset=utf-8", REVALIDATE_CACHE),
+        ("profile.css", css_name, "text/css; charset=utf-8", IMMUTABLE_CACHE),
+        (SEARCH_INDEX_NAME, index_name, "application/json", IMMUTABLE_CACHE),
+    ]
+
+    written: list[Path] = []
+    manifest: dict[str, dict] = {}
+
+    for logical, name, content_type, cache_control in files:
+        path = html_dir / name
+        with timings.stage("render.compress"):
+            siblings = _compress_siblings(path)
+        sha256, size = _describe(path)
+
+        written.append(path)
+        written.extend(html_dir / s for s in siblings.values())
+        manifest[logical] = {
+            "file": name,
+            "sha256": sha256,
+            "size": size,
+            "content_type": content_type,
+            "cache_control": cache_control,
+            "encodings": siblings,
+        }
+
+    manifest_path = html_dir / MANIFEST_NAME
+    _write_chunks(manifest_path, [json.dumps(manifest, indent=2, sort_keys=True), "\n"])
+    written.append(manifest_path)
 
     return written
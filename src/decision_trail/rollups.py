@@ -0,0 +1,410 @@
+"""Materialized weekly and monthly rollups of digest metrics.
+
+``build_summary`` walks every session. For long histories the per-period
+views (``metrics --by week|month``) read ``decisions/rollups.json``
+instead. That file holds one mergeable aggregate per bucket (counts, sums
+for the averages, min/max and alert counters). It also records, for each
+source (a loose digest or a pack), its size/mtime stamp and the buckets it
+fed.
+
+``update_rollups`` re-reads only what changed. New sources are folded in.
+A changed or removed source invalidates the buckets it fed, and only those
+buckets are rebuilt. Sources are stamped with a sha256 of their content,
+so a fresh clone or checkout (new mtimes) finds the committed file
+current. To avoid re-hashing unchanged files, the hashes are remembered
+by path, mtime and size in a local cache outside the repo.
+
+``group_sessions`` (``metrics --group-by``) uses the same aggregate plus a
+short window of each group's latest sessions, which is all the trend and
+coasting checks look at. Partials over consecutive runs of sessions merge
+in order, so chunks can be aggregated separately and combined.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from dataclasses import asdict, dataclass, field
+from datetime import date
+from pathlib import Path
+from typing import Iterable, Optional
+
+from . import timings
+from .metrics import (
+    MetricsSummary,
+    SessionMetrics,
+    _build_trend,
+    _detect_coasting,
+    parse_digest_metrics,
+    parse_digest_metrics_text,
+)
+
+ROLLUPS_FILE = "rollups.json"
+SCHEMA_VERSION = 2
+
+PERIODS = ("week", "month")
+
+# Same cut-off the metrics table colours red
+LOW_ENGAGEMENT = 35.0
+# Buckets smaller than this don't raise alerts
+MIN_ALERT_SESSIONS = 3
+
+GROUP_BY = ("project", "topic", "month")
+# Latest sessions kept per group: enough for MA10 and the six-session
+# coasting checks
+WINDOW = 10
+
+
+@dataclass
+class Rollup:
+    """Aggregate metrics for one bucket (a week, a month, or any group)."""
+
+    key: str
+    sessions: int = 0
+    redirects: int = 0
+    unchallenged: int = 0
+    wrong_calls: int = 0
+    override_sum: float = 0.0
+    engagement_sum: float = 0.0
+    override_min: Optional[float] = None
+    override_max: Optional[float] = None
+    engagement_min: Optional[float] = None
+    engagement_max: Optional[float] = None
+    zero_redirect_sessions: int = 0
+    low_engagement_sessions: int = 0
+
+    @property
+    def avg_override_rate(self) -> float:
+        return round(self.override_sum / self.sessions, 3) if self.sessions else 0.0
+
+    @property
+    def avg_engagement_score(self) -> float:
+        return round(self.engagement_sum / self.sessions, 1) if self.sessions else 0.0
+
+    @property
+    def alerts(self) -> list[str]:
+        """Coasting flags for the bucket as a whole."""
+        if self.sessions < MIN_ALERT_SESSIONS:
+            return []
+        alerts = []
+        if self.redirects == 0:
+            alerts.append("no redirects")
+        if self.low_engagement_sessions * 2 > self.sessions:
+            alerts.append("mostly low engagement")
+        return alerts
+
+    def add(self, s: SessionMetrics) -> None:
+        self.sessions += 1
+        self.redirects += s.redirect_count
+        self.unchallenged += s.unchallenged_count
+        self.wrong_calls += s.wrong_call_count
+        self.override_sum += s.override_rate
+        self.engagement_sum += s.engagement_score
+        self.override_min = _min(self.override_min, s.override_rate)
+        self.override_max = _max(self.override_max, s.override_rate)
+        self.engagement_min = _min(self.engagement_min, s.engagement_score)
+        self.engagement_max = _max(self.engagement_max, s.engagement_score)
+        self.zero_redirect_sessions += s.redirect_count == 0
+        self.low_engagement_sessions += s.engagement_score < LOW_ENGAGEMENT
+
+    def merge(self, other: "Rollup") -> None:
+        """Fold another bucket's aggregate into this one."""
+        self.sessions += other.sessions
+        self.redirects += other.redirects
+        self.unchallenged += other.unchallenged
+        self.wrong_calls += other.wrong_calls
+        self.override_sum += other.override_sum
+        self.engagement_sum += other.engagement_sum
+        self.override_min = _min(self.override_min, other.override_min)
+        self.override_max = _max(self.override_max, other.override_max)
+        self.engagement_min = _min(self.engagement_min, other.engagement_min)
+        self.engagement_max = _max(self.engagement_max, other.engagement_max)
+        self.zero_redirect_sessions += other.zero_redirect_sessions
+        self.low_engagement_sessions += other.low_engagement_sessions
+
+
+def _min(a: Optional[float], b: Optional[float]) -> Optional[float]:
+    return b if a is None else a if b is None else min(a, b)
+
+
+def _max(a: Optional[float], b: Optional[float]) -> Optional[float]:
+    return b if a is None else a if b is None else max(a, b)
+
+
+def bucket_key(session_date: str, period: str) -> Optional[str]:
+    """"2024-W03" or "2024-01" for a YYYY-MM-DD date; None if it doesn't parse."""
+    try:
+        d = date.fromisoformat(session_date[:10])
+    except ValueError:
+        return None
+    if period == "week":
+        year, week, _ = d.isocalendar()
+        return f"{year}-W{week:02d}"
+    return f"{d.year}-{d.month:02d}"
+
+
+def rollup_sessions(sessions: Iterable[SessionMetrics], period: str) -> list[Rollup]:
+    """Aggregate sessions in memory, for sources that have no materialized rollups."""
+    buckets: dict[str, Rollup] = {}
+    for s in sessions:
+        key = bucket_key(s.date, period)
+        if key is not None:
+            buckets.setdefault(key, Rollup(key)).add(s)
+    return [buckets[k] for k in sorted(buckets)]
+
+
+# ---------------------------------------------------------------------------
+# Group-by (metrics --group-by)
+# ---------------------------------------------------------------------------
+
+@dataclass
+class GroupAggregate(Rollup):
+    """A Rollup that also keeps the group's last WINDOW sessions, in order."""
+
+    recent: list[SessionMetrics] = field(default_factory=list)
+
+    def add(self, s: SessionMetrics) -> None:
+        super().add(s)
+        self.recent.append(s)
+        if len(self.recent) > WINDOW:
+            del self.recent[0]
+
+    def merge(self, other: "GroupAggregate") -> None:
+        """Fold in the aggregate of the sessions that come right after these."""
+        super().merge(other)
+        self.recent = (self.recent + other.recent)[-WINDOW:]
+
+    def summary(self) -> MetricsSummary:
+        """The group as a MetricsSummary; ``sessions`` holds only the recent window."""
+        return MetricsSummary(
+            sessions=self.recent,
+            total_sessions=self.sessions,
+            avg_engagement_score=self.avg_engagement_score,
+            avg_override_rate=self.avg_override_rate,
+            total_redirects=self.redirects,
+            total_unchallenged=self.unchallenged,
+            total_wrong_calls=self.wrong_calls,
+            override_rate_trend=_build_trend([s.override_rate for s in self.recent]),
+            engagement_trend=_build_trend([s.engagement_score for s in self.recent]),
+            coasting_alerts=_detect_coasting(self.recent),
+        )
+
+
+def group_key(s: SessionMetrics, by: str) -> str:
+    if by == "month":
+        return bucket_key(s.date, "month") or "undated"
+    value = s.project if by == "project" else s.topic
+    return value or "—"
+
+
+def group_sessions(sessions: Iterable[SessionMetrics], by: str) -> dict[str, GroupAggregate]:
+    """One pass over chronologically ordered sessions: {group key: aggregate}."""
+    groups: dict[str, GroupAggregate] = {}
+    for s in sessions:
+        key = group_key(s, by)
+        group = groups.get(key)
+        if group is None:
+            group = groups[key] = GroupAggregate(key)
+        group.add(s)
+    return groups
+
+
+def merge_groups(parts: Iterable[dict[str, GroupAggregate]]) -> dict[str, GroupAggregate]:
+    """Combine group_sessions() partials, given in session order."""
+    merged: dict[str, GroupAggregate] = {}
+    for part in parts:
+        for key, group in part.items():
+            if key in merged:
+                merged[key].merge(group)
+            else:
+                merged[key] = GroupAggregate(key)
+                merged[key].merge(group)
+    return merged
+
+
+# ---------------------------------------------------------------------------
+# Materialized store
+# ---------------------------------------------------------------------------
+
+@dataclass
+class RollupStore:
+    """The contents of decisions/rollups.json."""
+
+    sources: dict[str, dict] = field(default_factory=dict)  # name -> {"stamp": [sha256, ...], "buckets": [...]}
+    buckets: dict[str, dict[str, Rollup]] = field(default_factory=lambda: {p: {} for p in PERIODS})
+
+    def rollups(self, period: str) -> list[Rollup]:
+        """Buckets for ``period`` in chronological order."""
+        return [self.buckets[period][k] for k in sorted(self.buckets[period])]
+
+
+def rollups_path(root: Path) -> Path:
+    return root / "decisions" / ROLLUPS_FILE
+
+
+def load_rollups(root: Path) -> RollupStore:
+    """Read the materialized rollups; an empty store if missing or outdated."""
+    try:
+        data = json.loads(rollups_path(root).read_text())
+    except (OSError, ValueError):
+        return RollupStore()
+    if data.get("version") != SCHEMA_VERSION:
+        return RollupStore()
+    return RollupStore(
+        sources=data["sources"],
+        buckets={
+            period: {key: Rollup(**fields) for key, fields in data["buckets"].get(period, {}).items()}
+            for period in PERIODS
+        },
+    )
+
+
+def save_rollups(root: Path, store: RollupStore) -> Path:
+    from .renderer import atomic_open
+
+    path = rollups_path(root)
+    data = {
+        "version": SCHEMA_VERSION,
+        "sources": store.sources,
+        "buckets": {
+            period: {key: asdict(r) for key, r in sorted(store.buckets[period].items())}
+            for period in PERIODS
+        },
+    }
+    # Indented, one entry per line, so digests committed on different
+    # branches merge like any other text file
+    with atomic_open(path) as f:
+        json.dump(data, f, indent=1, sort_keys=True)
+        f.write("\n")
+    return path
+
+
+def default_hash_cache_path() -> Path:
+    override = os.environ.get("DECISION_TRAIL_ROLLUP_CACHE")
+    if override:
+        return Path(override)
+    cache = Path(os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache")
+    return cache / "decision-trail" / "rollup-hashes.json"
+
+
+class _HashCache:
+    """sha256 of files, reused while a file's mtime and size stay the same."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        try:
+            self._entries: dict[str, list] = json.loads(path.read_text())
+        except (OSError, ValueError):
+            self._entries = {}
+        self._dirty = False
+
+    def sha256(self, path: Path) -> str:
+        st = path.stat()
+        key = str(path.resolve())
+        entry = self._entries.get(key)
+        if entry and entry[0] == st.st_mtime_ns and entry[1] == st.st_size:
+            return entry[2]
+        h = hashlib.sha256()
+        with open(path, "rb") as f:
+            while chunk := f.read(64 * 1024):
+                h.update(chunk)
+        digest = h.hexdigest()
+        self._entries[key] = [st.st_mtime_ns, st.st_size, digest]
+        self._dirty = True
+        return digest
+
+    def save(self) -> None:
+        from .renderer import atomic_open
+
+        if not self._dirty:
+            return
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with atomic_open(self.path) as f:
+                json.dump(self._entries, f)
+        except OSError:
+            pass  # only a speed-up
+
+
+def _current_sources(root: Path, hashes: _HashCache) -> dict[str, tuple[Path, list]]:
+    """{source name: (path, stamp)} for loose digests and packs.
+
+    A stamp is the content's sha256. A pack's stamp also lists the names a
+    loose file shadows, so adding or removing a loose override invalidates
+    the pack's buckets too.
+    """
+    from .pack import PackReader, pack_paths
+
+    decisions_dir = root / "decisions"
+    digest_dir = decisions_dir / "digests"
+    loose = sorted(digest_dir.glob("*.md")) if digest_dir.is_dir() else []
+    loose_names = {p.name for p in loose}
+
+    sources: dict[str, tuple[Path, list]] = {}
+    for path in loose:
+        sources[f"digests/{path.name}"] = (path, [hashes.sha256(path)])
+    for path in pack_paths(decisions_dir):
+        with PackReader(path) as reader:
+            shadowed = sorted(loose_names.intersection(reader.names()))
+        sources[f"packs/{path.name}"] = (path, [hashes.sha256(path), shadowed])
+    return sources
+
+
+def _source_sessions(path: Path, stamp: list) -> list[SessionMetrics]:
+    from .pack import PACK_SUFFIX, PackReader
+
+    if path.suffix != PACK_SUFFIX:
+        return [parse_digest_metrics(path)]
+    shadowed = set(stamp[1])
+    with PackReader(path) as reader:
+        return [
+            parse_digest_metrics_text(reader.read_text(name), Path(name).stem)
+            for name in reader.names()
+            if name not in shadowed
+        ]
+
+
+def update_rollups(root: Path) -> RollupStore:
+    """Bring decisions/rollups.json up to date with the digests and return it."""
+    with timings.stage("rollups.update"):
+        store = load_rollups(root)
+        hashes = _HashCache(default_hash_cache_path())
+        current = _current_sources(root, hashes)
+        hashes.save()
+
+        stale = [n for n, src in store.sources.items() if n not in current or src["stamp"] != current[n][1]]
+        added = [n for n in current if n not in store.sources]
+        if not stale and not added:
+            return store
+
+        # Buckets a stale source fed are rebuilt from scratch, which means
+        # re-reading every other source that fed them (for those buckets only)
+        dirty = {b for n in stale for b in store.sources[n]["buckets"]}
+        for n in stale:
+            del store.sources[n]
+        reread = [n for n, src in store.sources.items() if dirty.intersection(src["buckets"])]
+        for b in dirty:
+            period, key = b.split(":", 1)
+            store.buckets[period].pop(key, None)
+
+        refreshed = set(reread)
+        to_read = sorted(set(added) | {n for n in stale if n in current} | refreshed)
+        for name in to_read:
+            path, stamp = current[name]
+            fed: set[str] = set(store.sources[name]["buckets"]) if name in refreshed else set()
+            for s in _source_sessions(path, stamp):
+                for period in PERIODS:
+                    key = bucket_key(s.date, period)
+                    if key is None:
+                        continue
+                    b = f"{period}:{key}"
+                    if name in refreshed and b not in dirty:
+                        continue  # already counted in a bucket that stayed valid
+                    store.buckets[period].setdefault(key, Rollup(key)).add(s)
+                    fed.add(b)
+            store.sources[name] = {"stamp": stamp, "buckets": sorted(fed)}
+
+        timings.count("rollups.sources_read", len(to_read))
+        save_rollups(root, store)
+    return store
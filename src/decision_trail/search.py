@@ -0,0 +1,272 @@
+"""Persistent full-text search over decision moments (``decision-trail search``).
+
+Every decision candidate the extractor finds in a session log, and every
+bullet in a digest, is stored as a row in a SQLite database with an FTS5
+index over it, ranked by BM25. Each source file is recorded with its
+mtime and size, so an update re-parses only files that are new or have
+changed and drops rows for files that are gone. A query is then a single
+index lookup instead of a grep over raw JSONL.
+
+Packed digests are indexed as kind "digest" with the pack as their path.
+Entries shadowed by a loose digest of the same name are skipped, and the
+skipped names are recorded with the pack so it is re-indexed when the set
+changes.
+"""
+
+from __future__ import annotations
+
+import os
+import re
+import sqlite3
+from dataclasses import dataclass
+from functools import partial
+from datetime import datetime
+from pathlib import Path
+from typing import Iterable, Optional
+
+from . import timings
+
+SCHEMA_VERSION = 2
+
+SCHEMA = """
+CREATE TABLE sources (
+    id       INTEGER PRIMARY KEY,
+    path     TEXT NOT NULL UNIQUE,
+    kind     TEXT NOT NULL,       -- "session" | "digest"
+    mtime_ns INTEGER NOT NULL,
+    size     INTEGER NOT NULL,
+    shadowed TEXT NOT NULL DEFAULT ''  -- pack entries skipped for loose copies
+);
+CREATE TABLE moments (
+    id        INTEGER PRIMARY KEY,
+    source_id INTEGER NOT NULL REFERENCES sources (id) ON DELETE CASCADE,
+    category  TEXT NOT NULL,      -- candidate category, or "bullet"/"pattern"
+    date      TEXT NOT NULL,
+    title     TEXT NOT NULL,      -- digest topic or session file name
+    summary   TEXT NOT NULL,
+    detail    TEXT NOT NULL
+);
+CREATE INDEX moments_source ON moments (source_id);
+CREATE VIRTUAL TABLE moments_fts USING fts5 (
+    summary, detail, content='moments', content_rowid='id', tokenize='porter unicode61'
+);
+CREATE TRIGGER moments_ai AFTER INSERT ON moments BEGIN
+    INSERT INTO moments_fts (rowid, summary, detail) VALUES (new.id, new.summary, new.detail);
+END;
+CREATE TRIGGER moments_ad AFTER DELETE ON moments BEGIN
+    INSERT INTO moments_fts (moments_fts, rowid, summary, detail)
+    VALUES ('delete', old.id, old.summary, old.detail);
+END;
+"""
+
+# Marks around matched words in Hit.snippet (control characters, so they
+# can't collide with text in the moment or with rich markup)
+HIGHLIGHT_START = "\x01"
+HIGHLIGHT_END = "\x02"
+
+# Summary matches weigh more than matches in the surrounding detail
+SUMMARY_WEIGHT = 2.0
+DETAIL_WEIGHT = 1.0
+
+
+def default_index_path() -> Path:
+    override = os.environ.get("DECISION_TRAIL_SEARCH_DB")
+    if override:
+        return Path(override)
+    return Path.home() / ".cache" / "decision-trail" / "search.db"
+
+
+@dataclass
+class Hit:
+    """One ranked search result."""
+
+    score: float
+    kind: str
+    category: str
+    date: str
+    title: str
+    summary: str
+    snippet: str
+    path: str
+
+
+@dataclass
+class UpdateStats:
+    checked: int = 0
+    reindexed: int = 0
+    removed: int = 0
+    moments: int = 0  # rows written
+
+
+def open_index(path: Path) -> sqlite3.Connection:
+    """Open (creating if needed) the search database."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(str(path))
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA foreign_keys = ON")
+    version = conn.execute("PRAGMA user_version").fetchone()[0]
+    if version != SCHEMA_VERSION:
+        for name in ("moments_fts", "moments", "sources"):
+            conn.execute(f"DROP TABLE IF EXISTS {name}")
+        conn.executescript(SCHEMA)
+        conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        conn.commit()
+    return conn
+
+
+# ---------------------------------------------------------------------------
+# Indexing
+# ---------------------------------------------------------------------------
+
+def _session_rows(path: Path) -> list[tuple]:
+    from .extractor import extract_from_session
+
+    m = re.match(r"(\d{4}-\d{2}-\d{2})", path.stem)
+    date = m.group(1) if m else datetime.fromtimestamp(path.stat().st_mtime).date().isoformat()
+    return [
+        (c.category, date, path.stem, c.summary, f"{c.human_response} {c.ai_suggestion}".strip())
+        for c in extract_from_session(path)
+    ]
+
+
+def _digest_rows(path: Path) -> list[tuple]:
+    from .profile import parse_digest
+
+    return _digest_data_rows(parse_digest(path))
+
+
+def _pack_rows(path: Path, skip: frozenset = frozenset()) -> list[tuple]:
+    from .pack import PackReader
+    from .profile import parse_digest_text
+
+    with PackReader(path) as reader:
+        return [
+            row
+            for name in reader.names() if name not in skip
+            for row in _digest_data_rows(parse_digest_text(reader.read_text(name)))
+        ]
+
+
+def _pack_shadowed(path: Path, loose: set[str]) -> frozenset:
+    """Names in the pack that a loose digest overrides."""
+    from .pack import PackReader
+
+    with PackReader(path) as reader:
+        return frozenset(loose.intersection(reader.names()))
+
+
+def _digest_data_rows(d) -> list[tuple]:
+    rows = [("bullet", d.date, d.topic, bullet, d.summary) for bullet in d.bullets]
+    if d.pattern:
+        rows.append(("pattern", d.date, d.topic, d.pattern, d.summary))
+    return rows
+
+
+def update_index(
+    conn: sqlite3.Connection,
+    sessions: Iterable[Path] = (),
+    digests: Iterable[Path] = (),
+    packs: Iterable[Path] = (),
+) -> UpdateStats:
+    """Re-index new or changed files and drop sources that no longer exist.
+
+    Packs are indexed as digests, minus the entries a loose file in
+    ``digests`` overrides.
+    """
+    stats = UpdateStats()
+    known = {
+        row["path"]: row
+        for row in conn.execute("SELECT id, path, mtime_ns, size, shadowed FROM sources")
+    }
+    digests = list(digests)
+    loose = {p.name for p in digests}
+
+    def sources():
+        for path in sessions:
+            yield "session", path, _session_rows, ""
+        for path in digests:
+            yield "digest", path, _digest_rows, ""
+        for path in packs:
+            skip = _pack_shadowed(path, loose)
+            yield "digest", path, partial(_pack_rows, skip=skip), "\n".join(sorted(skip))
+
+    with timings.stage("search.update"):
+        for kind, path, parse, shadowed in sources():
+            path = path.resolve()
+            st = path.stat()
+            stats.checked += 1
+            row = known.get(str(path))
+            if (
+                row and row["mtime_ns"] == st.st_mtime_ns and row["size"] == st.st_size
+                and row["shadowed"] == shadowed
+            ):
+                continue
+
+            rows = parse(path)
+            if row:
+                conn.execute("DELETE FROM sources WHERE id = ?", (row["id"],))
+            source_id = conn.execute(
+                "INSERT INTO sources (path, kind, mtime_ns, size, shadowed) VALUES (?, ?, ?, ?, ?)",
+                (str(path), kind, st.st_mtime_ns, st.st_size, shadowed),
+            ).lastrowid
+            conn.executemany(
+                "INSERT INTO moments (source_id, category, date, title, summary, detail)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                [(source_id, *r) for r in rows],
+            )
+            stats.reindexed += 1
+            stats.moments += len(rows)
+
+        for path, row in known.items():
+            if not os.path.exists(path):
+                conn.execute("DELETE FROM sources WHERE id = ?", (row["id"],))
+                stats.removed += 1
+
+        conn.commit()
+
+    timings.count("search.reindexed", stats.reindexed)
+    return stats
+
+
+# ---------------------------------------------------------------------------
+# Querying
+# ---------------------------------------------------------------------------
+
+def _match_expression(query: str) -> str:
+    """Quote each word so user input can't trip FTS5 query syntax."""
+    words = re.findall(r"\w+", query)
+    return " ".join(f'"{w}"' for w in words)
+
+
+def search(
+    conn: sqlite3.Connection,
+    query: str,
+    limit: int = 20,
+    kind: Optional[str] = None,
+) -> list[Hit]:
+    """Moments matching every word of ``query``, best BM25 score first."""
+    match = _match_expression(query)
+    if not match:
+        return []
+
+    sql = (
+        "SELECT bm25(moments_fts, ?, ?) AS score, s.kind, m.category, m.date, m.title,"
+        " m.summary, snippet(moments_fts, -1, ?, ?, '…', 12) AS snippet, s.path"
+        " FROM moments_fts"
+        " JOIN moments m ON m.id = moments_fts.rowid"
+        " JOIN sources s ON s.id = m.source_id"
+        " WHERE moments_fts MATCH ?"
+    )
+    params: list = [SUMMARY_WEIGHT, DETAIL_WEIGHT, HIGHLIGHT_START, HIGHLIGHT_END, match]
+    if kind:
+        sql += " AND s.kind = ?"
+        params.append(kind)
+    sql += " ORDER BY score LIMIT ?"
+    params.append(limit)
+
+    with timings.stage("search.query"):
+        # bm25() is lower-is-better; flip it so larger means more relevant
+        return [
+            Hit(**{**dict(row), "score": -row["score"]})
+            for row in conn.execute(sql, params)
+        ]
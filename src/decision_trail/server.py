@@ -0,0 +1,134 @@
+"""Local preview server with in-memory rendering and live reload.
+
+Backs ``decision-trail serve --watch``: the profile is rendered into memory,
+the decisions tree is polled for changes, and connected browsers are told
+to reload over server-sent events when a rebuild lands.
+"""
+
+from __future__ import annotations
+
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+from .profile import ProfileCache, ProfileData
+from .renderer import SEARCH_INDEX_NAME, render_html
+from .site_search import build_search_index, dump_search_index
+
+EVENTS_PATH = "/__events"
+
+# Idle SSE connections get a comment this often so dead clients are noticed
+KEEPALIVE_SECONDS = 15.0
+
+
+class LiveProfile:
+    """The rendered profile page, rebuilt in memory when digests change."""
+
+    def __init__(self, root: Path):
+        self.cache = ProfileCache(root)
+        self.version = 0
+        self.data: ProfileData | None = None
+        self.html = b""
+        self.search_index = b""
+        self._cond = threading.Condition()
+
+    def rebuild(self) -> bool:
+        """Re-parse changed files and re-render. Returns True if the page changed."""
+        if not self.cache.refresh() and self.data is not None:
+            return False
+
+        data = self.cache.build()
+        html = render_html(
+            data, live_reload_url=EVENTS_PATH, search_index_url=SEARCH_INDEX_NAME,
+        ).encode("utf-8")
+        search_index = dump_search_index(build_search_index(data)).encode("utf-8")
+
+        with self._cond:
+            self.data = data
+            self.html = html
+            self.search_index = search_index
+            self.version += 1
+            self._cond.notify_all()
+        return True
+
+    def snapshot(self) -> tuple[int, bytes]:
+        """Current (version, page bytes) pair."""
+        with self._cond:
+            return self.version, self.html
+
+    def wait_for_change(self, version: int, timeout: float) -> int:
+        """Block until the version moves past ``version`` or ``timeout`` elapses."""
+        with self._cond:
+            self._cond.wait_for(lambda: self.version != version, timeout=timeout)
+            return self.version
+
+    def watch(self, stop: threading.Event, interval: float = 1.0, on_rebuild=None) -> None:
+        """Poll the decisions tree until ``stop`` is set, rebuilding on change."""
+        while not stop.wait(interval):
+            try:
+                changed = self.rebuild()
+            except Exception as exc:  # keep serving the last good page
+                if on_rebuild:
+                    on_rebuild(None, exc)
+                continue
+            if changed and on_rebuild:
+                on_rebuild(self.data, None)
+
+
+def _make_handler(live: LiveProfile) -> type[BaseHTTPRequestHandler]:
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            path = self.path.split("?", 1)[0]
+            if path in ("/", "/index.html"):
+                _, body = live.snapshot()
+                self._send(body, "text/html; charset=utf-8")
+            elif path == "/" + SEARCH_INDEX_NAME:
+                self._send(live.search_index, "application/json")
+            elif path == EVENTS_PATH:
+                self._stream_events()
+            else:
+                self.send_error(404)
+
+        def _send(self, body: bytes, content_type: str):
+            self.send_response(200)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.send_header("Cache-Control", "no-store")
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _stream_events(self):
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Cache-Control", "no-store")
+            self.send_header("Connection", "close")
+            self.end_headers()
+            self.close_connection = True
+
+            seen, _ = live.snapshot()
+            try:
+                while True:
+                    current = live.wait_for_change(seen, KEEPALIVE_SECONDS)
+                    if current != seen:
+                        seen = current
+                        self.wfile.write(f"event: reload\ndata: {current}\n\n".encode())
+                    else:
+                        self.wfile.write(b": keepalive\n\n")
+                    self.wfile.flush()
+            except (BrokenPipeError, ConnectionResetError):
+                pass
+
+        def log_message(self, format, *args):
+            pass  # the CLI reports rebuilds; per-request logs are noise
+
+    return Handler
+
+
+def make_live_server(live: LiveProfile, port: int) -> ThreadingHTTPServer:
+    """Create a threaded HTTP server that serves ``live`` from memory."""
+    server = ThreadingHTTPServer(("", port), _make_handler(live))
+    # SSE handlers block indefinitely; don't let them hold up shutdown
+    server.daemon_threads = True
+    return server
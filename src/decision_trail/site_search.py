@@ -0,0 +1,120 @@
+"""Compact inverted index for searching the HTML profile in the browser.
+
+Built once per profile build and written next to ``index.html``. The page
+fetches it lazily the first time the search box is used, so a profile with
+thousands of sessions stays searchable without a server.
+
+Index layout (JSON)::
+
+    {
+      "v": 1,
+      "stop": [stopword, ...],
+      "docs": [[kind, label, text], ...],
+      "terms": [[shared_prefix_len, suffix], ...],   # front-coded, sorted
+      "postings": [[doc_id_delta, ...], ...]          # parallel to terms
+    }
+
+Terms are front-coded against the previous term and postings are
+delta-encoded, which keeps the blob small and gzip-friendly.
+"""
+
+from __future__ import annotations
+
+import json
+import re
+
+from . import timings
+from .profile import ProfileData
+
+INDEX_VERSION = 1
+
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+# Too common to be useful as search terms
+STOPWORDS = frozenset(
+    "a an and are as at be but by for from has have in into is it its of on or "
+    "so that the their then there this to was were which while with".split()
+)
+
+
+def tokenize(text: str) -> list[str]:
+    """Lowercase word tokens, minus stopwords and single characters."""
+    return [
+        t for t in TOKEN_RE.findall(text.lower())
+        if len(t) > 1 and t not in STOPWORDS
+    ]
+
+
+def _documents(profile: ProfileData) -> list[list[str]]:
+    """Flatten the profile into searchable [kind, label, text] documents."""
+    docs: list[list[str]] = []
+
+    for d in profile.digests:
+        label = f"{d.date} — {d.topic}" if d.topic else d.date
+        if d.topic or d.summary:
+            docs.append(["session", label, " ".join(p for p in (d.topic, d.summary) if p)])
+        for bullet in d.bullets:
+            docs.append(["moment", label, bullet])
+        if d.pattern:
+            docs.append(["pattern", label, d.pattern])
+
+    for s in profile.synthesis:
+        for kind, items in (
+            ("recurring pattern", s.recurring_patterns),
+            ("evolution", s.evolution),
+            ("beyond fluency", s.beyond_fluency),
+            ("gap", s.gaps),
+        ):
+            for item in items:
+                docs.append([kind, s.month, item])
+
+    return docs
+
+
+def _front_code(terms: list[str]) -> list[list]:
+    """Encode sorted terms as [shared prefix length with previous term, suffix]."""
+    coded: list[list] = []
+    prev = ""
+    for term in terms:
+        n = 0
+        limit = min(len(prev), len(term))
+        while n < limit and prev[n] == term[n]:
+            n += 1
+        coded.append([n, term[n:]])
+        prev = term
+    return coded
+
+
+def build_search_index(profile: ProfileData) -> dict:
+    """Build the front-coded inverted index for a profile."""
+    with timings.stage("render.search_index"):
+        return _build_search_index(profile)
+
+
+def _build_search_index(profile: ProfileData) -> dict:
+    docs = _documents(profile)
+
+    postings: dict[str, list[int]] = {}
+    for doc_id, (_, label, text) in enumerate(docs):
+        for term in set(tokenize(f"{label} {text}")):
+            postings.setdefault(term, []).append(doc_id)
+
+    terms = sorted(postings)
+    encoded_postings: list[list[int]] = []
+    for term in terms:
+        # Doc ids are appended in ascending order, so deltas are positive
+        ids = postings[term]
+        encoded_postings.append([ids[0]] + [b - a for a, b in zip(ids, ids[1:])])
+
+    return {
+        "v": INDEX_VERSION,
+        "stop": sorted(STOPWORDS),
+        "docs": docs,
+        "terms": _front_code(terms),
+        "postings": encoded_postings,
+    }
+
+
+def dump_search_index(index: dict) -> str:
+    """Serialize the index as compact JSON."""
+    return json.dumps(index, ensure_ascii=False, separators=(",", ":"))
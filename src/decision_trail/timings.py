@@ -0,0 +1,116 @@
+"""Opt-in per-stage timing and counters (``--timings``).
+
+Pipeline code wraps its stages in ``with stage("extract.read"):`` and reports
+totals with ``count("extract.lines", n)``. Until ``enable()`` is called both
+are no-ops: ``stage`` hands back a shared do-nothing context manager and
+``count`` returns immediately, so instrumented code costs a function call
+per stage, not per item. Hot loops accumulate counts in locals and report
+them once.
+"""
+
+from __future__ import annotations
+
+import json
+import time
+from pathlib import Path
+from typing import Optional
+
+
+class _NullStage:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_STAGE = _NullStage()
+
+
+class _Stage:
+    __slots__ = ("_recorder", "_name", "_start")
+
+    def __init__(self, recorder: "Recorder", name: str):
+        self._recorder = recorder
+        self._name = name
+
+    def __enter__(self):
+        if self._recorder.memory is not None:
+            self._recorder.memory.enter()
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self._recorder.add_time(self._name, time.perf_counter() - self._start)
+        if self._recorder.memory is not None:
+            self._recorder.memory.exit_stage(self._name)
+        return False
+
+
+class Recorder:
+    """Accumulates wall time per stage and named counters."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.stages: dict[str, list] = {}  # name -> [calls, seconds]
+        self.counters: dict[str, int] = {}
+        self.memory = None  # memprofile.MemoryProfiler, hooked in by --memprofile
+
+    def add_time(self, name: str, seconds: float) -> None:
+        entry = self.stages.setdefault(name, [0, 0.0])
+        entry[0] += 1
+        entry[1] += seconds
+
+    def add_count(self, name: str, n: int) -> None:
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    def to_dict(self) -> dict:
+        return {
+            "total_seconds": round(time.perf_counter() - self.started, 6),
+            "stages": {
+                name: {"calls": calls, "seconds": round(seconds, 6)}
+                for name, (calls, seconds) in sorted(self.stages.items())
+            },
+            "counters": dict(sorted(self.counters.items())),
+        }
+
+
+_recorder: Optional[Recorder] = None
+
+
+def enable() -> Recorder:
+    """Start recording (idempotent). Returns the active recorder."""
+    global _recorder
+    if _recorder is None:
+        _recorder = Recorder()
+    return _recorder
+
+
+def enabled() -> bool:
+    return _recorder is not None
+
+
+def stage(name: str):
+    """Context manager timing one stage. A shared no-op when recording is off."""
+    if _recorder is None:
+        return _NULL_STAGE
+    return _Stage(_recorder, name)
+
+
+def count(name: str, n: int = 1) -> None:
+    """Add ``n`` to a counter. Does nothing when recording is off."""
+    if _recorder is not None and n:
+        _recorder.add_count(name, n)
+
+
+def snapshot() -> dict:
+    """The recorded timings and counters so far (empty if recording is off)."""
+    return _recorder.to_dict() if _recorder is not None else {}
+
+
+def write_json(path: Path) -> None:
+    """Write the recorded timings and counters as JSON."""
+    if _recorder is not None:
+        path.write_text(json.dumps(snapshot(), indent=2) + "\n")
@@ -0,0 +1,386 @@
+"""Auto-digest ingester (``decision-trail watch``).
+
+Watches the Claude Code projects tree for session logs that change, waits
+until a session has been idle for a while (Claude Code writes no explicit
+"ended" marker), then digests it on a small process pool. Sources can be
+limited to one project directory (``project``), so only that project's
+sessions are reported. Every change
+pushes a session's deadline back, so a log that is still growing is parsed
+once when it settles rather than on every write.
+
+Change notification uses Linux inotify through libc when available and
+falls back to polling (stat every ``*.jsonl``) elsewhere, or when a watch
+can't be added later on (e.g. the inotify watch limit). Which sessions
+have been digested, at which size/mtime and into which file, is kept in a
+small JSON state file. A session that grows again later (a resumed
+conversation) is re-digested into the same file.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import select
+import struct
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass, field
+from datetime import date
+from pathlib import Path
+from typing import Callable, Iterable, Optional
+
+DEFAULT_IDLE_SECONDS = 120.0
+DEFAULT_POLL_SECONDS = 5.0
+
+
+def default_state_path() -> Path:
+    override = os.environ.get("DECISION_TRAIL_WATCH_STATE")
+    if override:
+        return Path(override)
+    cache = Path(os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache")
+    return cache / "decision-trail" / "watch.json"
+
+
+def _stamp(path: Path) -> Optional[tuple[int, int]]:
+    try:
+        st = path.stat()
+    except OSError:
+        return None
+    return (st.st_size, st.st_mtime_ns)
+
+
+# ---------------------------------------------------------------------------
+# Change sources
+# ---------------------------------------------------------------------------
+
+def _session_logs(projects_dir: Path, project: Optional[str]) -> list[Path]:
+    """Every session log under ``projects_dir``, or under its ``project`` dir only."""
+    top = projects_dir if project is None else projects_dir / project
+    return sorted(top.rglob("*.jsonl")) if top.is_dir() else []
+
+
+class PollingSource:
+    """Reports session logs whose size or mtime changed since the last scan."""
+
+    def __init__(
+        self,
+        projects_dir: Path,
+        interval: float = DEFAULT_POLL_SECONDS,
+        project: Optional[str] = None,
+    ):
+        self.projects_dir = projects_dir
+        self.interval = interval
+        self.project = project
+        self._stamps: dict[Path, tuple[int, int]] = self._scan()
+        self._scanned_at = time.monotonic()
+
+    def _scan(self) -> dict[Path, tuple[int, int]]:
+        stamps = {}
+        for path in _session_logs(self.projects_dir, self.project):
+            stamp = _stamp(path)
+            if stamp is not None:
+                stamps[path] = stamp
+        return stamps
+
+    def existing(self) -> list[Path]:
+        return sorted(self._stamps)
+
+    def wait(self, timeout: float) -> set[Path]:
+        time.sleep(timeout)
+        if time.monotonic() - self._scanned_at < self.interval:
+            return set()
+        self._scanned_at = time.monotonic()
+        stamps = self._scan()
+        changed = {p for p, s in stamps.items() if self._stamps.get(p) != s}
+        self._stamps = stamps
+        return changed
+
+    def close(self) -> None:
+        pass
+
+
+class InotifySource:
+    """inotify watches on the projects dir and each project dir under it
+    (just ``project``'s, if given).
+
+    Raises OSError if inotify isn't available (not Linux, or the watch
+    limit is exhausted); callers fall back to PollingSource. If a watch
+    on a project dir created later can't be added, the source switches
+    to polling itself.
+    """
+
+    IN_MODIFY = 0x00000002
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+    IN_Q_OVERFLOW = 0x00004000
+    IN_ISDIR = 0x40000000
+    MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE
+
+    _EVENT = struct.Struct("iIII")  # wd, mask, cookie, name length
+
+    def __init__(
+        self,
+        projects_dir: Path,
+        project: Optional[str] = None,
+        interval: float = DEFAULT_POLL_SECONDS,
+    ):
+        import ctypes
+        import ctypes.util
+
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or None, use_errno=True)
+        try:
+            self._add_watch = libc.inotify_add_watch
+            init = libc.inotify_init1
+        except AttributeError:
+            raise OSError("inotify is not available on this platform")
+        self._add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        self._errno = ctypes.get_errno
+
+        self._fd = init(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(self._errno(), "inotify_init1 failed")
+        self.projects_dir = projects_dir
+        self.project = project
+        self.interval = interval
+        self._dirs: dict[int, Path] = {}
+        self._fallback: Optional[PollingSource] = None
+        try:
+            self._watch(projects_dir)
+            for child in projects_dir.iterdir():
+                if child.is_dir() and self._wanted(child):
+                    self._watch(child)
+        except OSError:
+            os.close(self._fd)
+            raise
+
+    def _watch(self, directory: Path) -> None:
+        wd = self._add_watch(self._fd, os.fsencode(directory), self.MASK)
+        if wd < 0:
+            raise OSError(self._errno(), f"inotify_add_watch failed for {directory}")
+        self._dirs[wd] = directory
+
+    def _wanted(self, directory: Path) -> bool:
+        return self.project is None or directory.name == self.project
+
+    def existing(self) -> list[Path]:
+        return _session_logs(self.projects_dir, self.project)
+
+    def wait(self, timeout: float) -> set[Path]:
+        if self._fallback is not None:
+            return self._fallback.wait(timeout)
+        ready, _, _ = select.select([self._fd], [], [], timeout)
+        if not ready:
+            return set()
+        changed: set[Path] = set()
+        data = os.read(self._fd, 64 * 1024)
+        pos = 0
+        while pos + self._EVENT.size <= len(data):
+            wd, mask, _, length = self._EVENT.unpack_from(data, pos)
+            raw = data[pos + self._EVENT.size:pos + self._EVENT.size + length]
+            pos += self._EVENT.size + length
+            if mask & self.IN_Q_OVERFLOW:
+                return set(self.existing())  # events were lost; treat everything as touched
+            directory = self._dirs.get(wd)
+            if directory is None:
+                continue
+            path = directory / os.fsdecode(raw.rstrip(b"\0"))
+            if mask & self.IN_ISDIR:
+                if (
+                    mask & (self.IN_CREATE | self.IN_MOVED_TO)
+                    and directory == self.projects_dir and self._wanted(path)
+                ):
+                    try:
+                        self._watch(path)
+                    except OSError:
+                        return self._fall_back()
+                    changed.update(path.glob("*.jsonl"))  # written before the watch existed
+            elif path.suffix == ".jsonl" and (self.project is None or directory != self.projects_dir):
+                changed.add(path)
+        return changed
+
+    def _fall_back(self) -> set[Path]:
+        """Switch to polling; everything counts as touched, since events may be lost."""
+        os.close(self._fd)
+        self._fd = -1
+        self._fallback = PollingSource(self.projects_dir, self.interval, self.project)
+        return set(self._fallback.existing())
+
+    def close(self) -> None:
+        if self._fd >= 0:
+            os.close(self._fd)
+
+
+def open_source(
+    projects_dir: Path,
+    poll: bool = False,
+    interval: float = DEFAULT_POLL_SECONDS,
+    project: Optional[str] = None,
+):
+    """inotify where it works, polling otherwise (or when ``poll`` is set).
+
+    With ``project``, only sessions in that project directory are reported.
+    """
+    if not poll:
+        try:
+            return InotifySource(projects_dir, project, interval)
+        except OSError:
+            pass
+    return PollingSource(projects_dir, interval, project)
+
+
+# ---------------------------------------------------------------------------
+# Ingesting
+# ---------------------------------------------------------------------------
+
+def _digest_session(session_path: str) -> str:
+    """Worker: parse one session log and render its digest."""
+    from .digest import generate_digest
+    from .extractor import extract_from_session
+
+    path = Path(session_path)
+    return generate_digest(path, extract_from_session(path))
+
+
+@dataclass
+class IngestEvent:
+    """One finished (or failed) digest, reported to the caller."""
+
+    session_path: Path
+    digest_path: Optional[Path] = None
+    error: Optional[BaseException] = None
+
+
+@dataclass
+class Ingester:
+    """Debounces session changes and digests idle sessions on a worker pool."""
+
+    root: Path
+    idle_seconds: float = DEFAULT_IDLE_SECONDS
+    workers: int = 2
+    state_path: Path = field(default_factory=default_state_path)
+
+    def __post_init__(self):
+        self._pending: dict[Path, float] = {}  # session -> monotonic time of last change
+        self._inflight: dict[Future, tuple[Path, tuple[int, int]]] = {}
+        self._state = self._load_state()
+        self._pool = ProcessPoolExecutor(max_workers=self.workers)
+
+    # -- state ---------------------------------------------------------------
+
+    def _load_state(self) -> dict[str, dict]:
+        try:
+            data = json.loads(self.state_path.read_text())
+        except (OSError, ValueError):
+            return {}
+        return data.get(str(self.root), {})
+
+    def _save_state(self) -> None:
+        from .renderer import atomic_open
+
+        try:
+            data = json.loads(self.state_path.read_text())
+        except (OSError, ValueError):
+            data = {}
+        data[str(self.root)] = self._state
+        self.state_path.parent.mkdir(parents=True, exist_ok=True)
+        with atomic_open(self.state_path) as f:
+            json.dump(data, f, indent=1, sort_keys=True)
+
+    def is_current(self, session_path: Path) -> bool:
+        """True if the session's digest matches its log's current size/mtime."""
+        entry = self._state.get(str(session_path))
+        return entry is not None and tuple(entry["stamp"]) == _stamp(session_path)
+
+    def known(self, session_path: Path) -> bool:
+        return str(session_path) in self._state
+
+    # -- scheduling ----------------------------------------------------------
+
+    def touch(self, paths: Iterable[Path], now: Optional[float] = None) -> None:
+        """Record changes; each one restarts that session's idle timer."""
+        now = time.monotonic() if now is None else now
+        for path in paths:
+            self._pending[path] = now
+
+    @property
+    def running(self) -> int:
+        """Digests currently being generated."""
+        return len(self._inflight)
+
+    def submit_idle(self, now: Optional[float] = None) -> int:
+        """Queue sessions that have been quiet for ``idle_seconds``."""
+        now = time.monotonic() if now is None else now
+        running = {path for path, _ in self._inflight.values()}
+        queued = 0
+        for path, changed_at in list(self._pending.items()):
+            if now - changed_at < self.idle_seconds or path in running:
+                continue
+            del self._pending[path]
+            stamp = _stamp(path)
+            if stamp is None or self.is_current(path):
+                continue
+            self._inflight[self._pool.submit(_digest_session, str(path))] = (path, stamp)
+            queued += 1
+        return queued
+
+    def collect(self) -> list[IngestEvent]:
+        """Write out finished digests. Returns what happened, in completion order."""
+        events = []
+        for future in [f for f in self._inflight if f.done()]:
+            path, stamp = self._inflight.pop(future)
+            try:
+                text = future.result()
+            except Exception as exc:
+                events.append(IngestEvent(path, error=exc))
+                continue
+            if _stamp(path) != stamp:
+                self._pending.setdefault(path, time.monotonic())  # grew while parsing
+            digest_path = self._write_digest(path, text)
+            self._state[str(path)] = {"stamp": list(stamp), "digest": digest_path.name}
+            events.append(IngestEvent(path, digest_path))
+        if events:
+            self._save_state()
+        return events
+
+    def _write_digest(self, session_path: Path, text: str) -> Path:
+        from .pack import new_digest_path
+        from .renderer import atomic_open
+
+        digest_dir = self.root / "decisions" / "digests"
+        digest_dir.mkdir(parents=True, exist_ok=True)
+
+        previous = self._state.get(str(session_path), {}).get("digest")
+        if previous:
+            digest_path = digest_dir / previous  # resumed session: replace its digest
+        else:
+            digest_path = new_digest_path(self.root, date.today().isoformat())
+
+        with atomic_open(digest_path) as f:
+            f.write(text)
+        return digest_path
+
+    def close(self) -> None:
+        self._pool.shutdown(cancel_futures=True)
+
+
+def run(
+    ingester: Ingester,
+    source,
+    should_stop: Callable[[], bool],
+    on_batch: Callable[[list[IngestEvent]], None],
+    tick: float = 1.0,
+) -> None:
+    """Event loop: feed changes to the ingester and hand over finished batches.
+
+    A batch is everything that finished since the pool last went idle, so
+    a burst of sessions ending together lands as one batch (one commit).
+    """
+    batch: list[IngestEvent] = []
+    while not should_stop():
+        ingester.touch(source.wait(tick))
+        ingester.submit_idle()
+        batch.extend(ingester.collect())
+        if batch and not ingester.running:
+            on_batch(batch)
+            batch = []